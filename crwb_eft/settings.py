@@ -90,6 +90,28 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'crwb-eft',
+    }
+}
+
+# EFT file generation
+EFT_STREAM_THRESHOLD = 1000  # Batches with this many records or more are streamed on export
+EFT_STREAM_CHUNK_SIZE = 500  # Transactions fetched per round-trip while streaming
+EFT_ARTIFACT_CACHE_TIMEOUT = 60 * 60 * 24  # Seconds a generated EFT file stays cached
+EFT_EXPORT_WORKERS = None  # Processes used to render large bulk ZIP exports (None = one per CPU)
+EFT_EXPORT_PARALLEL_MIN_RECORDS = 20000  # Bundles with fewer records than this are rendered in-process
+EFT_MAX_FILE_RECORDS = 9999  # RBM limit per file; larger batches are exported as split parts
+EFT_BULK_ENTRY_MAX_LINES = 1000  # Most transaction lines accepted by one bulk-add request
+EFT_ARCHIVE_AFTER_DAYS = 365  # Exported/approved batches older than this are moved to the archive tables
+EFT_DASHBOARD_CACHE_TIMEOUT = 300  # Seconds admin dashboard figures may be served from cache (signals clear it sooner)
+EFT_DB_STATUS_CACHE_TIMEOUT = 30  # Seconds a database health check result is reused
+EFT_SEARCH_BACKEND = 'auto'  # Master data search: 'auto' (by database), 'fts5', 'trigram' or 'basic'
+EFT_CHOICE_CACHE_TIMEOUT = 300  # Seconds dropdown options may be served from cache (master data writes start a new version sooner)
+EFT_SUPPLIER_LOOKUP_MAX_AGE = 300  # Seconds a process keeps its supplier typeahead index (supplier and bank writes rebuild it sooner)
+
 # Authentication & Session Settings
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
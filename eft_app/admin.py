@@ -5,7 +5,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User, Group
 from .models import (
     Bank, Zone, Scheme, Supplier, DebitAccount,
-    EFTBatch, EFTTransaction, ApprovalAuditLog
+    EFTBatch, EFTTransaction, EFTArtifact, ApprovalAuditLog, ArchivedBatch
 )
 
 # Custom User Admin
@@ -167,7 +167,7 @@ class EFTBatchAdmin(admin.ModelAdmin):
     search_fields = ('batch_reference', 'batch_name', 'created_by__username')
     readonly_fields = ('batch_reference', 'total_amount', 'record_count', 'created_by', 
                       'created_at', 'approved_by', 'approved_at', 'rejection_reason',
-                      'generated_file', 'generated_at')
+                      'generated_at')
     inlines = [EFTTransactionInline]
     
     def has_add_permission(self, request):
@@ -186,6 +186,21 @@ class EFTBatchAdmin(admin.ModelAdmin):
     def has_change_permission(self, request, obj=None):
         return request.user.is_superuser or request.user.groups.filter(name='System Admin').exists()
 
+# EFT Artifact Admin
+@admin.register(EFTArtifact)
+class EFTArtifactAdmin(admin.ModelAdmin):
+    list_display = ('batch', 'format', 'size', 'compressed_size', 'checksum', 'created_at')
+    list_filter = ('format', 'created_at')
+    search_fields = ('batch__batch_reference', 'checksum')
+    exclude = ('content',)
+    readonly_fields = ('batch', 'format', 'digest', 'size', 'compressed_size', 'checksum', 'created_at')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # Approval Audit Log Admin
 @admin.register(ApprovalAuditLog)
 class ApprovalAuditLogAdmin(admin.ModelAdmin):
@@ -203,6 +218,19 @@ class ApprovalAuditLogAdmin(admin.ModelAdmin):
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser or request.user.groups.filter(name='System Admin').exists()
 
+# Archived Batch Admin (read-only)
+@admin.register(ArchivedBatch)
+class ArchivedBatchAdmin(admin.ModelAdmin):
+    list_display = ('batch_reference', 'batch_name', 'status', 'record_count', 'total_amount', 'created_at', 'archived_at')
+    list_filter = ('status', 'archived_at')
+    search_fields = ('batch_reference', 'batch_name')
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
 # Custom Group Admin to show permissions
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('name', 'get_permissions_count')
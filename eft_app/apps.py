@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import pre_migrate, post_migrate
 
 
 class EftAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'eft_app'
+    
+    def ready(self):
+        from . import signals  # connects the dashboard cache and search index handlers
+        post_migrate.connect(signals.install_search_indexes, sender=self, dispatch_uid='install_search_indexes')
+        
+        # Carry file bodies across the migration that drops EFTBatch.generated_file
+        from .legacy_files import LegacyGeneratedFiles
+        pre_migrate.connect(LegacyGeneratedFiles.before_migrate, sender=self, dispatch_uid='legacy_files_before')
+        post_migrate.connect(LegacyGeneratedFiles.after_migrate, sender=self, dispatch_uid='legacy_files_after')
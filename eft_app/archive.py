@@ -0,0 +1,113 @@
+# eft_app/archive.py
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from .models import (
+    EFTBatch, EFTTransaction, EFTArtifact, ApprovalAuditLog,
+    ArchivedBatch, ArchivedTransaction, ArchivedAuditLog
+)
+
+class BatchArchiver:
+    """Moves old finished batches from the hot tables into the archive tables
+    
+    Each chunk of batches is copied (header, transactions, audit logs) and
+    then deleted from the hot tables inside one transaction, so a batch is
+    always in exactly one place. Cached file artifacts are dropped; they can
+    be regenerated and the archive is read-only.
+    """
+    
+    ARCHIVABLE_STATUSES = ('EXPORTED', 'APPROVED')
+    
+    @staticmethod
+    def retention_days():
+        return getattr(settings, 'EFT_ARCHIVE_AFTER_DAYS', 365)
+    
+    @staticmethod
+    def cutoff(days=None):
+        if days is None:
+            days = BatchArchiver.retention_days()
+        return timezone.now() - timedelta(days=days)
+    
+    @staticmethod
+    def eligible(cutoff):
+        """Batches approved before the cutoff that are finished with"""
+        return EFTBatch.objects.filter(
+            status__in=BatchArchiver.ARCHIVABLE_STATUSES,
+            approved_at__lt=cutoff,
+        ).order_by('id')
+    
+    @staticmethod
+    def copy_fields(source, model, **overrides):
+        """Unsaved archive instance with every field the two models share copied across"""
+        values = {}
+        for field in model._meta.concrete_fields:
+            if field.primary_key or field.name in overrides:
+                continue
+            if hasattr(source, field.attname):
+                values[field.attname] = getattr(source, field.attname)
+        values.update(overrides)
+        return model(**values)
+    
+    @staticmethod
+    def archive_chunk(batch_ids):
+        """Move one chunk of batches to the archive, returning how many were moved"""
+        with db_transaction.atomic():
+            batches = list(
+                EFTBatch.objects.select_for_update()
+                .filter(id__in=batch_ids, status__in=BatchArchiver.ARCHIVABLE_STATUSES)
+            )
+            if not batches:
+                return 0
+            ids = [batch.id for batch in batches]
+            
+            # Older batches predate freezing; pin their payee details before the copy
+            for batch in batches:
+                if not batch.beneficiaries_frozen_at:
+                    batch.freeze_beneficiaries()
+            
+            ArchivedBatch.objects.bulk_create(
+                BatchArchiver.copy_fields(batch, ArchivedBatch, original_id=batch.id) for batch in batches
+            )
+            archived_ids = dict(ArchivedBatch.objects.filter(original_id__in=ids).values_list('original_id', 'id'))
+            
+            ArchivedTransaction.objects.bulk_create(
+                (
+                    BatchArchiver.copy_fields(line, ArchivedTransaction, batch_id=archived_ids[line.batch_id])
+                    for line in EFTTransaction.objects.filter(batch_id__in=ids).order_by().iterator(chunk_size=2000)
+                ),
+                batch_size=1000,
+            )
+            ArchivedAuditLog.objects.bulk_create(
+                (
+                    BatchArchiver.copy_fields(log, ArchivedAuditLog, batch_id=archived_ids[log.batch_id])
+                    for log in ApprovalAuditLog.objects.filter(batch_id__in=ids).order_by().iterator()
+                ),
+                batch_size=1000,
+            )
+            
+            # Children first with plain queryset deletes: no per-row totals
+            # bookkeeping is needed because the batches go too. Usage counters
+            # are left alone on purpose; archived payments still count
+            ApprovalAuditLog.objects.filter(batch_id__in=ids).delete()
+            EFTTransaction.objects.filter(batch_id__in=ids).delete_keeping_usage()
+            EFTArtifact.objects.filter(batch_id__in=ids).delete()
+            EFTBatch.objects.filter(id__in=ids).delete_keeping_usage()
+            return len(ids)
+    
+    @staticmethod
+    def archive(cutoff, chunk_size=100):
+        """Archive every eligible batch in chunks, yielding the running total after each chunk"""
+        archived = 0
+        last_id = 0
+        while True:
+            # Walk by id so a chunk that keeps failing its status check cannot stall the loop
+            chunk = list(
+                BatchArchiver.eligible(cutoff).filter(id__gt=last_id)
+                .values_list('id', flat=True)[:chunk_size]
+            )
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            archived += BatchArchiver.archive_chunk(chunk)
+            yield archived
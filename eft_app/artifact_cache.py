@@ -0,0 +1,134 @@
+# eft_app/artifact_cache.py
+import hashlib
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .eft_formats import FORMATS, get_format
+from .eft_generator import EFTGenerator
+from .models import Bank, Zone, Scheme, Supplier, DebitAccount, EFTBatch, EFTArtifact, EFTTransaction
+from .snapshot import BatchSnapshot
+
+logger = logging.getLogger(__name__)
+
+class EFTArtifactCache:
+    """Cache of generated EFT files, keyed by a stamp of the batch row
+    
+    The stamp is read from the batch alone, so a hit costs no transaction
+    query; the snapshot is loaded only to render a miss. A per-batch
+    pointer to the current stamp lets stale artifacts be dropped when it
+    moves. Compressed copies are persisted in EFTArtifact so a cold cache
+    does not mean regenerating.
+    """
+    
+    @staticmethod
+    def stamp(batch):
+        """SHA-256 over the batch fields that move whenever its file would change
+        
+        Every status change and every line write moves updated_at, including
+        queryset updates (EFTTransactionQuerySet.update), and edits to master
+        data written into the file move it through touch_batches_using().
+        """
+        frozen_at = batch.beneficiaries_frozen_at.isoformat() if batch.beneficiaries_frozen_at else ''
+        fields = (batch.pk, batch.updated_at.isoformat(), batch.status, batch.batch_name, batch.currency,
+                  batch.total_amount, batch.record_count, frozen_at)
+        return hashlib.sha256('\x1f'.join(str(value) for value in fields).encode('utf-8')).hexdigest()
+    
+    # Master data model -> transaction lookup of the lines whose file text it
+    # provides, and whether frozen beneficiary details replace it
+    FILE_MASTER_DATA = {
+        Zone: ('zone', False),
+        Scheme: ('scheme', False),
+        DebitAccount: ('debit_account', False),
+        Supplier: ('supplier', True),
+        Bank: ('supplier__bank', True),
+    }
+    
+    @staticmethod
+    def touch_batches_using(instance):
+        """Move updated_at on the approved batches whose file shows this master data row"""
+        lookup, frozen_replaces = EFTArtifactCache.FILE_MASTER_DATA[type(instance)]
+        batches = EFTBatch.objects.filter(
+            status='APPROVED',
+            pk__in=EFTTransaction.objects.filter(**{lookup: instance}).values('batch_id'),
+        )
+        if frozen_replaces:
+            batches = batches.filter(beneficiaries_frozen_at__isnull=True)
+        batches.update(updated_at=timezone.now())
+    
+    @staticmethod
+    def _artifact_key(digest, format):
+        return f"eft:artifact:{digest}:{format}"
+    
+    @staticmethod
+    def _pointer_key(batch_id):
+        return f"eft:batch:{batch_id}:digest"
+    
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'EFT_ARTIFACT_CACHE_TIMEOUT', None)
+    
+    @staticmethod
+    def track(batch_id, digest):
+        """Point the batch at its current digest, dropping artifacts of the old one"""
+        pointer_key = EFTArtifactCache._pointer_key(batch_id)
+        previous = cache.get(pointer_key)
+        if previous and previous != digest:
+            cache.delete_many([EFTArtifactCache._artifact_key(previous, f) for f in FORMATS])
+        if previous != digest:
+            cache.set(pointer_key, digest, EFTArtifactCache._timeout())
+    
+    @staticmethod
+    def lookup(batch, digest, format='txt'):
+        """Return cached or stored content for the digest, or None"""
+        key = EFTArtifactCache._artifact_key(digest, format)
+        content = cache.get(key)
+        if content is not None:
+            return content
+        
+        # Fall back to the artifact store before regenerating
+        artifact = EFTArtifact.objects.filter(batch=batch, format=format, digest=digest).first()
+        if artifact is not None:
+            content = artifact.read()
+            cache.set(key, content, EFTArtifactCache._timeout())
+        return content
+    
+    @staticmethod
+    def save(batch, digest, artifacts):
+        """Persist and cache freshly rendered content, given as {format: body}"""
+        for format, body in artifacts.items():
+            EFTArtifact.store(batch, format, digest, body)
+        cache.set_many({
+            EFTArtifactCache._artifact_key(digest, format): body for format, body in artifacts.items()
+        }, EFTArtifactCache._timeout())
+    
+    @staticmethod
+    def get_or_generate(batch, format='txt', snapshot=None):
+        """Return EFT content for the batch, generating it only on a cache miss"""
+        format = get_format(format).name
+        
+        digest = EFTArtifactCache.stamp(batch)
+        EFTArtifactCache.track(batch.pk, digest)
+        
+        content = EFTArtifactCache.lookup(batch, digest, format)
+        if content is not None:
+            return content
+        
+        if snapshot is None:
+            snapshot = BatchSnapshot.load(batch)
+        # Only the requested format; others are rendered on their own first request
+        content = EFTGenerator.generate_eft_file(batch, snapshot, format)
+        EFTArtifactCache.save(batch, digest, {format: content})
+        return content
+    
+    @staticmethod
+    def warm(batch_id):
+        """Generate and cache the TXT file for a freshly approved batch"""
+        try:
+            batch = EFTBatch.objects.get(pk=batch_id)
+            if batch.record_count >= getattr(settings, 'EFT_STREAM_THRESHOLD', 1000):
+                return  # Large batches are streamed on export, not cached
+            EFTArtifactCache.get_or_generate(batch)
+        except Exception:
+            logger.exception("Could not pre-generate EFT artifacts for batch %s", batch_id)
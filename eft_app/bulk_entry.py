@@ -0,0 +1,114 @@
+# eft_app/bulk_entry.py
+import json
+from django.conf import settings
+from .forms import EFTTransactionLineForm
+from .models import DebitAccount, Supplier, Scheme
+
+class BulkTransactionEntry:
+    """Validates many transaction lines at once against preloaded master data
+    
+    Lines arrive as a JSON array or as parallel form arrays (one value per
+    line for each field name). Debit accounts, suppliers and schemes are
+    fetched with one query per model for the whole request, and each line's
+    scalar fields are checked with EFTTransactionLineForm, so validation cost
+    does not grow in queries with the number of lines.
+    """
+    
+    FIELDS = (
+        'debit_account', 'supplier', 'scheme', 'amount', 'narration', 'reference_number',
+        'employee_number', 'national_id', 'cost_center', 'source_reference',
+    )
+    RELATED = {
+        'debit_account': DebitAccount.objects.filter(is_active=True),
+        'supplier': Supplier.objects.filter(is_active=True).select_related('bank'),
+        'scheme': Scheme.objects.filter(is_active=True).select_related('zone'),
+    }
+    
+    @staticmethod
+    def max_lines():
+        return getattr(settings, 'EFT_BULK_ENTRY_MAX_LINES', 1000)
+    
+    @staticmethod
+    def parse_request(request):
+        """Return the submitted lines as a list of dicts, or raise ValueError"""
+        if request.content_type == 'application/json':
+            try:
+                payload = json.loads(request.body or b'null')
+            except ValueError:
+                raise ValueError("Request body is not valid JSON")
+            lines = payload.get('transactions') if isinstance(payload, dict) else payload
+            if not isinstance(lines, list) or not all(isinstance(line, dict) for line in lines):
+                raise ValueError("Expected a list of transaction objects")
+        else:
+            columns = {field: request.POST.getlist(field) for field in BulkTransactionEntry.FIELDS}
+            count = max((len(values) for values in columns.values()), default=0)
+            for field, values in columns.items():
+                if values and len(values) != count:
+                    raise ValueError(f"Expected {count} values for {field}, got {len(values)}")
+            lines = [
+                {field: values[index] for field, values in columns.items() if values}
+                for index in range(count)
+            ]
+        
+        if not lines:
+            raise ValueError("No transactions submitted")
+        if len(lines) > BulkTransactionEntry.max_lines():
+            raise ValueError(f"At most {BulkTransactionEntry.max_lines()} transactions can be added at once")
+        return lines
+    
+    @staticmethod
+    def load_related(lines):
+        """Fetch every referenced debit account, supplier and scheme, one query per model"""
+        related = {}
+        for field, queryset in BulkTransactionEntry.RELATED.items():
+            ids = set()
+            for line in lines:
+                try:
+                    ids.add(int(line.get(field)))
+                except (TypeError, ValueError):
+                    pass
+            related[field] = queryset.in_bulk(ids) if ids else {}
+        return related
+    
+    @staticmethod
+    def build(lines):
+        """Validate the lines and return (unsaved transactions, errors)
+        
+        errors is a list of {'line': n, 'errors': {field: [messages]}} in the
+        same shape add_transaction returns for a single form.
+        """
+        related = BulkTransactionEntry.load_related(lines)
+        transactions = []
+        errors = []
+        
+        for line_no, line in enumerate(lines, 1):
+            form = EFTTransactionLineForm(line)
+            valid = form.is_valid()
+            line_errors = form.errors.get_json_data() if not valid else {}
+            
+            objects = {}
+            for field in BulkTransactionEntry.RELATED:
+                try:
+                    objects[field] = related[field].get(int(line.get(field)))
+                except (TypeError, ValueError):
+                    objects[field] = None
+                if objects[field] is None:
+                    if line.get(field) in (None, ''):
+                        error = {'message': 'This field is required.', 'code': 'required'}
+                    else:
+                        error = {'message': 'Select a valid choice. That choice is not one of the available choices.',
+                                 'code': 'invalid_choice'}
+                    line_errors.setdefault(field, []).append(error)
+            
+            if line_errors:
+                errors.append({'line': line_no, 'errors': line_errors})
+                continue
+            
+            transaction = form.save(commit=False)
+            transaction.debit_account = objects['debit_account']
+            transaction.supplier = objects['supplier']
+            transaction.scheme = objects['scheme']
+            transaction.zone = objects['scheme'].zone
+            transactions.append(transaction)
+        
+        return transactions, errors
@@ -0,0 +1,148 @@
+# eft_app/bulk_export.py
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import django
+from django.conf import settings
+from django.utils import timezone
+
+from .artifact_cache import EFTArtifactCache
+from .eft_formats import get_format
+from .eft_generator import EFTGenerator
+from .models import EFTBatch
+from .snapshot import BatchSnapshot
+
+def render_snapshot(snapshot, format='txt'):
+    """Process-pool worker: serialize one snapshot to EFT file content"""
+    return EFTGenerator.render_eft_file(snapshot, format)
+
+def render_snapshots(snapshots, format='txt'):
+    """Render snapshots to file content, in a bounded process pool for large bundles
+    
+    Workers only ever receive BatchSnapshot tuples and never open a database
+    connection. They are spawned rather than forked so they cannot inherit
+    the request's connections either.
+    """
+    records = sum(snapshot.record_count for snapshot in snapshots)
+    if len(snapshots) < 2 or records < getattr(settings, 'EFT_EXPORT_PARALLEL_MIN_RECORDS', 20000):
+        return [render_snapshot(snapshot, format) for snapshot in snapshots]
+    
+    workers = getattr(settings, 'EFT_EXPORT_WORKERS', None) or os.cpu_count() or 1
+    workers = min(workers, len(snapshots))
+    
+    # django.setup only loads the app registry so snapshots can be unpickled
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=django.setup) as pool:
+        return list(pool.map(render_snapshot, snapshots, repeat(format)))
+
+class EFTBundleExporter:
+    """Builds one ZIP bundle of RBM files for one or more approved batches
+    
+    Batches over the RBM record limit are split into parts, each written
+    as its own file in the bundle.
+    """
+    
+    MANIFEST_NAME = 'manifest.json'
+    SPOOL_SIZE = 10 * 1024 * 1024  # Bundles larger than this spill to disk
+    
+    @staticmethod
+    def file_name(batch, part=None, format='txt'):
+        suffix = f"_P{part:02d}" if part else ''
+        return f"CRWB_EFT_{batch.batch_reference}{suffix}.{get_format(format).extension}"
+    
+    @staticmethod
+    def build(batches, user=None, format='txt'):
+        """Write the bundle to a temporary file and return it with its manifest
+        
+        Single-file batches already in the artifact cache are reused without
+        reading their transactions; every other file, including all parts of
+        split batches, is loaded, validated and rendered. Raises ValueError
+        if any batch fails validation.
+        """
+        format = get_format(format).name
+        batches = list(batches)
+        entries = []
+        pending = []
+        
+        for batch in batches:
+            digest = content = None
+            if batch.record_count <= EFTGenerator.max_file_records():
+                digest = EFTArtifactCache.stamp(batch)
+                EFTArtifactCache.track(batch.pk, digest)
+                content = EFTArtifactCache.lookup(batch, digest, format)
+            if content is not None:
+                # Cached files were validated when rendered; the batch row describes them
+                entries.append({'batch': batch, 'snapshot': None, 'part': None, 'parts': 1,
+                                'digest': digest, 'content': content})
+                continue
+            
+            snapshot = BatchSnapshot.load(batch)
+            try:
+                EFTGenerator.validate_batch(batch, snapshot)
+            except ValueError as e:
+                raise ValueError(f"{batch.batch_reference}: {e}")
+            
+            parts = EFTGenerator.split_snapshot(snapshot)
+            if len(parts) > 1:
+                # Split files are never cached; each part is rendered fresh
+                for number, part in enumerate(parts, 1):
+                    entry = {'batch': batch, 'snapshot': part, 'part': number, 'parts': len(parts),
+                             'digest': None, 'content': None}
+                    entries.append(entry)
+                    pending.append(entry)
+                continue
+            
+            entry = {'batch': batch, 'snapshot': snapshot, 'part': None, 'parts': 1,
+                     'digest': digest, 'content': None}
+            entries.append(entry)
+            pending.append(entry)
+        
+        if pending:
+            rendered = render_snapshots([entry['snapshot'] for entry in pending], format)
+            for entry, content in zip(pending, rendered):
+                entry['content'] = content
+                if entry['digest'] is not None:
+                    EFTArtifactCache.save(entry['batch'], entry['digest'], {format: content})
+            EFTBatch.objects.filter(
+                pk__in={entry['batch'].pk for entry in pending}
+            ).update(generated_at=timezone.now())
+        
+        manifest = {
+            'generated_at': timezone.now().isoformat(),
+            'generated_by': user.username if user else None,
+            'batch_count': len(batches),
+            'format': format,
+            'files': [],
+        }
+        
+        bundle = tempfile.SpooledTemporaryFile(max_size=EFTBundleExporter.SPOOL_SIZE)
+        with zipfile.ZipFile(bundle, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for entry in entries:
+                batch = entry['batch']
+                summary = batch if entry['snapshot'] is None else entry['snapshot']
+                content = entry['content']
+                data = content.encode('utf-8') if isinstance(content, str) else content
+                name = EFTBundleExporter.file_name(batch, entry['part'], format)
+                archive.writestr(name, data)
+                manifest['files'].append({
+                    'file_name': name,
+                    'batch_reference': str(batch.batch_reference),
+                    'batch_name': summary.batch_name,
+                    'part': entry['part'] or 1,
+                    'parts': entry['parts'],
+                    'currency': summary.currency,
+                    'total_amount': EFTGenerator.format_amount(summary.total_amount),
+                    'record_count': summary.record_count,
+                    'size': len(data),
+                    'checksum': hashlib.sha256(data).hexdigest(),
+                })
+            archive.writestr(EFTBundleExporter.MANIFEST_NAME, json.dumps(manifest, indent=2))
+        
+        bundle.seek(0)
+        return bundle, manifest
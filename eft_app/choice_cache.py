@@ -0,0 +1,94 @@
+# eft_app/choice_cache.py
+import uuid
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.forms.utils import flatatt
+from django.utils.html import escape, format_html_join
+from django.utils.safestring import mark_safe
+
+from .models import Scheme, DebitAccount
+
+class MasterDataChoices:
+    """Cached choice lists and pre-rendered <option> HTML for master data dropdowns
+    
+    Entries are keyed by a version stamp that signals.py replaces whenever a
+    scheme, debit account or zone (part of a scheme's label) is written, so
+    a change shows up on the next render in this process. Other processes
+    see it once their entries time out. Only what is displayed is cached:
+    submitted choices are still validated against the database. Suppliers
+    are too many for a dropdown; see supplier_lookup.py.
+    """
+    
+    VERSION_KEY = 'eft:choices:version'
+    
+    # Active rows offered for each model, in the models' default ordering
+    QUERYSETS = {
+        Scheme: lambda: Scheme.objects.filter(is_active=True).select_related('zone'),
+        DebitAccount: lambda: DebitAccount.objects.filter(is_active=True),
+    }
+    
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'EFT_CHOICE_CACHE_TIMEOUT', 300)
+    
+    @staticmethod
+    def version():
+        version = cache.get(MasterDataChoices.VERSION_KEY)
+        if version is None:
+            version = MasterDataChoices.bump()
+        return version
+    
+    @staticmethod
+    def bump():
+        """Start a new version, orphaning every cached list and fragment"""
+        version = uuid.uuid4().hex
+        cache.set(MasterDataChoices.VERSION_KEY, version, None)
+        return version
+    
+    @staticmethod
+    def _key(model, kind):
+        return f"eft:choices:{MasterDataChoices.version()}:{model._meta.model_name}:{kind}"
+    
+    @staticmethod
+    def choices(model):
+        """[(pk, label)] for the model's active rows"""
+        key = MasterDataChoices._key(model, 'list')
+        choices = cache.get(key)
+        if choices is None:
+            choices = [(obj.pk, str(obj)) for obj in MasterDataChoices.QUERYSETS[model]()]
+            cache.set(key, choices, MasterDataChoices._timeout())
+        return choices
+    
+    @staticmethod
+    def options_html(model):
+        """The <option> elements for the model's active rows, none selected"""
+        key = MasterDataChoices._key(model, 'options')
+        html = cache.get(key)
+        if html is None:
+            html = format_html_join('', '<option value="{}">{}</option>', MasterDataChoices.choices(model))
+            cache.set(key, str(html), MasterDataChoices._timeout())
+        return html
+
+class CachedChoiceSelect(forms.Select):
+    """Select for a ModelChoiceField that renders options from MasterDataChoices
+    
+    Skips the field's queryset and per-option template rendering; only the
+    selected value is patched into the cached fragment.
+    """
+    
+    def __init__(self, model, attrs=None):
+        super().__init__(attrs)
+        self.model = model
+    
+    def render(self, name, value, attrs=None, renderer=None):
+        final_attrs = self.build_attrs(self.attrs, attrs)
+        final_attrs['name'] = name
+        options = MasterDataChoices.options_html(self.model)
+        if value in (None, ''):
+            empty = '<option value="" selected>---------</option>'
+        else:
+            empty = '<option value="">---------</option>'
+            marker = f'<option value="{escape(value)}">'
+            options = options.replace(marker, f'<option value="{escape(value)}" selected>', 1)
+        return mark_safe(f'<select{flatatt(final_attrs)}>{empty}{options}</select>')
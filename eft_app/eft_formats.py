@@ -0,0 +1,144 @@
+# eft_app/eft_formats.py
+import csv
+import tempfile
+from io import BytesIO, StringIO
+from openpyxl import Workbook
+
+class Echo:
+    """Pseudo-buffer whose write() returns the value instead of storing it"""
+    
+    def write(self, value):
+        return value
+
+# Registered format instances by name, in registration order
+FORMATS = {}
+
+def register_format(format_class):
+    """Class decorator adding a format to the registry under its name"""
+    FORMATS[format_class.name] = format_class()
+    return format_class
+
+class EFTFormat:
+    """Base class for EFT output formats
+    
+    A format turns an iterable of records (lists of field strings, header
+    first) into file content. Every format reads the same records, so no
+    format is derived from another format's output.
+    """
+    
+    name = None
+    label = None
+    extension = None
+    content_type = None
+    binary = False
+    
+    def render(self, records):
+        """Return the whole file as str (text formats) or bytes (binary formats)"""
+        raise NotImplementedError
+    
+    def stream(self, records):
+        """Return an iterator of file chunks for StreamingHttpResponse"""
+        raise NotImplementedError
+
+class DelimitedFormat(EFTFormat):
+    """Semicolon-delimited text, one record per line"""
+    
+    writer_options = {}
+    
+    def writer(self, output):
+        return csv.writer(output, delimiter=';', **self.writer_options)
+    
+    def read(self, lines):
+        """Yield (line_no, fields) for each record in lines, in the writer's own dialect
+        
+        Escaped delimiters come back as field text, so a file this format
+        wrote reads back field for field. Blank lines yield no fields;
+        line_no is the record's first line. Raises csv.Error on an
+        unreadable record.
+        """
+        reader = csv.reader(lines, delimiter=';', **self.writer_options)
+        line_no = 1
+        for fields in reader:
+            if len(fields) == 1 and not fields[0].strip():
+                fields = []
+            yield line_no, fields
+            line_no = reader.line_num + 1
+    
+    def render(self, records):
+        output = StringIO()
+        writer = self.writer(output)
+        writer.writerows(records)
+        return output.getvalue()
+    
+    def stream(self, records):
+        writer = self.writer(Echo())
+        return (writer.writerow(record) for record in records)
+
+@register_format
+class TXTFormat(DelimitedFormat):
+    """RBM upload file: fields are never quoted, delimiters are backslash-escaped"""
+    name = 'txt'
+    label = 'TXT'
+    extension = 'txt'
+    content_type = 'text/plain; charset=utf-8'
+    writer_options = {'quoting': csv.QUOTE_NONE, 'escapechar': '\\'}
+
+@register_format
+class CSVFormat(DelimitedFormat):
+    """Semicolon CSV with standard quoting"""
+    name = 'csv'
+    label = 'CSV'
+    extension = 'csv'
+    content_type = 'text/csv; charset=utf-8'
+
+@register_format
+class XLSXFormat(EFTFormat):
+    """Excel workbook written with openpyxl's write-only mode"""
+    name = 'xlsx'
+    label = 'Excel'
+    extension = 'xlsx'
+    content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    binary = True
+    
+    SHEET_TITLE = 'EFT'
+    CHUNK_SIZE = 64 * 1024
+    
+    def write(self, records, output):
+        # Every field stays text so sequence numbers and account numbers keep their leading zeros
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.SHEET_TITLE)
+        for record in records:
+            sheet.append(record)
+        workbook.save(output)
+    
+    def render(self, records):
+        output = BytesIO()
+        self.write(records, output)
+        return output.getvalue()
+    
+    def stream(self, records):
+        # The zip container needs its directory at the end, so spool then stream
+        output = tempfile.TemporaryFile()
+        self.write(records, output)
+        output.seek(0)
+        
+        def chunks():
+            with output:
+                while True:
+                    chunk = output.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+        
+        return chunks()
+
+def format_choices():
+    """(name, label) pairs for every registered format, for model and form choices"""
+    return [(name, output_format.label) for name, output_format in FORMATS.items()]
+
+def get_format(name):
+    """Return the registered format for a name like 'txt', or raise ValueError"""
+    try:
+        return FORMATS[(name or '').lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported export format: {name}")
@@ -1,146 +1,235 @@
 # eft_app/eft_generator.py
-import csv
-from io import StringIO
-from django.http import HttpResponse
+from django.conf import settings
+from django.db.models import Sum, Count
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils import timezone
+from . import money
 from .models import EFTBatch
+from .eft_formats import get_format
+from .eft_validator import EFTFileValidator
+from .snapshot import BatchSnapshot, TransactionRow, incomplete_rows, transaction_rows
 
 class EFTGenerator:
     """Generates RBM-compliant EFT files"""
     
     @staticmethod
-    def validate_batch(batch):
-        """Validate batch before generation"""
-        if batch.status != 'APPROVED':
-            raise ValueError("Only approved batches can be exported")
-        
-        transactions = batch.transactions.all()
-        
-        if transactions.count() == 0:
+    def check_totals(batch, total_amount, record_count):
+        """Check computed totals against the batch header"""
+        if record_count == 0:
             raise ValueError("Batch has no transactions")
         
-        # Calculate totals
-        total_amount = sum(t.amount for t in transactions)
-        record_count = transactions.count()
-        
-        # Validate totals match batch
-        if abs(total_amount - batch.total_amount) > 0.01:  # Allow small floating point differences
+        # Validate totals match batch, exactly, in tambala
+        if money.to_minor(total_amount) != money.to_minor(batch.total_amount):
             raise ValueError(f"Transaction total ({total_amount}) doesn't match batch total ({batch.total_amount})")
         
         if record_count != batch.record_count:
             raise ValueError(f"Transaction count ({record_count}) doesn't match batch record count ({batch.record_count})")
+    
+    @staticmethod
+    def validate_batch(batch, snapshot=None):
+        """Validate batch before generation"""
+        if batch.status != 'APPROVED':
+            raise ValueError("Only approved batches can be exported")
+        
+        if snapshot is None:
+            snapshot = BatchSnapshot.load(batch)
+        
+        EFTGenerator.check_totals(batch, snapshot.total_amount, snapshot.record_count)
         
         # Validate all required fields are present
-        for trans in transactions:
-            if not trans.debit_account:
-                raise ValueError(f"Transaction {trans.sequence_number}: Debit account is required")
-            if not trans.supplier:
-                raise ValueError(f"Transaction {trans.sequence_number}: Supplier is required")
-            if not trans.supplier.bank:
-                raise ValueError(f"Transaction {trans.sequence_number}: Supplier bank is required")
-            if not trans.scheme:
-                raise ValueError(f"Transaction {trans.sequence_number}: Scheme is required")
-            if not trans.zone:
-                raise ValueError(f"Transaction {trans.sequence_number}: Zone is required")
+        for row in snapshot.rows:
+            EFTGenerator.check_row(row)
         
         return True
     
+    @staticmethod
+    def check_row(row):
+        """Raise ValueError if a TransactionRow lacks a field the body record needs"""
+        if not row.debit_account_number:
+            raise ValueError(f"Transaction {row.sequence_number}: Debit account is required")
+        if not row.supplier_name:
+            raise ValueError(f"Transaction {row.sequence_number}: Supplier is required")
+        if not row.swift_code:
+            raise ValueError(f"Transaction {row.sequence_number}: Supplier bank is required")
+        if not row.scheme_code:
+            raise ValueError(f"Transaction {row.sequence_number}: Scheme is required")
+        if not row.zone_code:
+            raise ValueError(f"Transaction {row.sequence_number}: Zone is required")
+    
     @staticmethod
     def format_amount(amount):
         """Format amount to 2 decimal places without thousands separator"""
-        return f"{float(amount):.2f}"
+        return money.format_amount(amount)
     
     @staticmethod
-    def generate_eft_file(batch):
-        """Generate EFT file content for approved batch"""
-        
-        # Validate batch
-        EFTGenerator.validate_batch(batch)
-        
-        transactions = batch.transactions.all().order_by('sequence_number')
-        
-        # Calculate totals
-        total_amount = sum(t.amount for t in transactions)
-        record_count = transactions.count()
-        
-        output = StringIO()
-        writer = csv.writer(output, delimiter=';', quoting=csv.QUOTE_NONE, escapechar='\\')
-        
-        # Write header record (Type 0)
+    def header_record(batch, total_amount, record_count):
+        """Build the header record (Type 0)"""
         # Format: 0;<BATCH_NAME>;MWK;<TOTAL_AMOUNT>;<RECORD_COUNT>
-        writer.writerow([
+        return [
             '0',
             batch.batch_name[:50],  # Truncate if necessary
             batch.currency,
             EFTGenerator.format_amount(total_amount),
             f"{record_count:04d}"
-        ])
-        
-        # Write body records (Type 1)
+        ]
+    
+    @staticmethod
+    def body_record(batch, row):
+        """Build a body record (Type 1) from a snapshot TransactionRow"""
         # Format: 1;<SEQ_NO>;MWK;<DEBIT_ACC>;<ZONE>;<AMOUNT>;<BENEF_NAME>;<SCHEME_CODE>;;;<CREDIT_REF>;<BANK_SWIFT>;<BENEF_ACC>;;;<REFERENCE>;<NARRATION>
-        for trans in transactions:
-            writer.writerow([
-                '1',
-                trans.sequence_number.zfill(4),
-                batch.currency,
-                trans.debit_account.account_number,
-                trans.zone.zone_code,
-                EFTGenerator.format_amount(trans.amount),
-                trans.supplier.supplier_name[:55],  # Truncate to 55 chars
-                trans.scheme.scheme_code,
-                '',  # Empty field
-                '',  # Empty field
-                trans.supplier.credit_reference or '',
-                trans.supplier.bank.swift_code,
-                trans.supplier.account_number,
-                '',  # Empty field
-                '',  # Empty field
-                trans.reference_number or '',
-                trans.narration[:200] if trans.narration else ''  # Truncate to 200 chars
-            ])
-        
-        content = output.getvalue()
-        output.close()
-        
-        # Save to batch (optional - can be stored in database)
-        batch.generated_file = content
+        return [
+            '1',
+            row.sequence_number.zfill(4),
+            batch.currency,
+            row.debit_account_number,
+            row.zone_code,
+            EFTGenerator.format_amount(row.amount),
+            row.supplier_name[:55],  # Truncate to 55 chars
+            row.scheme_code,
+            '',  # Empty field
+            '',  # Empty field
+            row.credit_reference or '',
+            row.swift_code,
+            row.account_number,
+            '',  # Empty field
+            '',  # Empty field
+            row.reference_number or '',
+            row.narration[:200] if row.narration else ''  # Truncate to 200 chars
+        ]
+    
+    @staticmethod
+    def max_file_records():
+        """Largest number of body records one RBM file can hold"""
+        return getattr(settings, 'EFT_MAX_FILE_RECORDS', 9999)
+    
+    @staticmethod
+    def check_single_file(record_count):
+        """Refuse to write more records than one RBM file can hold"""
+        if record_count > EFTGenerator.max_file_records():
+            raise ValueError(f"Batch has {record_count} transactions; files over "
+                             f"{EFTGenerator.max_file_records()} records must be exported as split parts")
+    
+    @staticmethod
+    def split_snapshot(snapshot, max_records=None):
+        """Split a snapshot into RBM-sized parts
+        
+        Each part gets its own totals, a restarted 0001 sequence and a
+        _Pnn suffix on the header name. Small snapshots come back as [snapshot].
+        """
+        max_records = max_records or EFTGenerator.max_file_records()
+        if snapshot.record_count <= max_records:
+            return [snapshot]
+        
+        parts = []
+        for start in range(0, snapshot.record_count, max_records):
+            rows = tuple(
+                row._replace(sequence_number=str(number).zfill(4))
+                for number, row in enumerate(snapshot.rows[start:start + max_records], 1)
+            )
+            suffix = f"_P{len(parts) + 1:02d}"
+            parts.append(snapshot._replace(
+                batch_name=snapshot.batch_name[:50 - len(suffix)] + suffix,
+                rows=rows,
+                total_amount=money.from_minor(money.sum_minor(row.amount for row in rows)),
+                record_count=len(rows),
+            ))
+        return parts
+    
+    @staticmethod
+    def eft_records(batch, total_amount, record_count, rows):
+        """Yield the header record, then one body record per TransactionRow"""
+        yield EFTGenerator.header_record(batch, total_amount, record_count)
+        for row in rows:
+            yield EFTGenerator.body_record(batch, row)
+    
+    @staticmethod
+    def render_eft_file(snapshot, format='txt'):
+        """Serialize a BatchSnapshot in any registered format (str, or bytes for binary formats)"""
+        records = EFTGenerator.eft_records(snapshot, snapshot.total_amount, snapshot.record_count, snapshot.rows)
+        return get_format(format).render(records)
+    
+    @staticmethod
+    def generate_eft_file(batch, snapshot=None, format='txt'):
+        """Generate EFT file content for approved batch in one format"""
+        if snapshot is None:
+            snapshot = BatchSnapshot.load(batch)
+        
+        # Validate batch
+        EFTGenerator.validate_batch(batch, snapshot)
+        EFTGenerator.check_single_file(snapshot.record_count)
+        
+        content = EFTGenerator.render_eft_file(snapshot, format)
+        
+        # File bodies are persisted by EFTArtifactCache; only stamp the batch here
         batch.generated_at = timezone.now()
-        batch.save(update_fields=['generated_file', 'generated_at'])
+        batch.save(update_fields=['generated_at'])
         
         return content
     
     @staticmethod
-    def generate_eft_content(batch, format='txt'):
+    def generate_eft_content(batch, format='txt', snapshot=None):
         """Generate EFT content in specified format"""
-        content = EFTGenerator.generate_eft_file(batch)
-        
-        if format.lower() == 'csv':
-            # For CSV, we need to ensure proper formatting
-            lines = content.split('\n')
-            csv_output = StringIO()
-            csv_writer = csv.writer(csv_output, delimiter=';')
-            for line in lines:
-                if line.strip():
-                    csv_writer.writerow(line.split(';'))
-            result = csv_output.getvalue()
-            csv_output.close()
-            return result
-        else:
-            return content
+        if snapshot is None:
+            snapshot = BatchSnapshot.load(batch)
+        
+        # Every format is written straight from the snapshot rows
+        return EFTGenerator.generate_eft_file(batch, snapshot, format)
+    
+    @staticmethod
+    def stream_eft_lines(batch, format='txt', chunk_size=None):
+        """Validate the batch, then return an iterator of EFT file chunks
+        
+        Totals and required fields are checked with two small queries up
+        front, so a bad batch fails before the response starts. Transaction
+        rows are then read in chunks with their joins resolved in the query,
+        so memory stays flat regardless of batch size.
+        """
+        if batch.status != 'APPROVED':
+            raise ValueError("Only approved batches can be exported")
+        
+        output_format = get_format(format)
+        
+        chunk_size = chunk_size or getattr(settings, 'EFT_STREAM_CHUNK_SIZE', 500)
+        
+        totals = batch.transactions.aggregate(total_amount=Sum('amount'), record_count=Count('id'))
+        EFTGenerator.check_totals(batch, totals['total_amount'] or 0, totals['record_count'])
+        EFTGenerator.check_single_file(totals['record_count'])
+        
+        # One LIMIT 1 query finds the first incomplete line before any chunk is sent
+        incomplete = incomplete_rows(batch).first()
+        if incomplete is not None:
+            EFTGenerator.check_row(TransactionRow._make(incomplete))
+        
+        rows = (TransactionRow._make(values) for values in transaction_rows(batch).iterator(chunk_size=chunk_size))
+        records = EFTGenerator.eft_records(batch, totals['total_amount'], totals['record_count'], rows)
+        
+        return output_format.stream(records)
+    
+    @staticmethod
+    def export_to_stream(chunks, filename, format='txt'):
+        """Export an iterator of file chunks as a streaming download"""
+        output_format = get_format(format)
+        response = StreamingHttpResponse(chunks, content_type=output_format.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output_format.extension}"'
+        return response
+    
+    @staticmethod
+    def export_to_file(content, filename, format='txt'):
+        """Export content as a download in any registered format"""
+        output_format = get_format(format)
+        response = HttpResponse(content, content_type=output_format.content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{output_format.extension}"'
+        return response
     
     @staticmethod
     def export_to_txt(content, filename):
         """Export content to TXT file"""
-        response = HttpResponse(content, content_type='text/plain; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="{filename}.txt"'
-        return response
+        return EFTGenerator.export_to_file(content, filename, 'txt')
     
     @staticmethod
     def export_to_csv(content, filename):
         """Export content to CSV file"""
-        response = HttpResponse(content, content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        return response
+        return EFTGenerator.export_to_file(content, filename, 'csv')
     
     @staticmethod
     def generate_sample_eft():
@@ -157,49 +246,12 @@ class EFTGenerator:
     @staticmethod
     def validate_eft_structure(content):
         """Validate EFT file structure"""
-        lines = content.strip().split('\n')
-        
-        if len(lines) == 0:
-            return False, "Empty file"
-        
-        # Check header
-        header_parts = lines[0].split(';')
-        if len(header_parts) != 5:
-            return False, "Invalid header format"
-        
-        if header_parts[0] != '0':
-            return False, "Header must start with 0"
-        
-        try:
-            record_count = int(header_parts[4])
-        except ValueError:
-            return False, "Invalid record count in header"
-        
-        # Check body records
-        if len(lines) - 1 != record_count:
-            return False, f"Record count mismatch: header says {record_count}, file has {len(lines)-1}"
-        
-        total_amount = 0
-        for i, line in enumerate(lines[1:], 1):
-            parts = line.split(';')
-            if len(parts) != 17:
-                return False, f"Line {i}: Invalid number of fields ({len(parts)} instead of 17)"
-            
-            if parts[0] != '1':
-                return False, f"Line {i}: Body record must start with 1"
-            
-            try:
-                amount = float(parts[5])
-                total_amount += amount
-            except ValueError:
-                return False, f"Line {i}: Invalid amount format"
-        
-        # Validate total amount
-        try:
-            header_amount = float(header_parts[3])
-            if abs(total_amount - header_amount) > 0.01:
-                return False, f"Total amount mismatch: header says {header_amount}, sum is {total_amount}"
-        except ValueError:
-            return False, "Invalid total amount in header"
-        
-        return True, "EFT file structure is valid"
\ No newline at end of file
+        report = EFTFileValidator(max_errors=1).validate_lines(content.splitlines())
+        
+        if report['errors']:
+            error = report['errors'][0]
+            if error['line'] > 1:
+                return False, f"Line {error['line'] - 1}: {error['message']}"
+            return False, error['message']
+        
+        return True, "EFT file structure is valid"
@@ -0,0 +1,168 @@
+# eft_app/eft_importer.py
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from . import money
+from .models import Scheme, Zone, Supplier, DebitAccount, EFTBatch, EFTTransaction
+from .eft_formats import get_format
+from .eft_validator import EFTFileValidator
+
+class EFTImportError(ValueError):
+    """Raised when an EFT file cannot be imported; carries every line error"""
+    
+    def __init__(self, errors):
+        self.errors = errors
+        first = errors[0] if errors else {'line': 0, 'message': 'Import failed'}
+        more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+        super().__init__(f"Line {first['line']}: {first['message']}{more}")
+
+class EFTImporter:
+    """Imports RBM-format EFT files into DRAFT batches
+    
+    The file is checked with EFTFileValidator, every code in it is resolved
+    against master data with one query per model, and the transactions are
+    written with bulk_create.
+    """
+    
+    @staticmethod
+    def parse(lines):
+        """Split file lines into the header fields and (line_no, fields) body records
+        
+        Lines are read in the TXT format's dialect, the same reader
+        EFTFileValidator uses, so escaped delimiters stay in their field.
+        """
+        header = None
+        records = []
+        for line_no, parts in get_format('txt').read(lines):
+            if not parts:
+                continue
+            if header is None:
+                header = parts
+            else:
+                records.append((line_no, parts))
+        return header, records
+    
+    @staticmethod
+    def resolve_master_data(records):
+        """Look up every code used in the file, one query per model"""
+        debit_numbers = {parts[3] for _, parts in records}
+        zone_codes = {parts[4] for _, parts in records}
+        scheme_codes = {parts[7] for _, parts in records}
+        swift_codes = {parts[11] for _, parts in records}
+        account_numbers = {parts[12] for _, parts in records}
+        
+        suppliers = {}
+        for supplier in Supplier.objects.filter(
+            is_active=True,
+            bank__is_active=True,
+            bank__swift_code__in=swift_codes,
+            account_number__in=account_numbers,
+        ).select_related('bank').order_by('id'):
+            suppliers.setdefault((supplier.bank.swift_code, supplier.account_number), supplier)
+        
+        return {
+            'debit_accounts': DebitAccount.objects.filter(
+                is_active=True, account_number__in=debit_numbers
+            ).in_bulk(field_name='account_number'),
+            'zones': Zone.objects.filter(
+                is_active=True, zone_code__in=zone_codes
+            ).in_bulk(field_name='zone_code'),
+            'schemes': {
+                scheme.scheme_code: scheme
+                for scheme in Scheme.objects.filter(
+                    is_active=True, scheme_code__in=scheme_codes
+                ).select_related('zone')
+            },
+            'suppliers': suppliers,
+        }
+    
+    @staticmethod
+    def build_transactions(records, master):
+        """Turn body records into unsaved EFTTransactions, collecting errors"""
+        transactions = []
+        errors = []
+        
+        for line_no, parts in records:
+            line_errors = []
+            
+            debit_account = master['debit_accounts'].get(parts[3])
+            if debit_account is None:
+                line_errors.append(f"Unknown or inactive debit account {parts[3]}")
+            
+            scheme = master['schemes'].get(parts[7])
+            zone = master['zones'].get(parts[4])
+            if scheme is None:
+                line_errors.append(f"Unknown or inactive scheme {parts[7]}")
+            elif zone is None:
+                line_errors.append(f"Unknown or inactive zone {parts[4]}")
+            elif scheme.zone_id != zone.id:
+                line_errors.append(f"Scheme {parts[7]} belongs to zone {scheme.zone.zone_code}, not {parts[4]}")
+            
+            supplier = master['suppliers'].get((parts[11], parts[12]))
+            if supplier is None:
+                line_errors.append(f"No active supplier with account {parts[12]} at {parts[11]}")
+            
+            # Rows are bulk-created, so the model's MinValueValidator never runs
+            amount_minor = money.parse_minor(parts[5])
+            if amount_minor is None:
+                line_errors.append(f"Invalid amount {parts[5]}")
+            elif amount_minor <= 0:
+                line_errors.append(f"Amount {parts[5]} must be greater than zero")
+            
+            if line_errors:
+                errors.extend({'line': line_no, 'message': message} for message in line_errors)
+                continue
+            
+            transactions.append(EFTTransaction(
+                debit_account=debit_account,
+                supplier=supplier,
+                scheme=scheme,
+                zone=zone,
+                amount=money.from_minor(amount_minor),
+                reference_number=parts[15][:16],
+                narration=parts[16][:200],
+            ))
+        
+        return transactions, errors
+    
+    @staticmethod
+    def import_lines(lines, user, batch_name=None):
+        """Create a DRAFT batch from RBM file lines and return it
+        
+        Raises EFTImportError listing every problem if the file is malformed
+        or refers to master data that does not exist.
+        """
+        lines = list(lines)
+        
+        report = EFTFileValidator().validate_lines(lines)
+        if not report['valid']:
+            raise EFTImportError(report['errors'])
+        
+        header, records = EFTImporter.parse(lines)
+        if header[2] != EFTFileValidator.CURRENCY:
+            raise EFTImportError([{'line': 1, 'message': f"Header currency must be {EFTFileValidator.CURRENCY}"}])
+        master = EFTImporter.resolve_master_data(records)
+        transactions, errors = EFTImporter.build_transactions(records, master)
+        if errors:
+            raise EFTImportError(errors)
+        
+        debit_accounts = {t.debit_account_id for t in transactions}
+        
+        with db_transaction.atomic():
+            batch = EFTBatch.objects.create(
+                batch_name=(batch_name or header[1])[:100],
+                currency=header[2],
+                debit_account=transactions[0].debit_account if len(debit_accounts) == 1 else None,
+                created_by=user,
+                batch_reference=f"CRWB-{timezone.now().strftime('%Y%m%d-%H%M%S')}",
+            )
+            batch.bulk_add_transactions(transactions)
+        
+        return batch
+    
+    @staticmethod
+    def import_file(path_or_file, user, batch_name=None, encoding='utf-8'):
+        """Import a file given by path or an open text handle"""
+        if hasattr(path_or_file, 'read'):
+            return EFTImporter.import_lines(path_or_file, user, batch_name)
+        with open(path_or_file, 'r', encoding=encoding, newline='') as handle:
+            return EFTImporter.import_lines(handle, user, batch_name)
@@ -0,0 +1,127 @@
+# eft_app/eft_validator.py
+import csv
+from . import money
+from .eft_formats import get_format
+
+class EFTFileValidator:
+    """Streaming validator for RBM EFT files
+    
+    Reads one record at a time in the TXT format's own dialect (so escaped
+    delimiters stay inside their field), keeps totals as integer tambala
+    (cents) so they are exact, and collects every line-level error in a
+    single pass.
+    """
+    
+    HEADER_FIELDS = 5
+    BODY_FIELDS = 17
+    CURRENCY = 'MWK'  # RBM files carry kwacha only
+    
+    def __init__(self, max_errors=None):
+        self.max_errors = max_errors
+    
+    @staticmethod
+    def parse_amount(value):
+        """Parse a '1234.56' amount into integer cents, or None if invalid"""
+        return money.parse_minor(value)
+    
+    @staticmethod
+    def format_cents(cents):
+        return money.format_minor(cents)
+    
+    def validate_file(self, path_or_file, encoding='utf-8'):
+        """Validate a file given by path or an open text handle"""
+        if hasattr(path_or_file, 'read'):
+            return self.validate_lines(path_or_file)
+        with open(path_or_file, 'r', encoding=encoding, newline='') as handle:
+            return self.validate_lines(handle)
+    
+    def validate_lines(self, lines):
+        """Validate an iterable of lines and return a report dict"""
+        errors = []
+        truncated = False
+        
+        def error(line_no, message):
+            nonlocal truncated
+            if self.max_errors is not None and len(errors) >= self.max_errors:
+                truncated = True
+                return
+            errors.append({'line': line_no, 'message': message})
+        
+        header = None
+        header_count = None
+        header_cents = None
+        body_count = 0
+        total_cents = 0
+        pending_blank = None
+        line_no = 0
+        
+        try:
+            for line_no, parts in get_format('txt').read(lines):
+                if not parts:
+                    # Trailing blank lines are tolerated; blank lines between records are not
+                    pending_blank = pending_blank or line_no
+                    continue
+                if pending_blank is not None and header is not None:
+                    error(pending_blank, "Blank line between records")
+                pending_blank = None
+                
+                if header is None:
+                    header = parts
+                    if len(parts) != self.HEADER_FIELDS:
+                        error(line_no, "Invalid header format")
+                        continue
+                    if parts[0] != '0':
+                        error(line_no, "Header must start with 0")
+                    if parts[2] != self.CURRENCY:
+                        error(line_no, f"Header currency must be {self.CURRENCY}, not {parts[2][:10]!r}")
+                    try:
+                        header_count = int(parts[4])
+                    except ValueError:
+                        error(line_no, "Invalid record count in header")
+                    header_cents = self.parse_amount(parts[3])
+                    if header_cents is None:
+                        error(line_no, "Invalid total amount in header")
+                    continue
+                
+                body_count += 1
+                
+                if len(parts) != self.BODY_FIELDS:
+                    error(line_no, f"Invalid number of fields ({len(parts)} instead of {self.BODY_FIELDS})")
+                    continue
+                
+                if parts[0] != '1':
+                    error(line_no, "Body record must start with 1")
+                
+                if parts[1] != str(body_count).zfill(4):
+                    error(line_no, f"Sequence number {parts[1]} out of order (expected {str(body_count).zfill(4)})")
+                
+                cents = self.parse_amount(parts[5])
+                if cents is None:
+                    error(line_no, "Invalid amount format")
+                else:
+                    if cents <= 0:
+                        error(line_no, f"Amount {parts[5]} must be greater than zero")
+                    total_cents += cents
+        except csv.Error as exc:
+            error(line_no + 1, f"Unreadable record: {exc}")
+        
+        if header is None:
+            error(0, "Empty file")
+        else:
+            if header_count is not None and header_count != body_count:
+                error(1, f"Record count mismatch: header says {header_count}, file has {body_count}")
+            if header_cents is not None and header_cents != total_cents:
+                error(1, f"Total amount mismatch: header says {self.format_cents(header_cents)}, "
+                         f"sum is {self.format_cents(total_cents)}")
+        
+        return {
+            'valid': not errors and not truncated,
+            'lines_read': line_no,
+            'record_count': body_count,
+            'header_record_count': header_count,
+            'total_amount': self.format_cents(total_cents),
+            'header_total_amount': self.format_cents(header_cents) if header_cents is not None else None,
+            'error_count': len(errors),
+            'errors_truncated': truncated,
+            'errors': errors,
+        }
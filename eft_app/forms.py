@@ -6,6 +6,8 @@ from .models import (
     Bank, Zone, Scheme, Supplier, DebitAccount,
     EFTBatch, EFTTransaction, ApprovalAuditLog
 )
+from .choice_cache import CachedChoiceSelect
+from .supplier_lookup import SupplierTypeahead
 
 class UserRegistrationForm(UserCreationForm):
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={'class': 'form-control'}))
@@ -170,6 +172,18 @@ class EFTBatchForm(forms.ModelForm):
             'file_reference': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'e.g., WTC01-31.01.2023'}),
         }
 
+class EFTImportForm(forms.Form):
+    eft_file = forms.FileField(
+        label='EFT File',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.txt,.csv'}),
+        help_text='RBM-format file with a 0; header line and 1; transaction lines'
+    )
+    batch_name = forms.CharField(
+        required=False,
+        max_length=100,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Leave blank to use the name in the file header'})
+    )
+
 class EFTTransactionForm(forms.ModelForm):
     class Meta:
         model = EFTTransaction
@@ -179,9 +193,10 @@ class EFTTransactionForm(forms.ModelForm):
             'national_id', 'cost_center', 'source_reference'
         ]
         widgets = {
-            'debit_account': forms.Select(attrs={'class': 'form-control'}),
-            'supplier': forms.Select(attrs={'class': 'form-control'}),
-            'scheme': forms.Select(attrs={'class': 'form-control'}),
+            # Options come pre-rendered from the master data choice cache; suppliers are searched instead
+            'debit_account': CachedChoiceSelect(DebitAccount, attrs={'class': 'form-control'}),
+            'supplier': SupplierTypeahead(attrs={'class': 'form-control'}),
+            'scheme': CachedChoiceSelect(Scheme, attrs={'class': 'form-control'}),
             'amount': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01'}),
             'narration': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Description of transaction'}),
             'reference_number': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Invoice Number'}),
@@ -200,6 +215,15 @@ class EFTTransactionForm(forms.ModelForm):
         self.fields['reference_number'].help_text = "Payees Reference Number/Invoice Number"
         self.fields['narration'].help_text = "Description of the transaction (max 200 chars)"
 
+class EFTTransactionLineForm(forms.ModelForm):
+    """One line of a bulk entry; foreign keys are resolved by the caller from preloaded master data"""
+    class Meta:
+        model = EFTTransaction
+        fields = [
+            'amount', 'narration', 'reference_number', 'employee_number',
+            'national_id', 'cost_center', 'source_reference'
+        ]
+
 class BatchApprovalForm(forms.Form):
     remarks = forms.CharField(
         required=False,
@@ -0,0 +1,65 @@
+# eft_app/legacy_files.py
+from django.db import connections
+
+from .artifact_cache import EFTArtifactCache
+from .models import EFTBatch, EFTArtifact
+
+class LegacyGeneratedFiles:
+    """Moves file bodies from the old EFTBatch.generated_file column into EFTArtifact
+    
+    Installs generate their own migrations, so the one dropping the column
+    cannot carry a data step: pre_migrate reads the bodies still in the
+    column and post_migrate stores them once the artifact table exists
+    (see apps.py). load_backup does the same for dumpdata backups taken
+    while the field existed.
+    """
+    
+    FIELD = 'generated_file'
+    
+    _pending = {}  # Bodies read before a migrate run, stored after it
+    
+    @staticmethod
+    def read_column(using='default'):
+        """{batch pk: body} for the non-empty bodies still in the database column, or {} once it is gone"""
+        connection = connections[using]
+        table = EFTBatch._meta.db_table
+        field = LegacyGeneratedFiles.FIELD
+        with connection.cursor() as cursor:
+            if table not in connection.introspection.table_names(cursor):
+                return {}
+            columns = {column.name for column in connection.introspection.get_table_description(cursor, table)}
+            if field not in columns:
+                return {}
+            quote = connection.ops.quote_name
+            cursor.execute(f"SELECT {quote('id')}, {quote(field)} FROM {quote(table)} WHERE {quote(field)} <> ''")
+            return dict(cursor.fetchall())
+    
+    @staticmethod
+    def strip_fixture(objects):
+        """Drop the field from serialized batch objects in place, returning {batch pk: body} for non-empty ones"""
+        bodies = {}
+        for obj in objects:
+            if obj.get('model') == 'eft_app.eftbatch':
+                body = obj.get('fields', {}).pop(LegacyGeneratedFiles.FIELD, None)
+                if body:
+                    bodies[obj['pk']] = body
+        return bodies
+    
+    @staticmethod
+    def store(bodies, using='default'):
+        """Store each body as its batch's TXT artifact under the batch's current stamp; returns the count"""
+        stored = 0
+        for batch in EFTBatch.objects.using(using).filter(pk__in=bodies):
+            EFTArtifact.store(batch, 'txt', EFTArtifactCache.stamp(batch), bodies[batch.pk])
+            stored += 1
+        return stored
+    
+    @staticmethod
+    def before_migrate(sender, using='default', **kwargs):
+        LegacyGeneratedFiles._pending.update(LegacyGeneratedFiles.read_column(using))
+    
+    @staticmethod
+    def after_migrate(sender, using='default', **kwargs):
+        bodies, LegacyGeneratedFiles._pending = LegacyGeneratedFiles._pending, {}
+        if bodies:
+            LegacyGeneratedFiles.store(bodies, using)
@@ -0,0 +1,32 @@
+# eft_app/management/commands/archive_batches.py
+from django.core.management.base import BaseCommand, CommandError
+from eft_app.archive import BatchArchiver
+
+class Command(BaseCommand):
+    help = 'Moves exported/approved batches past the retention age into the archive tables'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None,
+                            help='Archive batches approved more than this many days ago (default: EFT_ARCHIVE_AFTER_DAYS)')
+        parser.add_argument('--chunk-size', type=int, default=100, help='Batches moved per transaction (default: 100)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived without moving it')
+    
+    def handle(self, *args, **options):
+        if options['days'] is not None and options['days'] < 0:
+            raise CommandError('--days must not be negative')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1')
+        
+        cutoff = BatchArchiver.cutoff(options['days'])
+        eligible = BatchArchiver.eligible(cutoff)
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"Would archive {eligible.count()} batch(es) approved before {cutoff:%Y-%m-%d %H:%M}"
+            ))
+            return
+        
+        archived = 0
+        for archived in BatchArchiver.archive(cutoff, options['chunk_size']):
+            self.stdout.write(f"Archived {archived} batch(es)...")
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} batch(es) approved before {cutoff:%Y-%m-%d %H:%M}"))
@@ -0,0 +1,33 @@
+# eft_app/management/commands/import_eft.py
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from eft_app.eft_importer import EFTImporter, EFTImportError
+
+class Command(BaseCommand):
+    help = 'Imports an RBM EFT file into a new DRAFT batch'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the EFT file to import')
+        parser.add_argument('--user', required=True, help='Username the batch is created for')
+        parser.add_argument('--name', default=None, help='Batch name (default: the name in the file header)')
+        parser.add_argument('--encoding', default='utf-8', help='File encoding (default: utf-8)')
+    
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+        
+        try:
+            batch = EFTImporter.import_file(options['path'], user, options['name'], options['encoding'])
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        except EFTImportError as e:
+            for error in e.errors:
+                self.stderr.write(f"Line {error['line']}: {error['message']}")
+            raise CommandError(f"Import failed ({len(e.errors)} error(s))")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"Created batch {batch.batch_reference} with {batch.record_count} transactions "
+            f"totalling {batch.total_amount} {batch.currency}"
+        ))
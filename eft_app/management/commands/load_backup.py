@@ -0,0 +1,33 @@
+# eft_app/management/commands/load_backup.py
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from eft_app.legacy_files import LegacyGeneratedFiles
+
+class Command(BaseCommand):
+    help = 'Loads a dumpdata JSON backup, moving bodies of the old EFTBatch.generated_file field into EFTArtifact'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the JSON backup (e.g. eft_app/fixtures/all_data.json)')
+    
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as handle:
+                objects = json.load(handle)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        
+        # loaddata rejects fields the models no longer have, so load a stripped copy
+        bodies = LegacyGeneratedFiles.strip_fixture(objects)
+        with tempfile.TemporaryDirectory() as directory:
+            stripped = os.path.join(directory, 'backup.json')
+            with open(stripped, 'w', encoding='utf-8') as handle:
+                json.dump(objects, handle)
+            call_command('loaddata', stripped, verbosity=options['verbosity'])
+        
+        stored = LegacyGeneratedFiles.store(bodies)
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded {options['path']}, moved {stored} generated file(s) into EFTArtifact"))
@@ -0,0 +1,13 @@
+# eft_app/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from eft_app.search import SearchIndex
+
+class Command(BaseCommand):
+    help = 'Creates any missing search indexes and re-indexes every searchable row'
+    
+    def handle(self, *args, **options):
+        SearchIndex.install()
+        backend = SearchIndex.backend_class().name
+        for model, count in SearchIndex.rebuild().items():
+            self.stdout.write(f"{model._meta.verbose_name_plural}: {count} row(s) indexed")
+        self.stdout.write(self.style.SUCCESS(f"Search indexes rebuilt ({backend} backend)"))
@@ -0,0 +1,48 @@
+# eft_app/management/commands/recompute_batch_totals.py
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+from django.utils import timezone
+from eft_app import money
+from eft_app.models import EFTBatch, EFTTransaction
+
+class Command(BaseCommand):
+    help = 'Recomputes stored batch totals from their transactions and fixes any drift'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('batch_ids', nargs='*', type=int, help='Batch IDs to check (default: all batches)')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+    
+    def handle(self, *args, **options):
+        batches = EFTBatch.objects.only('id', 'batch_reference', 'total_amount', 'record_count')
+        transactions = EFTTransaction.objects.all()
+        if options['batch_ids']:
+            batches = batches.filter(id__in=options['batch_ids'])
+            transactions = transactions.filter(batch_id__in=options['batch_ids'])
+        
+        # One grouped SUM/COUNT in the database; each batch's result is normalised through tambala
+        actual = {
+            row['batch_id']: (money.to_minor(row['total'] or 0), row['count'])
+            for row in transactions.order_by().values('batch_id').annotate(total=Sum('amount'), count=Count('id'))
+        }
+        
+        drifted = []
+        checked = 0
+        for batch in batches.iterator():
+            checked += 1
+            total_minor, record_count = actual.get(batch.id, (0, 0))
+            total_amount = money.from_minor(total_minor)
+            if batch.total_amount != total_amount or batch.record_count != record_count:
+                self.stdout.write(
+                    f"{batch.batch_reference}: stored {batch.total_amount}/{batch.record_count}, "
+                    f"actual {total_amount}/{record_count}"
+                )
+                batch.total_amount = total_amount
+                batch.record_count = record_count
+                batch.updated_at = timezone.now()
+                drifted.append(batch)
+        
+        if drifted and not options['dry_run']:
+            EFTBatch.objects.bulk_update(drifted, ['total_amount', 'record_count', 'updated_at'], batch_size=500)
+        
+        action = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} batch(es), {action} {len(drifted)}"))
@@ -0,0 +1,64 @@
+# eft_app/management/commands/recompute_usage_counters.py
+from django.core.management.base import BaseCommand
+from eft_app import money
+from eft_app.models import (
+    Zone, Scheme, Supplier, DebitAccount,
+    EFTBatch, EFTTransaction, ArchivedBatch, ArchivedTransaction
+)
+
+class Command(BaseCommand):
+    help = 'Recomputes master data usage counters from live and archived batches and fixes any drift'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+    
+    def handle(self, *args, **options):
+        # One pass over each table, amounts summed exactly in tambala; only
+        # lines of batches in EFTBatch.PAID_STATUSES count towards total_paid
+        payments = {}
+        scheme_transactions = {}
+        for model in (EFTTransaction, ArchivedTransaction):
+            rows = model.objects.order_by().values_list('supplier_id', 'scheme_id', 'amount', 'batch__status')
+            for supplier_id, scheme_id, amount, status in rows.iterator(chunk_size=2000):
+                count, total_minor = payments.get(supplier_id, (0, 0))
+                paid_minor = money.to_minor(amount) if status in EFTBatch.PAID_STATUSES else 0
+                payments[supplier_id] = (count + 1, total_minor + paid_minor)
+                scheme_transactions[scheme_id] = scheme_transactions.get(scheme_id, 0) + 1
+        
+        account_batches = {}
+        for model in (EFTBatch, ArchivedBatch):
+            for account_id in model.objects.order_by().values_list('debit_account_id', flat=True).iterator():
+                account_batches[account_id] = account_batches.get(account_id, 0) + 1
+        
+        zone_schemes = {}
+        for zone_id in Scheme.objects.order_by().values_list('zone_id', flat=True).iterator():
+            zone_schemes[zone_id] = zone_schemes.get(zone_id, 0) + 1
+        
+        checks = [
+            (Supplier, lambda pk: {
+                'payment_count': payments.get(pk, (0, 0))[0],
+                'total_paid': money.from_minor(payments.get(pk, (0, 0))[1]),
+            }),
+            (Scheme, lambda pk: {'transaction_count': scheme_transactions.get(pk, 0)}),
+            (DebitAccount, lambda pk: {'batch_count': account_batches.get(pk, 0)}),
+            (Zone, lambda pk: {'scheme_count': zone_schemes.get(pk, 0)}),
+        ]
+        
+        fixed = 0
+        for model, actual_for in checks:
+            drifted = []
+            for obj in model.objects.only('id', *model.counter_fields).iterator():
+                actual = actual_for(obj.pk)
+                stored = {field: getattr(obj, field) for field in model.counter_fields}
+                if stored != actual:
+                    self.stdout.write(f"{model.__name__} {obj.pk}: stored {stored}, actual {actual}")
+                    for field, value in actual.items():
+                        setattr(obj, field, value)
+                    drifted.append(obj)
+            
+            if drifted and not options['dry_run']:
+                model.objects.bulk_update(drifted, list(model.counter_fields), batch_size=500)
+            fixed += len(drifted)
+        
+        action = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f"Checked usage counters, {action} {fixed} row(s)"))
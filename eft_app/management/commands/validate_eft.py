@@ -0,0 +1,29 @@
+# eft_app/management/commands/validate_eft.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from eft_app.eft_validator import EFTFileValidator
+
+class Command(BaseCommand):
+    help = 'Validates an RBM EFT file line by line and prints a JSON report'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the EFT file to validate')
+        parser.add_argument('--max-errors', type=int, default=None,
+                            help='Stop collecting errors after this many (default: no limit)')
+        parser.add_argument('--encoding', default='utf-8', help='File encoding (default: utf-8)')
+        parser.add_argument('--indent', type=int, default=2, help='JSON indent (default: 2)')
+    
+    def handle(self, *args, **options):
+        validator = EFTFileValidator(max_errors=options['max_errors'])
+        
+        try:
+            report = validator.validate_file(options['path'], encoding=options['encoding'])
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Could not read {options['path']}: {e}")
+        
+        report['path'] = options['path']
+        self.stdout.write(json.dumps(report, indent=options['indent']))
+        
+        if not report['valid']:
+            raise CommandError(f"EFT file is invalid ({report['error_count']} error(s))")
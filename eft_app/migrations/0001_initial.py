@@ -0,0 +1,327 @@
+# Generated by Django 4.2.27 on 2026-10-16 23:52
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.text
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.IntegerField(help_text='EFTBatch id before archiving', unique=True)),
+                ('batch_name', models.CharField(max_length=100)),
+                ('batch_reference', models.CharField(max_length=50, unique=True)),
+                ('currency', models.CharField(default='MWK', max_length=3)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('record_count', models.IntegerField(default=0)),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('PENDING', 'Pending Authorization'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('EXPORTED', 'Exported to RBM')], max_length=20)),
+                ('file_reference', models.CharField(blank=True, max_length=16)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('rejection_reason', models.TextField(blank=True)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_batches_approved', to=settings.AUTH_USER_MODEL)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_batches_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived EFT Batch',
+                'verbose_name_plural': 'Archived EFT Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Bank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bank_name', models.CharField(max_length=100)),
+                ('swift_code', models.CharField(max_length=11, unique=True, validators=[django.core.validators.RegexValidator('^[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}([A-Z0-9]{3})?$', 'Invalid SWIFT code')])),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='banks_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Bank',
+                'verbose_name_plural': 'Banks',
+                'ordering': ['bank_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DebitAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_number', models.CharField(help_text='RBM Account only (e.g., 13006161244)', max_length=20, unique=True)),
+                ('account_name', models.CharField(help_text='Debit Account Name (e.g., (ORT) MG Other Recurrent Expenditure A/C)', max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch_count', models.IntegerField(default=0, editable=False)),
+            ],
+            options={
+                'verbose_name': 'Debit Account',
+                'verbose_name_plural': 'Debit Accounts',
+                'ordering': ['account_number'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EFTBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_name', models.CharField(help_text='File Reference: Run ID & Date', max_length=100)),
+                ('batch_reference', models.CharField(default=uuid.uuid4, max_length=50, unique=True)),
+                ('currency', models.CharField(default='MWK', help_text='Transaction Currency (MWK)', max_length=3)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, help_text='File Total - Total value of transactions', max_digits=20)),
+                ('record_count', models.IntegerField(default=0, help_text='Total Count - Total number of line-item transactions')),
+                ('last_sequence', models.IntegerField(default=0, help_text='Highest sequence number handed out to a transaction line')),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('PENDING', 'Pending Authorization'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('EXPORTED', 'Exported to RBM')], default='DRAFT', max_length=20)),
+                ('file_reference', models.CharField(blank=True, help_text='WTC01-31.01.2023 format', max_length=16)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+                ('rejection_reason', models.TextField(blank=True)),
+                ('generated_at', models.DateTimeField(blank=True, null=True)),
+                ('beneficiaries_frozen_at', models.DateTimeField(blank=True, help_text='When supplier details were copied onto the transactions', null=True)),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='batches_approved', to=settings.AUTH_USER_MODEL)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='batches_created', to=settings.AUTH_USER_MODEL)),
+                ('debit_account', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='batches', to='eft_app.debitaccount')),
+            ],
+            options={
+                'verbose_name': 'EFT Batch',
+                'verbose_name_plural': 'EFT Batches',
+                'ordering': ['-created_at'],
+                'permissions': [('can_approve_eft', 'Can approve EFT batches'), ('can_export_eft', 'Can export EFT files')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Zone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zone_code', models.CharField(max_length=10, unique=True)),
+                ('zone_name', models.CharField(max_length=100)),
+                ('description', models.TextField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('scheme_count', models.IntegerField(default=0, editable=False)),
+            ],
+            options={
+                'verbose_name': 'Zone',
+                'verbose_name_plural': 'Zones',
+                'ordering': ['zone_code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Supplier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('supplier_code', models.CharField(help_text='7-digit vendor code', max_length=20, unique=True)),
+                ('supplier_name', models.CharField(max_length=200)),
+                ('account_number', models.CharField(help_text='Beneficiary Bank Account Number', max_length=30)),
+                ('account_name', models.CharField(help_text='Payee Details/Beneficiary Name', max_length=200)),
+                ('employee_number', models.CharField(blank=True, help_text='UDF2 at UBS (Optional)', max_length=6)),
+                ('national_id', models.CharField(blank=True, help_text='UDF3 at UBS (Optional)', max_length=8)),
+                ('credit_reference', models.CharField(blank=True, help_text='Payees Reference/Invoice Number', max_length=50)),
+                ('cost_center', models.CharField(blank=True, help_text='Originating Cost/Funds Centre', max_length=50)),
+                ('source', models.CharField(blank=True, help_text='Unique reference from IFMIS', max_length=18)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('payment_count', models.IntegerField(default=0, editable=False)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=20)),
+                ('bank', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='suppliers', to='eft_app.bank')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='suppliers_created', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Supplier',
+                'verbose_name_plural': 'Suppliers',
+                'ordering': ['supplier_name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Scheme',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scheme_code', models.CharField(max_length=10, unique=True)),
+                ('scheme_name', models.CharField(max_length=200)),
+                ('default_cost_center', models.CharField(blank=True, help_text='Default cost center for this scheme', max_length=50)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction_count', models.IntegerField(default=0, editable=False)),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='schemes', to='eft_app.zone')),
+            ],
+            options={
+                'verbose_name': 'Scheme',
+                'verbose_name_plural': 'Schemes',
+                'ordering': ['scheme_code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EFTArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('txt', 'TXT'), ('csv', 'CSV'), ('xlsx', 'Excel')], max_length=10)),
+                ('digest', models.CharField(help_text='Digest of the batch content the file was generated from', max_length=64)),
+                ('content', models.BinaryField(help_text='zlib-compressed file body')),
+                ('size', models.PositiveIntegerField(help_text='Uncompressed size in bytes')),
+                ('compressed_size', models.PositiveIntegerField(help_text='Stored size in bytes')),
+                ('checksum', models.CharField(help_text='SHA-256 of the uncompressed file', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='eft_app.eftbatch')),
+            ],
+            options={
+                'verbose_name': 'EFT Artifact',
+                'verbose_name_plural': 'EFT Artifacts',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence_number', models.CharField(max_length=6)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('narration', models.CharField(blank=True, max_length=200)),
+                ('reference_number', models.CharField(blank=True, max_length=16)),
+                ('employee_number', models.CharField(blank=True, max_length=6)),
+                ('national_id', models.CharField(blank=True, max_length=8)),
+                ('cost_center', models.CharField(blank=True, max_length=50)),
+                ('source_reference', models.CharField(blank=True, max_length=18)),
+                ('beneficiary_name', models.CharField(blank=True, max_length=200)),
+                ('beneficiary_account_number', models.CharField(blank=True, max_length=30)),
+                ('beneficiary_swift_code', models.CharField(blank=True, max_length=11)),
+                ('beneficiary_credit_reference', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='eft_app.archivedbatch')),
+                ('debit_account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_transactions', to='eft_app.debitaccount')),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_transactions', to='eft_app.scheme')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_transactions', to='eft_app.supplier')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_transactions', to='eft_app.zone')),
+            ],
+            options={
+                'verbose_name': 'Archived EFT Transaction',
+                'verbose_name_plural': 'Archived EFT Transactions',
+                'ordering': [django.db.models.functions.text.Length('sequence_number'), 'sequence_number'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archivedbatch',
+            name='debit_account',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archived_batches', to='eft_app.debitaccount'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedAuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('SUBMITTED', 'Submitted for Approval'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('EXPORTED', 'Exported to RBM')], max_length=20)),
+                ('timestamp', models.DateTimeField()),
+                ('remarks', models.TextField(blank=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_logs', to='eft_app.archivedbatch')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_audit_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Audit Log',
+                'verbose_name_plural': 'Archived Audit Logs',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ApprovalAuditLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('SUBMITTED', 'Submitted for Approval'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected'), ('EXPORTED', 'Exported to RBM')], max_length=20)),
+                ('timestamp', models.DateTimeField(auto_now_add=True)),
+                ('remarks', models.TextField(blank=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='audit_logs', to='eft_app.eftbatch')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='audit_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Approval Audit Log',
+                'verbose_name_plural': 'Approval Audit Logs',
+                'ordering': ['-timestamp'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EFTTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence_number', models.CharField(help_text='Line item Count (0001 upwards; files over 9999 lines are split)', max_length=6)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Payment Amount', max_digits=20, validators=[django.core.validators.MinValueValidator(0.01)])),
+                ('narration', models.CharField(blank=True, help_text='Description of the transaction', max_length=200)),
+                ('reference_number', models.CharField(blank=True, help_text='Invoice Number/Payees Reference', max_length=16)),
+                ('employee_number', models.CharField(blank=True, help_text='Employee Number (Optional)', max_length=6)),
+                ('national_id', models.CharField(blank=True, help_text='National ID (Optional)', max_length=8)),
+                ('cost_center', models.CharField(blank=True, help_text='Cost Center (Optional)', max_length=50)),
+                ('source_reference', models.CharField(blank=True, help_text='Source - Unique reference from IFMIS', max_length=18)),
+                ('beneficiary_name', models.CharField(blank=True, max_length=200)),
+                ('beneficiary_account_number', models.CharField(blank=True, max_length=30)),
+                ('beneficiary_swift_code', models.CharField(blank=True, max_length=11)),
+                ('beneficiary_credit_reference', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='eft_app.eftbatch')),
+                ('debit_account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='eft_app.debitaccount')),
+                ('scheme', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='eft_app.scheme')),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='eft_app.supplier')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='transactions', to='eft_app.zone')),
+            ],
+            options={
+                'verbose_name': 'EFT Transaction',
+                'verbose_name_plural': 'EFT Transactions',
+                'ordering': [django.db.models.functions.text.Length('sequence_number'), 'sequence_number'],
+                'unique_together': {('batch', 'sequence_number')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eftbatch',
+            index=models.Index(fields=['created_by', 'status', '-created_at'], name='eftbatch_owner_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eftbatch',
+            index=models.Index(fields=['status', '-approved_at'], name='eftbatch_status_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eftbatch',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['-created_at'], name='eftbatch_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eftbatch',
+            index=models.Index(fields=['created_at'], name='eftbatch_created_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='eftartifact',
+            unique_together={('batch', 'format')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedtransaction',
+            unique_together={('batch', 'sequence_number')},
+        ),
+        migrations.AddIndex(
+            model_name='archivedbatch',
+            index=models.Index(fields=['-created_at'], name='archivedbatch_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedbatch',
+            index=models.Index(fields=['status', '-approved_at'], name='archivedbatch_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalauditlog',
+            index=models.Index(fields=['batch', '-timestamp'], name='auditlog_batch_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalauditlog',
+            index=models.Index(fields=['-timestamp'], name='auditlog_time_idx'),
+        ),
+    ]
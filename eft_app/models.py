@@ -1,9 +1,57 @@
 # eft_app/models.py - COMPLETE FIXED VERSION
-from django.db import models
+from django.db import models, transaction as db_transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, RegexValidator
+from django.db.models.functions import Cast, Coalesce, Greatest, Length
 from django.utils import timezone
+import hashlib
+import itertools
 import uuid
+import zlib
+
+from . import money
+from .eft_formats import format_choices, get_format
+
+# Sequence numbers are zero-padded to 4 digits and grow past 9999 in large
+# batches, so order by length first to keep '10000' after '9999'
+SEQUENCE_ORDERING = [Length('sequence_number'), 'sequence_number']
+
+class CountedModel(models.Model):
+    """Master data carrying denormalised usage counters
+    
+    The counters are only moved by F() deltas (apply_counter_deltas) as
+    transactions and batches are written, so an ordinary save() of an
+    existing row, e.g. from a form or the admin, leaves them out of its
+    UPDATE instead of writing back a possibly stale in-memory value.
+    """
+    counter_fields = ()
+    
+    class Meta:
+        abstract = True
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def apply_counter_deltas(cls, deltas):
+        """Shift counters atomically; deltas maps pk -> {counter field: delta}
+        
+        Counters never go below zero: rows loaded without their counters
+        (loaddata does raw saves) would otherwise turn negative on the first
+        delete. recompute_usage_counters restores the exact values.
+        """
+        for pk in sorted(pk for pk in deltas if pk is not None):
+            changes = {field: delta for field, delta in deltas[pk].items() if delta}
+            if changes:
+                cls.objects.filter(pk=pk).update(**{
+                    field: Greatest(models.F(field) + delta, models.Value(0, output_field=cls._meta.get_field(field)))
+                    for field, delta in changes.items()
+                })
 
 class Bank(models.Model):
     """Bank and SWIFT codes master data"""
@@ -27,7 +75,7 @@ class Bank(models.Model):
         """Extract bank code from SWIFT code (first 4 letters)"""
         return self.swift_code[:4] if self.swift_code else ""
 
-class Zone(models.Model):
+class Zone(CountedModel):
     """CRWB Zones"""
     zone_code = models.CharField(max_length=10, unique=True)
     zone_name = models.CharField(max_length=100)
@@ -35,6 +83,11 @@ class Zone(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Usage counter, kept current by Scheme.save()/delete()
+    scheme_count = models.IntegerField(default=0, editable=False)
+    
+    counter_fields = ('scheme_count',)
+    
     class Meta:
         ordering = ['zone_code']
         verbose_name = 'Zone'
@@ -43,7 +96,14 @@ class Zone(models.Model):
     def __str__(self):
         return f"{self.zone_code} - {self.zone_name}"
 
-class Scheme(models.Model):
+class SchemeQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the schemes, taking them out of their zones' counts"""
+        with db_transaction.atomic():
+            Scheme.release_usage(self)
+            return super().delete()
+
+class Scheme(CountedModel):
     """CRWB Schemes mapped to Zones"""
     scheme_code = models.CharField(max_length=10, unique=True)
     scheme_name = models.CharField(max_length=200)
@@ -59,20 +119,72 @@ class Scheme(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Usage counter, kept current as transactions are written
+    transaction_count = models.IntegerField(default=0, editable=False)
+    
+    counter_fields = ('transaction_count',)
+    
+    objects = SchemeQuerySet.as_manager()
+    
     class Meta:
         ordering = ['scheme_code']
         verbose_name = 'Scheme'
         verbose_name_plural = 'Schemes'
     
+    # zone_id as last read from or written to the database
+    _loaded_zone_id = None
+    
     def __str__(self):
         return f"{self.scheme_code} - {self.scheme_name} ({self.zone.zone_code})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if loaded.get('zone_id', models.DEFERRED) is not models.DEFERRED:
+            instance._loaded_zone_id = loaded['zone_id']
+        return instance
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not {'zone', 'zone_id'} & set(update_fields):
+            return super().save(*args, **kwargs)
+        
+        with db_transaction.atomic():
+            adding = self._state.adding
+            old_zone_id = self._loaded_zone_id
+            if not adding and old_zone_id is None:
+                old_zone_id = Scheme.objects.filter(pk=self.pk).values_list('zone_id', flat=True).first()
+            super().save(*args, **kwargs)
+            self._loaded_zone_id = self.zone_id
+            
+            if adding or old_zone_id != self.zone_id:
+                deltas = {self.zone_id: {'scheme_count': 1}}
+                if not adding and old_zone_id is not None:
+                    deltas[old_zone_id] = {'scheme_count': -1}
+                Zone.apply_counter_deltas(deltas)
+    
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            zone_id = self._loaded_zone_id or self.zone_id
+            result = super().delete(*args, **kwargs)
+            Zone.apply_counter_deltas({zone_id: {'scheme_count': -1}})
+        return result
+    
+    @staticmethod
+    def release_usage(schemes):
+        """Take schemes about to be deleted out of their zones' counts; SchemeQuerySet.delete() calls it"""
+        deltas = {}
+        for zone_id in schemes.values_list('zone_id', flat=True).order_by():
+            deltas.setdefault(zone_id, {'scheme_count': 0})['scheme_count'] -= 1
+        Zone.apply_counter_deltas(deltas)
+    
     @property
     def description(self):
         """Return description if needed in views"""
         return f"{self.scheme_name} - {self.zone.zone_name}"
 
-class Supplier(models.Model):
+class Supplier(CountedModel):
     """Suppliers/Beneficiaries with RBM-compliant fields"""
     supplier_code = models.CharField(max_length=20, unique=True, help_text="7-digit vendor code")
     supplier_name = models.CharField(max_length=200)
@@ -91,6 +203,13 @@ class Supplier(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='suppliers_created')
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Usage counters, kept current as transactions are written: payment_count
+    # counts every line, total_paid only lines of batches in EFTBatch.PAID_STATUSES
+    payment_count = models.IntegerField(default=0, editable=False)
+    total_paid = models.DecimalField(max_digits=20, decimal_places=2, default=0, editable=False)
+    
+    counter_fields = ('payment_count', 'total_paid')
+    
     class Meta:
         ordering = ['supplier_name']
         verbose_name = 'Supplier'
@@ -99,7 +218,7 @@ class Supplier(models.Model):
     def __str__(self):
         return f"{self.supplier_code} - {self.supplier_name}"
 
-class DebitAccount(models.Model):
+class DebitAccount(CountedModel):
     """CRWB Debit Accounts"""
     account_number = models.CharField(max_length=20, unique=True, help_text="RBM Account only (e.g., 13006161244)")
     account_name = models.CharField(max_length=200, help_text="Debit Account Name (e.g., (ORT) MG Other Recurrent Expenditure A/C)")
@@ -107,6 +226,11 @@ class DebitAccount(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    # Usage counter, kept current by EFTBatch.save()/delete()
+    batch_count = models.IntegerField(default=0, editable=False)
+    
+    counter_fields = ('batch_count',)
+    
     class Meta:
         ordering = ['account_number']
         verbose_name = 'Debit Account'
@@ -115,6 +239,17 @@ class DebitAccount(models.Model):
     def __str__(self):
         return f"{self.account_number} - {self.account_name}"
 
+class EFTBatchQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the batches and their transactions, taking both out of the usage counters"""
+        with db_transaction.atomic():
+            EFTBatch.release_usage(self)
+            return super().delete()
+    
+    def delete_keeping_usage(self):
+        """Delete without touching the usage counters, for archiving: archived payments still count"""
+        return super().delete()
+
 class EFTBatch(models.Model):
     """EFT Batch header - RBM compliant"""
     STATUS_CHOICES = [
@@ -125,11 +260,15 @@ class EFTBatch(models.Model):
         ('EXPORTED', 'Exported to RBM'),
     ]
     
+    # Statuses whose lines count towards Supplier.total_paid
+    PAID_STATUSES = ('APPROVED', 'EXPORTED')
+    
     batch_name = models.CharField(max_length=100, help_text="File Reference: Run ID & Date")
     batch_reference = models.CharField(max_length=50, unique=True, default=uuid.uuid4)
     currency = models.CharField(max_length=3, default='MWK', help_text="Transaction Currency (MWK)")
     total_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0, help_text="File Total - Total value of transactions")
     record_count = models.IntegerField(default=0, help_text="Total Count - Total number of line-item transactions")
+    last_sequence = models.IntegerField(default=0, help_text="Highest sequence number handed out to a transaction line")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='DRAFT')
     
     # RBM File reference (from payment file sample)
@@ -148,27 +287,120 @@ class EFTBatch(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     rejection_reason = models.TextField(blank=True)
     
-    # File generation
-    generated_file = models.TextField(blank=True)  # Stores EFT file content
+    # File generation (file bodies are kept in EFTArtifact)
     generated_at = models.DateTimeField(null=True, blank=True)
+    beneficiaries_frozen_at = models.DateTimeField(null=True, blank=True,
+        help_text="When supplier details were copied onto the transactions")
+    
+    objects = EFTBatchQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'EFT Batch'
         verbose_name_plural = 'EFT Batches'
+        indexes = [
+            # batch_list / accounts_dashboard: a clerk's batches by status, newest first
+            models.Index(fields=['created_by', 'status', '-created_at'], name='eftbatch_owner_status_idx'),
+            # authorizer_dashboard: approvals/rejections by status and approval time
+            models.Index(fields=['status', '-approved_at'], name='eftbatch_status_approved_idx'),
+            # Authorizer queue: only PENDING rows are indexed, so the condition
+            # already pins status and the key is just the queue order
+            models.Index(fields=['-created_at'], name='eftbatch_pending_idx', condition=models.Q(status='PENDING')),
+            # Date-range counts such as "created today"
+            models.Index(fields=['created_at'], name='eftbatch_created_idx'),
+        ]
         permissions = [
             ("can_approve_eft", "Can approve EFT batches"),
             ("can_export_eft", "Can export EFT files"),
         ]
     
+    # debit_account_id and status as last read from or written to the database
+    _loaded_debit_account_id = models.DEFERRED
+    _loaded_status = models.DEFERRED
+    
     def __str__(self):
         return f"{self.batch_reference} - {self.batch_name} ({self.status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if 'debit_account_id' in loaded:
+            instance._loaded_debit_account_id = loaded['debit_account_id']
+        if 'status' in loaded:
+            instance._loaded_status = loaded['status']
+        return instance
+    
     def save(self, *args, **kwargs):
         if not self.file_reference and self.batch_name:
             date_str = timezone.now().strftime('%d.%m.%Y')
             self.file_reference = f"CRWB-{date_str}"
-        super().save(*args, **kwargs)
+        
+        update_fields = kwargs.get('update_fields')
+        writes_account = update_fields is None or bool({'debit_account', 'debit_account_id'} & set(update_fields))
+        writes_status = update_fields is None or 'status' in update_fields
+        if not writes_account and not writes_status:
+            return super().save(*args, **kwargs)
+        
+        with db_transaction.atomic():
+            adding = self._state.adding
+            old_account_id = None if adding else self._loaded_debit_account_id
+            old_status = None if adding else self._loaded_status
+            if models.DEFERRED in (old_account_id, old_status):
+                row = EFTBatch.objects.filter(pk=self.pk).values_list('debit_account_id', 'status').first() or (None, None)
+                old_account_id = row[0] if old_account_id is models.DEFERRED else old_account_id
+                old_status = row[1] if old_status is models.DEFERRED else old_status
+            super().save(*args, **kwargs)
+            
+            if writes_account:
+                self._loaded_debit_account_id = self.debit_account_id
+                if old_account_id != self.debit_account_id:
+                    deltas = {self.debit_account_id: {'batch_count': 1}}
+                    if old_account_id is not None:
+                        deltas[old_account_id] = {'batch_count': -1}
+                    DebitAccount.apply_counter_deltas(deltas)
+            
+            if writes_status:
+                self._loaded_status = self.status
+                paid = self.status in self.PAID_STATUSES
+                if not adding and paid != (old_status in self.PAID_STATUSES):
+                    self.apply_paid_delta(1 if paid else -1)
+    
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            EFTBatch.release_usage(EFTBatch.objects.filter(pk=self.pk))
+            return super().delete(*args, **kwargs)
+    
+    @staticmethod
+    def release_usage(batches):
+        """Take batches about to be deleted, and their transactions, out of the usage counters
+        
+        EFTBatchQuerySet.delete() calls it, since the cascade to the
+        transactions bypasses EFTTransaction.delete(). Archiving skips it
+        (delete_keeping_usage): archived payments still count towards their
+        supplier, scheme and account.
+        """
+        accounts = {}
+        for account_id in batches.values_list('debit_account_id', flat=True).order_by():
+            accounts.setdefault(account_id, {'batch_count': 0})['batch_count'] -= 1
+        DebitAccount.apply_counter_deltas(accounts)
+        
+        lines = (
+            EFTTransaction.objects.filter(batch__in=batches).order_by()
+            .values_list('supplier_id', 'scheme_id', 'amount', 'batch__status').iterator(chunk_size=2000)
+        )
+        EFTTransaction.apply_usage(removed=(
+            (supplier_id, scheme_id, amount, status in EFTBatch.PAID_STATUSES)
+            for supplier_id, scheme_id, amount, status in lines
+        ))
+    
+    def apply_paid_delta(self, sign):
+        """Add (sign 1) or take back (sign -1) this batch's lines in their suppliers' total_paid"""
+        rows = self.transactions.order_by().values('supplier_id').annotate(total=models.Sum('amount'))
+        Supplier.apply_counter_deltas({
+            row['supplier_id']: {'total_paid': money.from_minor(sign * money.to_minor(row['total']))}
+            for row in rows
+        })
     
     def can_edit(self):
         return self.status == 'DRAFT'
@@ -180,20 +412,146 @@ class EFTBatch(models.Model):
         return self.status == 'APPROVED'
     
     def update_totals(self):
-        """Update batch totals from transactions"""
-        transactions = self.transactions.all()
-        self.total_amount = sum(t.amount for t in transactions)
-        self.record_count = transactions.count()
-        self.save()
+        """Recompute batch totals from transactions with one SUM/COUNT query
+        
+        The database adds the amounts; only the single result is normalised
+        through tambala.
+        """
+        totals = self.transactions.order_by().aggregate(total=models.Sum('amount'), count=models.Count('id'))
+        self.total_amount = money.from_minor(money.to_minor(totals['total'] or 0))
+        self.record_count = totals['count']
+        self.save(update_fields=['total_amount', 'record_count', 'updated_at'])
+    
+    def touch(self):
+        """Move updated_at after a line edit that leaves the totals alone, so EFTArtifactCache.stamp changes"""
+        self.updated_at = timezone.now()
+        EFTBatch.objects.filter(pk=self.pk).update(updated_at=self.updated_at)
+    
+    def apply_totals_delta(self, amount, count):
+        """Atomically shift the stored totals by a delta, without reading any transactions"""
+        if not amount and not count:
+            return
+        EFTBatch.objects.filter(pk=self.pk).update(
+            total_amount=models.F('total_amount') + amount,
+            record_count=models.F('record_count') + count,
+            updated_at=timezone.now(),
+        )
+        self.refresh_from_db(fields=['total_amount', 'record_count', 'updated_at'])
+    
+    def allocate_sequences(self, count=1):
+        """Reserve count consecutive sequence numbers and return the first
+        
+        The counter is bumped with one atomic UPDATE, which also row-locks the
+        batch until the caller's transaction ends, so concurrent clerks get
+        disjoint ranges instead of IntegrityErrors. Batches whose counter
+        predates their lines (last_sequence 0) continue after their highest
+        existing number, so gaps left by deletes are never reused.
+        """
+        highest = EFTTransaction.objects.filter(batch=models.OuterRef('pk')).order_by(
+            Length('sequence_number').desc(), '-sequence_number'
+        ).values('sequence_number')[:1]
+        with db_transaction.atomic():
+            EFTBatch.objects.filter(pk=self.pk).update(last_sequence=models.Case(
+                models.When(last_sequence=0, then=Coalesce(
+                    Cast(models.Subquery(highest), models.IntegerField()), models.Value(0)
+                )),
+                default=models.F('last_sequence'),
+            ) + count)
+            self.last_sequence = EFTBatch.objects.filter(pk=self.pk).values_list('last_sequence', flat=True).get()
+        return self.last_sequence - count + 1
+    
+    def bulk_add_transactions(self, transactions, batch_size=500):
+        """Append unsaved transactions with bulk_create and one totals delta
+        
+        Sequence numbers are reserved as one range with allocate_sequences. Related
+        scheme/supplier objects should already be attached to each transaction
+        so applying defaults needs no extra queries.
+        """
+        next_seq = self.allocate_sequences(len(transactions))
+        
+        for offset, transaction in enumerate(transactions):
+            transaction.batch = self
+            transaction.sequence_number = str(next_seq + offset).zfill(4)
+            transaction.apply_defaults()
+        
+        created = EFTTransaction.objects.bulk_create(transactions, batch_size=batch_size)
+        self.apply_totals_delta(money.from_minor(money.sum_minor(t.amount for t in created)), len(created))
+        paid = self.status in self.PAID_STATUSES
+        EFTTransaction.apply_usage(added=((t.supplier_id, t.scheme_id, t.amount, paid) for t in created))
+        for transaction in created:
+            transaction._loaded_state = transaction.tracked_state()
+        return created
+    
+    def resequence_transactions(self, batch_size=500):
+        """Renumber lines 0001.. contiguously in file order with set-based updates
+        
+        Only rows whose number changes are written. They are first parked on
+        spare numbers above the final range that no line currently uses, so
+        no intermediate state breaks the (batch, sequence_number) unique
+        constraint or outgrows the column, then given their final numbers
+        with bulk_update. save() is bypassed, so defaults and totals are
+        untouched.
+        """
+        rows = list(self.transactions.order_by(*SEQUENCE_ORDERING).values_list('id', 'sequence_number'))
+        in_use = {int(sequence_number) for _, sequence_number in rows if sequence_number.isdigit()}
+        spare = (number for number in itertools.count(len(rows) + 1) if number not in in_use)
+        
+        parked, changed = [], []
+        for number, (pk, sequence_number) in enumerate(rows, 1):
+            if sequence_number != str(number).zfill(4):
+                parked.append(EFTTransaction(pk=pk, sequence_number=str(next(spare)).zfill(4)))
+                changed.append(EFTTransaction(pk=pk, sequence_number=str(number).zfill(4)))
+        
+        with db_transaction.atomic():
+            EFTTransaction.objects.bulk_update(parked, ['sequence_number'], batch_size=batch_size)
+            EFTTransaction.objects.bulk_update(changed, ['sequence_number'], batch_size=batch_size)
+        
+        # Numbering restarts after the last remaining line
+        EFTBatch.objects.filter(pk=self.pk).update(last_sequence=len(rows))
+        self.last_sequence = len(rows)
+        return len(changed)
+    
+    def freeze_beneficiaries(self):
+        """Copy each line's current supplier details onto the line itself
+        
+        Done on submission so the reviewed, approved and exported file no
+        longer depends on supplier master data. One UPDATE for the batch.
+        """
+        supplier = Supplier.objects.filter(pk=models.OuterRef('supplier_id'))
+        self.transactions.update(
+            beneficiary_name=models.Subquery(supplier.values('supplier_name')[:1]),
+            beneficiary_account_number=models.Subquery(supplier.values('account_number')[:1]),
+            beneficiary_swift_code=models.Subquery(supplier.values('bank__swift_code')[:1]),
+            beneficiary_credit_reference=models.Subquery(supplier.values('credit_reference')[:1]),
+        )
+        self.beneficiaries_frozen_at = timezone.now()
+        EFTBatch.objects.filter(pk=self.pk).update(beneficiaries_frozen_at=self.beneficiaries_frozen_at)
     
     def get_status_display(self):
         """Get human-readable status"""
         return dict(self.STATUS_CHOICES).get(self.status, self.status)
 
+class EFTTransactionQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the transactions, taking them out of their batches' totals and the usage counters"""
+        with db_transaction.atomic():
+            EFTTransaction.release_usage(self)
+            return super().delete()
+    
+    def delete_keeping_usage(self):
+        """Delete without touching totals or usage counters, for archiving whole batches"""
+        return super().delete()
+    
+    def update(self, **kwargs):
+        """Update the transactions and move their batches' updated_at, so cached files are regenerated"""
+        with db_transaction.atomic(savepoint=False):
+            EFTBatch.objects.filter(pk__in=self.values('batch_id')).update(updated_at=timezone.now())
+            return super().update(**kwargs)
+
 class EFTTransaction(models.Model):
     """Individual EFT transactions - RBM compliant"""
     batch = models.ForeignKey(EFTBatch, on_delete=models.CASCADE, related_name='transactions')
-    sequence_number = models.CharField(max_length=4, help_text="Line item Count (0001-9999)")
+    sequence_number = models.CharField(max_length=6, help_text="Line item Count (0001 upwards; files over 9999 lines are split)")
     
     # Mandatory RBM fields
     debit_account = models.ForeignKey(DebitAccount, on_delete=models.PROTECT, related_name='transactions')
@@ -214,18 +572,103 @@ class EFTTransaction(models.Model):
     cost_center = models.CharField(max_length=50, blank=True, help_text="Cost Center (Optional)")
     source_reference = models.CharField(max_length=18, blank=True, help_text="Source - Unique reference from IFMIS")
     
+    # Beneficiary details frozen from the supplier when the batch is submitted
+    beneficiary_name = models.CharField(max_length=200, blank=True)
+    beneficiary_account_number = models.CharField(max_length=30, blank=True)
+    beneficiary_swift_code = models.CharField(max_length=11, blank=True)
+    beneficiary_credit_reference = models.CharField(max_length=50, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = EFTTransactionQuerySet.as_manager()
+    
     class Meta:
-        ordering = ['sequence_number']
+        ordering = SEQUENCE_ORDERING
         unique_together = ['batch', 'sequence_number']
         verbose_name = 'EFT Transaction'
         verbose_name_plural = 'EFT Transactions'
     
+    # (batch_id, supplier_id, scheme_id, amount in tambala) as last read from
+    # or written to the database
+    _loaded_state = None
+    
     def __str__(self):
         return f"{self.batch.batch_reference}-{self.sequence_number}: {self.amount} MWK"
     
-    def save(self, *args, **kwargs):
+    @property
+    def payee_name(self):
+        return self.beneficiary_name or self.supplier.supplier_name
+    
+    @property
+    def payee_account_number(self):
+        return self.beneficiary_account_number or self.supplier.account_number
+    
+    @property
+    def payee_swift_code(self):
+        return self.beneficiary_swift_code or self.supplier.bank.swift_code
+    
+    @property
+    def payee_credit_reference(self):
+        return self.beneficiary_credit_reference if self.beneficiary_name else self.supplier.credit_reference
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        tracked = [loaded.get(name, models.DEFERRED) for name in ('batch_id', 'supplier_id', 'scheme_id', 'amount')]
+        if models.DEFERRED not in tracked:
+            instance._loaded_state = (*tracked[:3], money.to_minor(tracked[3]))
+        return instance
+    
+    def tracked_state(self):
+        return (self.batch_id, self.supplier_id, self.scheme_id, money.to_minor(self.amount))
+    
+    @staticmethod
+    def apply_usage(added=(), removed=()):
+        """Move supplier and scheme usage counters for added and removed lines
+        
+        Lines are (supplier_id, scheme_id, amount, paid) tuples, amount as a
+        Decimal or an int in tambala and paid true when the line's batch is in
+        EFTBatch.PAID_STATUSES; totals are summed exactly in tambala.
+        """
+        suppliers = {}
+        schemes = {}
+        for lines, sign in ((added, 1), (removed, -1)):
+            for supplier_id, scheme_id, amount, paid in lines:
+                counts = suppliers.setdefault(supplier_id, {'payment_count': 0, 'total_paid': 0})
+                counts['payment_count'] += sign
+                if paid:
+                    amount_minor = amount if isinstance(amount, int) else money.to_minor(amount)
+                    counts['total_paid'] += sign * amount_minor
+                schemes.setdefault(scheme_id, {'transaction_count': 0})['transaction_count'] += sign
+        
+        for counts in suppliers.values():
+            counts['total_paid'] = money.from_minor(counts['total_paid'])
+        Supplier.apply_counter_deltas(suppliers)
+        Scheme.apply_counter_deltas(schemes)
+    
+    @staticmethod
+    def release_usage(transactions):
+        """Take transactions about to be deleted out of their batches' totals and the usage counters
+        
+        EFTTransactionQuerySet.delete() calls it; the batches' totals move by
+        one grouped aggregate rather than a delta per line.
+        """
+        totals = transactions.order_by().values('batch_id').annotate(
+            total=models.Sum('amount'), count=models.Count('id'))
+        for row in totals:
+            EFTBatch(pk=row['batch_id']).apply_totals_delta(
+                money.from_minor(-money.to_minor(row['total'])), -row['count'])
+        
+        lines = transactions.order_by().values_list(
+            'supplier_id', 'scheme_id', 'amount', 'batch__status').iterator(chunk_size=2000)
+        EFTTransaction.apply_usage(removed=(
+            (supplier_id, scheme_id, amount, status in EFTBatch.PAID_STATUSES)
+            for supplier_id, scheme_id, amount, status in lines
+        ))
+    
+    def apply_defaults(self):
+        """Fill derived fields from the scheme and supplier master data"""
         # Auto-derive zone from scheme if not set
         if not self.zone_id and self.scheme_id:
             self.zone = self.scheme.zone
@@ -244,12 +687,99 @@ class EFTTransaction(models.Model):
         # AUTO-FILL COST CENTER FROM SCHEME
         if not self.cost_center and self.scheme_id and self.scheme.default_cost_center:
             self.cost_center = self.scheme.default_cost_center
+    
+    def save(self, *args, **kwargs):
+        self.apply_defaults()
         
-        super().save(*args, **kwargs)
-        
-        # Update batch totals
-        if self.batch:
-            self.batch.update_totals()
+        with db_transaction.atomic():
+            adding = self._state.adding
+            loaded = None if adding else self._loaded_state
+            if not adding and loaded is None:
+                # Some tracked field was deferred, so read the old values first
+                row = EFTTransaction.objects.filter(pk=self.pk).values_list(
+                    'batch_id', 'supplier_id', 'scheme_id', 'amount').first()
+                loaded = (*row[:3], money.to_minor(row[3])) if row else None
+            super().save(*args, **kwargs)
+            state = self._loaded_state = self.tracked_state()
+            batch_id, amount_minor = state[0], state[3]
+            paid = old_paid = self.batch.status in EFTBatch.PAID_STATUSES
+            
+            # Keep batch totals current with F() deltas rather than rescanning the batch
+            if loaded is None:
+                self.batch.apply_totals_delta(money.from_minor(amount_minor), 1)
+            elif loaded[0] != batch_id:
+                old_batch = EFTBatch.objects.get(pk=loaded[0])
+                old_batch.apply_totals_delta(money.from_minor(-loaded[3]), -1)
+                self.batch.apply_totals_delta(money.from_minor(amount_minor), 1)
+                old_paid = old_batch.status in EFTBatch.PAID_STATUSES
+            elif amount_minor != loaded[3]:
+                self.batch.apply_totals_delta(money.from_minor(amount_minor - loaded[3]), 0)
+            else:
+                # The line's file text may still have changed
+                self.batch.touch()
+            
+            if loaded is None:
+                EFTTransaction.apply_usage(added=[(*state[1:], paid)])
+            elif loaded[1:] != state[1:] or old_paid != paid:
+                EFTTransaction.apply_usage(added=[(*state[1:], paid)], removed=[(*loaded[1:], old_paid)])
+    
+    def delete(self, *args, **kwargs):
+        with db_transaction.atomic():
+            batch_id, supplier_id, scheme_id, amount_minor = self._loaded_state or self.tracked_state()
+            result = super().delete(*args, **kwargs)
+            batch = self.batch if batch_id == self.batch_id else EFTBatch.objects.get(pk=batch_id)
+            batch.apply_totals_delta(money.from_minor(-amount_minor), -1)
+            paid = batch.status in EFTBatch.PAID_STATUSES
+            EFTTransaction.apply_usage(removed=[(supplier_id, scheme_id, amount_minor, paid)])
+        return result
+
+class EFTArtifact(models.Model):
+    """Generated EFT file, compressed and stored outside the batch row"""
+    # Whatever eft_formats has registered; binary handling comes from each format
+    FORMAT_CHOICES = format_choices()
+    
+    batch = models.ForeignKey(EFTBatch, on_delete=models.CASCADE, related_name='artifacts')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    digest = models.CharField(max_length=64, help_text="Digest of the batch content the file was generated from")
+    content = models.BinaryField(help_text="zlib-compressed file body")
+    size = models.PositiveIntegerField(help_text="Uncompressed size in bytes")
+    compressed_size = models.PositiveIntegerField(help_text="Stored size in bytes")
+    checksum = models.CharField(max_length=64, help_text="SHA-256 of the uncompressed file")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        unique_together = ['batch', 'format']
+        verbose_name = 'EFT Artifact'
+        verbose_name_plural = 'EFT Artifacts'
+    
+    def __str__(self):
+        return f"{self.batch.batch_reference} ({self.format.upper()}, {self.size} bytes)"
+    
+    @classmethod
+    def store(cls, batch, format, digest, body):
+        """Compress and save a generated file, replacing the previous one"""
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        compressed = zlib.compress(data, 6)
+        artifact, created = cls.objects.update_or_create(
+            batch=batch,
+            format=format,
+            defaults={
+                'digest': digest,
+                'content': compressed,
+                'size': len(data),
+                'compressed_size': len(compressed),
+                'checksum': hashlib.sha256(data).hexdigest(),
+            }
+        )
+        return artifact
+    
+    def read(self):
+        """Return the decompressed file body (bytes for binary formats)"""
+        data = zlib.decompress(bytes(self.content))
+        if get_format(self.format).binary:
+            return data
+        return data.decode('utf-8')
 
 class ApprovalAuditLog(models.Model):
     """Audit trail for approvals"""
@@ -269,8 +799,100 @@ class ApprovalAuditLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['batch', '-timestamp'], name='auditlog_batch_time_idx'),
+            models.Index(fields=['-timestamp'], name='auditlog_time_idx'),
+        ]
         verbose_name = 'Approval Audit Log'
         verbose_name_plural = 'Approval Audit Logs'
     
     def __str__(self):
-        return f"{self.batch.batch_reference} - {self.action} by {self.user.username} at {self.timestamp}"
\ No newline at end of file
+        return f"{self.batch.batch_reference} - {self.action} by {self.user.username} at {self.timestamp}"
+# ================ ARCHIVE ================
+# Exported/approved batches past the retention age are moved here by the
+# archive_batches command so the hot tables above stay small. Rows are
+# copied as-is (with beneficiary details frozen) and are never edited.
+
+class ArchivedBatch(models.Model):
+    """Read-only copy of an EFTBatch moved out of the hot tables"""
+    original_id = models.IntegerField(unique=True, help_text="EFTBatch id before archiving")
+    batch_name = models.CharField(max_length=100)
+    batch_reference = models.CharField(max_length=50, unique=True)
+    currency = models.CharField(max_length=3, default='MWK')
+    total_amount = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    record_count = models.IntegerField(default=0)
+    status = models.CharField(max_length=20, choices=EFTBatch.STATUS_CHOICES)
+    file_reference = models.CharField(max_length=16, blank=True)
+    debit_account = models.ForeignKey(DebitAccount, on_delete=models.PROTECT, null=True, blank=True,
+                                      related_name='archived_batches')
+    created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='archived_batches_created')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    approved_by = models.ForeignKey(User, on_delete=models.PROTECT, null=True, blank=True,
+                                    related_name='archived_batches_approved')
+    approved_at = models.DateTimeField(null=True, blank=True)
+    rejection_reason = models.TextField(blank=True)
+    generated_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='archivedbatch_created_idx'),
+            models.Index(fields=['status', '-approved_at'], name='archivedbatch_approved_idx'),
+        ]
+        verbose_name = 'Archived EFT Batch'
+        verbose_name_plural = 'Archived EFT Batches'
+    
+    def __str__(self):
+        return f"{self.batch_reference} - {self.batch_name} (archived)"
+    
+    def get_status_display(self):
+        return dict(EFTBatch.STATUS_CHOICES).get(self.status, self.status)
+
+class ArchivedTransaction(models.Model):
+    """Read-only copy of an EFTTransaction belonging to an ArchivedBatch"""
+    batch = models.ForeignKey(ArchivedBatch, on_delete=models.CASCADE, related_name='transactions')
+    sequence_number = models.CharField(max_length=6)
+    debit_account = models.ForeignKey(DebitAccount, on_delete=models.PROTECT, related_name='archived_transactions')
+    supplier = models.ForeignKey(Supplier, on_delete=models.PROTECT, related_name='archived_transactions')
+    scheme = models.ForeignKey(Scheme, on_delete=models.PROTECT, related_name='archived_transactions')
+    zone = models.ForeignKey(Zone, on_delete=models.PROTECT, related_name='archived_transactions')
+    amount = models.DecimalField(max_digits=20, decimal_places=2)
+    narration = models.CharField(max_length=200, blank=True)
+    reference_number = models.CharField(max_length=16, blank=True)
+    employee_number = models.CharField(max_length=6, blank=True)
+    national_id = models.CharField(max_length=8, blank=True)
+    cost_center = models.CharField(max_length=50, blank=True)
+    source_reference = models.CharField(max_length=18, blank=True)
+    beneficiary_name = models.CharField(max_length=200, blank=True)
+    beneficiary_account_number = models.CharField(max_length=30, blank=True)
+    beneficiary_swift_code = models.CharField(max_length=11, blank=True)
+    beneficiary_credit_reference = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = SEQUENCE_ORDERING
+        unique_together = ['batch', 'sequence_number']
+        verbose_name = 'Archived EFT Transaction'
+        verbose_name_plural = 'Archived EFT Transactions'
+    
+    def __str__(self):
+        return f"{self.batch.batch_reference}-{self.sequence_number}: {self.amount} MWK"
+
+class ArchivedAuditLog(models.Model):
+    """Read-only copy of an ApprovalAuditLog belonging to an ArchivedBatch"""
+    batch = models.ForeignKey(ArchivedBatch, on_delete=models.CASCADE, related_name='audit_logs')
+    action = models.CharField(max_length=20, choices=ApprovalAuditLog.ACTION_CHOICES)
+    user = models.ForeignKey(User, on_delete=models.PROTECT, related_name='archived_audit_logs')
+    timestamp = models.DateTimeField()
+    remarks = models.TextField(blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-timestamp']
+        verbose_name = 'Archived Audit Log'
+        verbose_name_plural = 'Archived Audit Logs'
+    
+    def __str__(self):
+        return f"{self.batch.batch_reference} - {self.action} by {self.user.username} at {self.timestamp}"
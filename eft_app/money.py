@@ -0,0 +1,68 @@
+# eft_app/money.py
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+# Amounts are summed and compared as integer tambala and only turned back
+# into Decimal or text at the edges, so totals never pick up float rounding
+MINOR_UNITS = 100  # Tambala per kwacha
+
+# Amounts as they appear in EFT files: digits, then at most two decimals
+AMOUNT_PATTERN = re.compile(r'-?[0-9]+(?:\.[0-9]{1,2})?')
+
+def _decimal(amount):
+    """Coerce an amount to a finite Decimal, or raise ValueError"""
+    if not isinstance(amount, Decimal):
+        try:
+            amount = Decimal(str(amount))
+        except InvalidOperation:
+            raise ValueError(f"Invalid amount: {amount!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {amount}")
+    return amount
+
+def to_minor(amount):
+    """Convert a Decimal, int or numeric string to integer tambala
+
+    Raises ValueError for non-finite values or more than two decimal places.
+    """
+    if isinstance(amount, int):
+        return amount * MINOR_UNITS
+    amount = _decimal(amount)
+    scaled = amount.scaleb(2)
+    minor = int(scaled)
+    if scaled != minor:
+        raise ValueError(f"Amount {amount} has more than 2 decimal places")
+    return minor
+
+def round_minor(amount):
+    """Convert an amount to integer tambala, rounding half-up past two decimal places"""
+    if isinstance(amount, int):
+        return amount * MINOR_UNITS
+    return int(_decimal(amount).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP).scaleb(2))
+
+def from_minor(minor):
+    """Convert integer tambala to a 2-decimal-place Decimal"""
+    return Decimal(minor).scaleb(-2)
+
+def parse_minor(text):
+    """Parse file text like '1234.56' into tambala, or None if it is not a valid amount
+
+    Whitespace, thousands separators, exponents and extra decimals are all invalid.
+    """
+    if not isinstance(text, str) or not AMOUNT_PATTERN.fullmatch(text):
+        return None
+    return int(Decimal(text).scaleb(2))
+
+def format_minor(minor):
+    """Format tambala as '1234.56' (no thousands separator)"""
+    sign = '-' if minor < 0 else ''
+    minor = abs(minor)
+    return f"{sign}{minor // MINOR_UNITS}.{minor % MINOR_UNITS:02d}"
+
+def sum_minor(amounts):
+    """Sum an iterable of amounts exactly, returning tambala"""
+    return sum(to_minor(amount) for amount in amounts)
+
+def format_amount(amount):
+    """Format a Decimal amount as '1234.56' without going through float, rounding half-up"""
+    return format_minor(round_minor(amount))
@@ -0,0 +1,241 @@
+# eft_app/pagination.py
+import base64
+import datetime
+import json
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import QueryDict
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder that keeps full microsecond precision on datetimes"""
+    
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+class KeysetPage:
+    """One page of a KeysetPaginator, with cursors for its neighbours
+    
+    Iterates like a Django Page. Instead of page numbers it offers query
+    strings (the current GET parameters with the cursor swapped) for the
+    first, previous and next pages.
+    """
+    
+    def __init__(self, object_list, has_previous, has_next, previous_cursor, next_cursor, params, cursor_param):
+        self.object_list = object_list
+        self._has_previous = has_previous
+        self._has_next = has_next
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+        self._params = params
+        self._cursor_param = cursor_param
+    
+    def __iter__(self):
+        return iter(self.object_list)
+    
+    def __len__(self):
+        return len(self.object_list)
+    
+    def __getitem__(self, index):
+        return self.object_list[index]
+    
+    def has_previous(self):
+        return self._has_previous
+    
+    def has_next(self):
+        return self._has_next
+    
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+    
+    def _query(self, cursor):
+        params = self._params.copy()
+        params.pop(self._cursor_param, None)
+        if cursor:
+            params[self._cursor_param] = cursor
+        return params.urlencode()
+    
+    @property
+    def first_query(self):
+        return self._query(None)
+    
+    @property
+    def previous_query(self):
+        return self._query(self.previous_cursor)
+    
+    @property
+    def next_query(self):
+        return self._query(self.next_cursor)
+
+class KeysetPaginator:
+    """Cursor pagination over a queryset's ordering plus the primary key
+    
+    Each page is fetched with a WHERE on the (sort key, pk) of the row at
+    its edge and a LIMIT, so there is no OFFSET and no COUNT(*): a deep
+    page costs the same as the first. Sort keys may be nullable; NULLs
+    always sort last. Ordering must be plain field names or paths such as
+    'zone__zone_code', optionally prefixed with '-'.
+    """
+    
+    def __init__(self, queryset, per_page, cursor_param='cursor'):
+        self.per_page = per_page
+        self.cursor_param = cursor_param
+        self.model = queryset.model
+        
+        ordering = list(queryset.query.order_by) or list(self.model._meta.ordering)
+        self.keys = []
+        for name in ordering:
+            if not isinstance(name, str):
+                raise ValueError(f"Keyset pagination needs field-name ordering, got {name!r}")
+            descending = name.startswith('-')
+            path = name.lstrip('-')
+            self.keys.append((self.model._meta.pk.name if path == 'pk' else path, descending))
+        pk_name = self.model._meta.pk.name
+        if not any(path == pk_name for path, _ in self.keys):
+            # Ties on the sort key are broken by the primary key, in the same direction
+            self.keys.append((pk_name, self.keys[-1][1] if self.keys else False))
+        # Only nullable keys get NULL handling, so plain indexes still serve the rest
+        self.nullable = [self._field(path).null for path, _ in self.keys]
+        self.queryset = queryset
+    
+    def _field(self, path):
+        model = self.model
+        parts = path.split('__')
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+        field = model._meta.get_field(parts[-1])
+        if field.is_relation:
+            field = field.target_field
+        return field
+    
+    def _order_by(self, reverse=False):
+        expressions = []
+        for (path, descending), nullable in zip(self.keys, self.nullable):
+            nulls = {}
+            if nullable:
+                nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+            if descending != reverse:
+                expressions.append(F(path).desc(**nulls))
+            else:
+                expressions.append(F(path).asc(**nulls))
+        return expressions
+    
+    def _values(self, obj):
+        values = []
+        for path, _ in self.keys:
+            value = obj
+            parts = path.split('__')
+            for part in parts:
+                if value is None:
+                    break
+                field = type(value)._meta.get_field(part)
+                value = getattr(value, field.attname if part == parts[-1] else part)
+            values.append(value)
+        return values
+    
+    def encode_cursor(self, obj, direction):
+        payload = json.dumps({'d': direction, 'v': self._values(obj)}, cls=CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    def decode_cursor(self, cursor):
+        """Return (direction, values), or None for a missing or unusable cursor"""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            direction, raw_values = payload['d'], payload['v']
+            if direction not in ('next', 'prev') or len(raw_values) != len(self.keys):
+                return None
+            values = [
+                None if raw is None else self._field(path).to_python(raw)
+                for (path, _), raw in zip(self.keys, raw_values)
+            ]
+        except (ValueError, TypeError, KeyError, ValidationError, FieldDoesNotExist):
+            return None
+        return direction, values
+    
+    def _after(self, values):
+        """Rows that sort strictly after the cursor row (NULLs last)"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (path, descending), nullable, value in zip(self.keys, self.nullable, values):
+            if value is None:
+                # Nothing non-null sorts after a NULL
+                step = Q(pk__in=[])
+                same = Q(**{f'{path}__isnull': True})
+            else:
+                step = Q(**{f"{path}__{'lt' if descending else 'gt'}": value})
+                if nullable:
+                    step |= Q(**{f'{path}__isnull': True})
+                same = Q(**{path: value})
+            condition |= equal & step
+            equal &= same
+        return condition
+    
+    def _before(self, values):
+        """Rows that sort strictly before the cursor row (NULLs last)"""
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (path, descending), value in zip(self.keys, values):
+            if value is None:
+                step = Q(**{f'{path}__isnull': False})
+                same = Q(**{f'{path}__isnull': True})
+            else:
+                step = Q(**{f"{path}__{'gt' if descending else 'lt'}": value})
+                same = Q(**{path: value})
+            condition |= equal & step
+            equal &= same
+        return condition
+    
+    def page(self, cursor=None, params=None):
+        """Return the page a cursor points at (the first page if the cursor is missing or invalid)"""
+        params = params if params is not None else QueryDict()
+        decoded = self.decode_cursor(cursor)
+        
+        if decoded and decoded[0] == 'prev':
+            rows = list(
+                self.queryset.filter(self._before(decoded[1]))
+                .order_by(*self._order_by(reverse=True))[:self.per_page + 1]
+            )
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if decoded:
+                queryset = queryset.filter(self._after(decoded[1]))
+            rows = list(queryset.order_by(*self._order_by())[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = decoded is not None
+        
+        if not rows and decoded:
+            # The cursor row's neighbours are gone (e.g. deleted); start over
+            return self.page(None, params)
+        
+        return KeysetPage(
+            rows,
+            has_previous=has_previous,
+            has_next=has_next,
+            previous_cursor=self.encode_cursor(rows[0], 'prev') if has_previous and rows else None,
+            next_cursor=self.encode_cursor(rows[-1], 'next') if has_next and rows else None,
+            params=params,
+            cursor_param=self.cursor_param,
+        )
+
+class KeysetPaginationMixin:
+    """ListView mixin that paginates with keyset cursors instead of page numbers
+    
+    The view's paginate_by still sets the page size; the ordering comes from
+    the queryset get_queryset() returns.
+    """
+    
+    cursor_param = 'cursor'
+    
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size, self.cursor_param)
+        page = paginator.page(self.request.GET.get(self.cursor_param), self.request.GET)
+        return paginator, page, page.object_list, page.has_other_pages()
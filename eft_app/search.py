@@ -0,0 +1,202 @@
+# eft_app/search.py
+import sqlite3
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from .models import Bank, Scheme, Supplier
+
+class SearchBackend:
+    """Substring search over a model's searchable fields with icontains
+    
+    Matches what the list views always did, and needs no index. The
+    indexed backends below give the same results and fall back to this
+    for queries too short for their index.
+    """
+    
+    name = 'basic'
+    
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+    
+    def install(self):
+        """Create whatever the backend needs in the database; True if it had to be built"""
+        return False
+    
+    def rebuild(self):
+        """Re-index every row, returning how many were indexed"""
+        return 0
+    
+    def update(self, obj):
+        pass
+    
+    def remove(self, pk):
+        pass
+    
+    def filter(self, queryset, query):
+        condition = Q()
+        for field in self.fields:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+class SQLiteFTSBackend(SearchBackend):
+    """SQLite FTS5 table with the trigram tokenizer, one row per model row
+    
+    The table holds a copy of the searchable columns under the row's pk
+    and is kept in sync by the post_save/post_delete handlers in
+    signals.py, inside the same database transaction as the write. A
+    trigram phrase match is a case-insensitive substring match, so
+    results equal icontains on any field. Needs SQLite 3.34+.
+    """
+    
+    name = 'fts5'
+    MIN_QUERY_LENGTH = 3  # Trigrams cannot match anything shorter
+    
+    @property
+    def table(self):
+        return f'{self.model._meta.db_table}_fts'
+    
+    def install(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table])
+            if cursor.fetchone():
+                return False
+            columns = ', '.join(connection.ops.quote_name(field) for field in self.fields)
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {connection.ops.quote_name(self.table)} "
+                f"USING fts5({columns}, tokenize = 'trigram')"
+            )
+        self.rebuild()
+        return True
+    
+    def _insert_sql(self):
+        columns = ', '.join(connection.ops.quote_name(field) for field in self.fields)
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+        return f"INSERT INTO {connection.ops.quote_name(self.table)} (rowid, {columns}) VALUES ({placeholders})"
+    
+    def rebuild(self):
+        rows = self.model._default_manager.order_by().values_list('pk', *self.fields)
+        count = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(self.table)}")
+            batch = []
+            for row in rows.iterator(chunk_size=2000):
+                batch.append(row)
+                if len(batch) == 2000:
+                    cursor.executemany(self._insert_sql(), batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                cursor.executemany(self._insert_sql(), batch)
+                count += len(batch)
+        return count
+    
+    def update(self, obj):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(self.table)} WHERE rowid = %s", [obj.pk])
+            cursor.execute(self._insert_sql(), [obj.pk, *(getattr(obj, field) for field in self.fields)])
+    
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(self.table)} WHERE rowid = %s", [pk])
+    
+    def filter(self, queryset, query):
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return super().filter(queryset, query)
+        table = connection.ops.quote_name(self.table)
+        phrase = '"' + query.replace('"', '""') + '"'
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [phrase]))
+
+class PostgresTrigramBackend(SearchBackend):
+    """pg_trgm GIN indexes under the icontains predicates
+    
+    Django compiles icontains to UPPER(col::text) LIKE UPPER(%s) on
+    PostgreSQL, so each searchable column gets a trigram index on exactly
+    that expression and the planner serves the query from a bitmap OR of
+    the indexes. PostgreSQL maintains them, so saves need no extra work.
+    """
+    
+    name = 'trigram'
+    
+    def index_name(self, field):
+        return f'{self.model._meta.db_table}_{field}_trgm'
+    
+    def install(self):
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        created = False
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for field in self.fields:
+                cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [self.index_name(field)])
+                if cursor.fetchone():
+                    continue
+                column = connection.ops.quote_name(self.model._meta.get_field(field).column)
+                cursor.execute(
+                    f"CREATE INDEX {connection.ops.quote_name(self.index_name(field))} "
+                    f"ON {table} USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+                )
+                created = True
+        return created
+
+class SearchIndex:
+    """Search backends for the master data lists and lookups
+    
+    The backend follows the database (FTS5 on SQLite, pg_trgm on
+    PostgreSQL) unless EFT_SEARCH_BACKEND names one. Indexes are created
+    after migrate (see apps.py) and can be rebuilt with the
+    rebuild_search_index command.
+    """
+    
+    FIELDS = {
+        Supplier: ('supplier_code', 'supplier_name', 'account_number', 'account_name'),
+        Bank: ('bank_name', 'swift_code'),
+        Scheme: ('scheme_code', 'scheme_name'),
+    }
+    
+    BACKENDS = {backend.name: backend for backend in (SearchBackend, SQLiteFTSBackend, PostgresTrigramBackend)}
+    
+    @staticmethod
+    def backend_class():
+        name = getattr(settings, 'EFT_SEARCH_BACKEND', 'auto')
+        if name != 'auto':
+            return SearchIndex.BACKENDS[name]
+        if connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0):
+            return SQLiteFTSBackend
+        if connection.vendor == 'postgresql':
+            return PostgresTrigramBackend
+        return SearchBackend
+    
+    @staticmethod
+    def backend(model):
+        return SearchIndex.backend_class()(model, SearchIndex.FIELDS[model])
+    
+    @staticmethod
+    def search(queryset, query):
+        """Filter a queryset of a searchable model down to rows matching query"""
+        query = query.strip()
+        if not query:
+            return queryset
+        return SearchIndex.backend(queryset.model).filter(queryset, query)
+    
+    @staticmethod
+    def install():
+        """Create any missing indexes, returning the models whose index was built"""
+        tables = connection.introspection.table_names()
+        return [
+            model for model in SearchIndex.FIELDS
+            if model._meta.db_table in tables and SearchIndex.backend(model).install()
+        ]
+    
+    @staticmethod
+    def update(obj):
+        SearchIndex.backend(type(obj)).update(obj)
+    
+    @staticmethod
+    def remove(obj):
+        SearchIndex.backend(type(obj)).remove(obj.pk)
+    
+    @staticmethod
+    def rebuild():
+        """Re-index every searchable model, returning {model: rows indexed}"""
+        return {model: SearchIndex.backend(model).rebuild() for model in SearchIndex.FIELDS}
@@ -0,0 +1,73 @@
+# eft_app/signals.py
+from django.contrib.auth.models import User
+from django.db import transaction as db_transaction
+from django.db.models.signals import post_save, post_delete
+from .models import Bank, Zone, Scheme, Supplier, DebitAccount, EFTBatch
+from .artifact_cache import EFTArtifactCache
+from .choice_cache import MasterDataChoices
+from .supplier_lookup import SupplierLookup
+from .search import SearchIndex
+from .stats import AdminDashboardStats
+
+# Models the admin dashboard counts or lists
+DASHBOARD_MODELS = (User, Bank, Zone, Scheme, Supplier, DebitAccount, EFTBatch)
+
+# Saves limited to these fields cannot change anything the dashboard shows
+IGNORED_UPDATE_FIELDS = {
+    User: {'last_login'},
+    EFTBatch: {'total_amount', 'record_count', 'last_sequence', 'updated_at', 'generated_at', 'beneficiaries_frozen_at'},
+}
+
+def invalidate_admin_dashboard(sender, update_fields=None, **kwargs):
+    """Drop the cached dashboard figures once the change is committed"""
+    if update_fields and set(update_fields) <= IGNORED_UPDATE_FIELDS.get(sender, set()):
+        return
+    # After commit, so a concurrent request cannot re-cache the pre-change figures
+    db_transaction.on_commit(AdminDashboardStats.invalidate)
+
+for model in DASHBOARD_MODELS:
+    post_save.connect(invalidate_admin_dashboard, sender=model, dispatch_uid=f'admin_dashboard_save_{model.__name__}')
+    post_delete.connect(invalidate_admin_dashboard, sender=model, dispatch_uid=f'admin_dashboard_delete_{model.__name__}')
+
+def update_search_index(sender, instance, **kwargs):
+    SearchIndex.update(instance)
+
+def remove_from_search_index(sender, instance, **kwargs):
+    SearchIndex.remove(instance)
+
+def install_search_indexes(sender, **kwargs):
+    """Create the search indexes (built from existing rows) once the tables exist"""
+    SearchIndex.install()
+
+# Written in the same database transaction as the row, so the index cannot drift on rollback
+for model in SearchIndex.FIELDS:
+    post_save.connect(update_search_index, sender=model, dispatch_uid=f'search_index_save_{model.__name__}')
+    post_delete.connect(remove_from_search_index, sender=model, dispatch_uid=f'search_index_delete_{model.__name__}')
+
+# Models whose rows, or labels, appear in the cached transaction form dropdowns
+CHOICE_MODELS = (Scheme, DebitAccount, Zone)
+
+def bump_choice_version(sender, **kwargs):
+    db_transaction.on_commit(MasterDataChoices.bump)
+
+for model in CHOICE_MODELS:
+    post_save.connect(bump_choice_version, sender=model, dispatch_uid=f'choice_cache_save_{model.__name__}')
+    post_delete.connect(bump_choice_version, sender=model, dispatch_uid=f'choice_cache_delete_{model.__name__}')
+
+# Models whose rows feed the supplier typeahead (a bank's name and SWIFT code are shown with each supplier)
+LOOKUP_MODELS = (Supplier, Bank)
+
+def bump_supplier_lookup_version(sender, **kwargs):
+    db_transaction.on_commit(SupplierLookup.bump)
+
+for model in LOOKUP_MODELS:
+    post_save.connect(bump_supplier_lookup_version, sender=model, dispatch_uid=f'supplier_lookup_save_{model.__name__}')
+    post_delete.connect(bump_supplier_lookup_version, sender=model, dispatch_uid=f'supplier_lookup_delete_{model.__name__}')
+
+# Master data written into EFT files; editing a row re-stamps the cached files that show it
+def touch_batches_using(sender, instance, created=False, **kwargs):
+    if not created:
+        EFTArtifactCache.touch_batches_using(instance)
+
+for model in EFTArtifactCache.FILE_MASTER_DATA:
+    post_save.connect(touch_batches_using, sender=model, dispatch_uid=f'artifact_stamp_save_{model.__name__}')
@@ -0,0 +1,91 @@
+# eft_app/snapshot.py
+from collections import namedtuple
+from django.db.models import Q
+from . import money
+from .models import SEQUENCE_ORDERING
+
+# One transaction line with every join the EFT file needs already resolved
+TransactionRow = namedtuple('TransactionRow', [
+    'sequence_number',
+    'amount',
+    'narration',
+    'reference_number',
+    'debit_account_number',
+    'zone_code',
+    'scheme_code',
+    'supplier_name',
+    'credit_reference',
+    'account_number',
+    'swift_code',
+])
+
+# values_list() lookups, in TransactionRow field order
+TRANSACTION_ROW_FIELDS = (
+    'sequence_number',
+    'amount',
+    'narration',
+    'reference_number',
+    'debit_account__account_number',
+    'zone__zone_code',
+    'scheme__scheme_code',
+    'supplier__supplier_name',
+    'supplier__credit_reference',
+    'supplier__account_number',
+    'supplier__bank__swift_code',
+)
+
+# Same row, with beneficiary details read from the columns frozen on submission
+FROZEN_TRANSACTION_ROW_FIELDS = TRANSACTION_ROW_FIELDS[:7] + (
+    'beneficiary_name',
+    'beneficiary_credit_reference',
+    'beneficiary_account_number',
+    'beneficiary_swift_code',
+)
+
+# TransactionRow fields every body record must carry
+REQUIRED_ROW_FIELDS = ('debit_account_number', 'supplier_name', 'swift_code', 'scheme_code', 'zone_code')
+
+def row_fields(batch):
+    """values_list() lookups for the batch, frozen or live"""
+    return FROZEN_TRANSACTION_ROW_FIELDS if batch.beneficiaries_frozen_at else TRANSACTION_ROW_FIELDS
+
+def transaction_rows(batch):
+    """Queryset of a batch's transactions as flat joined tuples, in file order"""
+    return batch.transactions.order_by(*SEQUENCE_ORDERING).values_list(*row_fields(batch))
+
+def incomplete_rows(batch):
+    """transaction_rows() narrowed to lines missing a field the file requires"""
+    fields = row_fields(batch)
+    condition = Q()
+    for name in REQUIRED_ROW_FIELDS:
+        path = fields[TransactionRow._fields.index(name)]
+        condition |= Q(**{f'{path}__isnull': True}) | Q(**{path: ''})
+    return transaction_rows(batch).filter(condition)
+
+class BatchSnapshot(namedtuple('BatchSnapshot', [
+    'batch_id', 'batch_name', 'currency', 'status',
+    'batch_total_amount', 'batch_record_count',
+    'rows', 'total_amount', 'record_count',
+])):
+    """Immutable view of a batch header and its transaction rows
+    
+    Loaded with a single query so validation, totals and serialization
+    all work from the same data.
+    """
+    __slots__ = ()
+    
+    @classmethod
+    def load(cls, batch):
+        """Load a snapshot of the batch in one values_list query"""
+        rows = tuple(TransactionRow._make(values) for values in transaction_rows(batch))
+        return cls(
+            batch_id=batch.pk,
+            batch_name=batch.batch_name,
+            currency=batch.currency,
+            status=batch.status,
+            batch_total_amount=batch.total_amount,
+            batch_record_count=batch.record_count,
+            rows=rows,
+            total_amount=money.from_minor(money.sum_minor(row.amount for row in rows)),
+            record_count=len(rows),
+        )
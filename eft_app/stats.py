@@ -0,0 +1,147 @@
+# eft_app/stats.py
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, Count, Max, Q, Sum
+from django.db.utils import DatabaseError, OperationalError
+from django.utils import timezone
+from .models import Bank, Zone, Scheme, Supplier, DebitAccount, EFTBatch
+
+def today_range():
+    """Start and end of today in the current timezone, for index-friendly range filters"""
+    start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + timedelta(days=1)
+
+class BatchStats:
+    """Batch counts and totals computed with one conditional-aggregation query
+    
+    Every figure is an aggregate with its own filter over the same base
+    queryset, so a page that needs per-status counts alongside totals for
+    the rows it lists pays for a single SELECT.
+    """
+    
+    STATUSES = [status for status, _ in EFTBatch.STATUS_CHOICES]
+    
+    @staticmethod
+    def summary(batches, match=None):
+        """Aggregate a batch queryset
+        
+        Returns a dict with:
+          - '<status>_count' for every status (lower-case), and 'total_count'
+          - 'approved_amount': sum of APPROVED batch totals
+          - 'matched_count', 'matched_amount', 'matched_records',
+            'matched_avg_records', 'matched_draft_count': figures for the rows
+            matching ``match`` (a Q object, e.g. the list's search and status
+            filter); without ``match`` they cover every row
+        """
+        match = match if match is not None else Q()
+        aggregates = {
+            f"{status.lower()}_count": Count('id', filter=Q(status=status))
+            for status in BatchStats.STATUSES
+        }
+        aggregates.update(
+            total_count=Count('id'),
+            approved_amount=Sum('total_amount', filter=Q(status='APPROVED')),
+            matched_count=Count('id', filter=match),
+            matched_amount=Sum('total_amount', filter=match),
+            matched_records=Sum('record_count', filter=match),
+            matched_avg_records=Avg('record_count', filter=match),
+            matched_draft_count=Count('id', filter=match & Q(status='DRAFT')),
+        )
+        summary = batches.order_by().aggregate(**aggregates)
+        
+        # Sums and averages over no rows come back as None
+        for key in ('approved_amount', 'matched_amount'):
+            summary[key] = summary[key] or Decimal('0')
+        summary['matched_records'] = summary['matched_records'] or 0
+        summary['matched_avg_records'] = summary['matched_avg_records'] or 0
+        return summary
+
+class AdminDashboardStats:
+    """Cached figures for the system admin dashboard and its status APIs
+    
+    Everything the dashboard shows from the database is computed together
+    and cached until a signal (see signals.py) reports a change to a model
+    it counts, or the day rolls over. The timeout only bounds staleness in
+    other processes, whose local-memory caches the signals cannot reach.
+    """
+    
+    STATS_KEY = 'eft:admin-dashboard:stats'
+    DB_STATUS_KEY = 'eft:admin-dashboard:db-status'
+    
+    @staticmethod
+    def _timeout():
+        return getattr(settings, 'EFT_DASHBOARD_CACHE_TIMEOUT', 300)
+    
+    @staticmethod
+    def _status_timeout():
+        return getattr(settings, 'EFT_DB_STATUS_CACHE_TIMEOUT', 30)
+    
+    @staticmethod
+    def compute():
+        """Run the dashboard queries; raises DatabaseError if the database is unavailable"""
+        today_start, today_end = today_range()
+        users = User.objects.aggregate(
+            users_count=Count('id'),
+            active_users_count=Count('id', filter=Q(is_active=True)),
+        )
+        batches = EFTBatch.objects.order_by().aggregate(
+            today_batches_count=Count('id', filter=Q(created_at__gte=today_start, created_at__lt=today_end)),
+            last_batch_at=Max('created_at'),
+        )
+        recent_users = [
+            {'name': f"{first_name} {last_name}".strip() or username, 'joined': joined}
+            for username, first_name, last_name, joined in
+            User.objects.order_by('-date_joined').values_list('username', 'first_name', 'last_name', 'date_joined')[:3]
+        ]
+        
+        return {
+            'date': today_start.date(),
+            'stats': {
+                **users,
+                'banks_count': Bank.objects.count(),
+                'suppliers_count': Supplier.objects.count(),
+                'zones_count': Zone.objects.count(),
+                'schemes_count': Scheme.objects.count(),
+                'debit_accounts_count': DebitAccount.objects.count(),
+            },
+            'first_user_joined': User.objects.order_by('date_joined').values_list('date_joined', flat=True).first(),
+            'today_batches_count': batches['today_batches_count'],
+            'last_batch_at': batches['last_batch_at'],
+            'recent_users': recent_users,
+            'recent_banks': list(Bank.objects.order_by('-created_at').values('bank_name', 'swift_code', 'created_at')[:2]),
+            'recent_approvals': list(
+                EFTBatch.objects.filter(status='APPROVED').order_by('-approved_at').values('batch_name', 'approved_at')[:3]
+            ),
+        }
+    
+    @staticmethod
+    def get():
+        """Return the cached dashboard figures, computing them on a miss"""
+        data = cache.get(AdminDashboardStats.STATS_KEY)
+        if data is None or data['date'] != timezone.localdate():
+            data = AdminDashboardStats.compute()
+            cache.set(AdminDashboardStats.STATS_KEY, data, AdminDashboardStats._timeout())
+        return data
+    
+    @staticmethod
+    def invalidate():
+        cache.delete(AdminDashboardStats.STATS_KEY)
+    
+    @staticmethod
+    def database_status():
+        """(connected, error) for the database, re-checked at most every few seconds"""
+        status = cache.get(AdminDashboardStats.DB_STATUS_KEY)
+        if status is None:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                status = (True, None)
+            except (OperationalError, DatabaseError) as e:
+                status = (False, str(e))
+            cache.set(AdminDashboardStats.DB_STATUS_KEY, status, AdminDashboardStats._status_timeout())
+        return status
@@ -0,0 +1,216 @@
+# eft_app/supplier_lookup.py
+import bisect
+import threading
+import time
+import uuid
+from django import forms
+from django.conf import settings
+from django.core.cache import cache
+from django.forms.utils import flatatt
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .models import Supplier
+
+class SupplierLookup:
+    """In-memory typeahead index over active suppliers
+    
+    Each process keeps every active supplier's display fields plus sorted
+    keys for prefix matching and one lowercased haystack for substring
+    matching, so a keystroke costs a few bisects and, only when those do
+    not fill the page, one scan of a string. The index is rebuilt when
+    the version stamp that signals.py replaces on supplier and bank writes
+    changes, or when it is older than EFT_SUPPLIER_LOOKUP_MAX_AGE (for
+    processes that do not share the cache).
+    """
+    
+    VERSION_KEY = 'eft:supplier_lookup:version'
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 50
+    
+    # Result key -> values() path; the same details get_supplier_details returns
+    FIELDS = {
+        'id': 'id',
+        'supplier_code': 'supplier_code',
+        'supplier_name': 'supplier_name',
+        'bank_name': 'bank__bank_name',
+        'swift_code': 'bank__swift_code',
+        'account_number': 'account_number',
+        'account_name': 'account_name',
+        'credit_reference': 'credit_reference',
+        'cost_center': 'cost_center',
+    }
+    
+    _index = None  # (version, built_at, data) swapped in whole, so readers never see a half-built index
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _max_age():
+        return getattr(settings, 'EFT_SUPPLIER_LOOKUP_MAX_AGE', 300)
+    
+    @staticmethod
+    def version():
+        version = cache.get(SupplierLookup.VERSION_KEY)
+        if version is None:
+            version = SupplierLookup.bump()
+        return version
+    
+    @staticmethod
+    def bump():
+        """Start a new version, so every process rebuilds its index on the next lookup"""
+        version = uuid.uuid4().hex
+        cache.set(SupplierLookup.VERSION_KEY, version, None)
+        return version
+    
+    @staticmethod
+    def build():
+        """The index data for the current active suppliers"""
+        rows = (
+            Supplier.objects.filter(is_active=True)
+            .order_by('supplier_name', 'supplier_code')
+            .values_list(*SupplierLookup.FIELDS.values())
+        )
+        results, codes, names, words, accounts, starts, haystack = [], [], [], [], [], [], []
+        offset = 0
+        for row in rows.iterator(chunk_size=2000):
+            result = {key: value or '' for key, value in zip(SupplierLookup.FIELDS, row)}
+            result['label'] = f"{result['supplier_code']} - {result['supplier_name']}"
+            index = len(results)
+            results.append(result)
+            
+            code = result['supplier_code'].lower()
+            name = result['supplier_name'].lower()
+            account = result['account_number'].lower()
+            codes.append((code, index))
+            names.append((name, index))
+            accounts.append((account, index))
+            words.extend((word, index) for word in set(name.split()[1:]))
+            
+            # Fields joined with a tab, rows with a newline: a query (no tabs or newlines) matches within one field
+            line = f"{code}\t{name}\t{account}"
+            starts.append(offset)
+            haystack.append(line)
+            offset += len(line) + 1
+        
+        return {
+            'results': results,
+            'by_id': {result['id']: index for index, result in enumerate(results)},
+            'codes': sorted(codes),
+            'names': sorted(names),
+            'words': sorted(words),
+            'accounts': sorted(accounts),
+            'starts': starts,
+            'haystack': '\n'.join(haystack),
+        }
+    
+    @staticmethod
+    def index():
+        """The current index, rebuilt first if suppliers changed or it is too old"""
+        version = SupplierLookup.version()
+        current = SupplierLookup._index
+        if current and current[0] == version and time.monotonic() - current[1] < SupplierLookup._max_age():
+            return current[2]
+        with SupplierLookup._lock:
+            # Another thread may have rebuilt it while this one waited
+            current = SupplierLookup._index
+            if current and current[0] == version and time.monotonic() - current[1] < SupplierLookup._max_age():
+                return current[2]
+            data = SupplierLookup.build()
+            SupplierLookup._index = (version, time.monotonic(), data)
+            return data
+    
+    @staticmethod
+    def _prefixed(keys, prefix):
+        """Row indexes whose key starts with prefix, in key order"""
+        position = bisect.bisect_left(keys, (prefix,))
+        while position < len(keys) and keys[position][0].startswith(prefix):
+            yield keys[position][1]
+            position += 1
+    
+    @staticmethod
+    def _containing(data, query):
+        """Row indexes with query anywhere in code, name or account number, in name order"""
+        haystack, starts = data['haystack'], data['starts']
+        position = haystack.find(query)
+        while position != -1:
+            index = bisect.bisect_right(starts, position) - 1
+            yield index
+            following = index + 1
+            if following == len(starts):
+                return
+            position = haystack.find(query, starts[following])
+    
+    @staticmethod
+    def search(query, limit=None):
+        """Up to limit active suppliers matching query, best first
+        
+        Ranked by code prefix (an exact code sorts first), name prefix,
+        prefix of a later word in the name, account number prefix, then
+        substring of any of the three; each tier in its key's order.
+        """
+        query = ' '.join(query.split()).lower()
+        limit = min(max(limit or SupplierLookup.DEFAULT_LIMIT, 1), SupplierLookup.MAX_LIMIT)
+        if not query:
+            return []
+        
+        data = SupplierLookup.index()
+        tiers = (
+            SupplierLookup._prefixed(data['codes'], query),
+            SupplierLookup._prefixed(data['names'], query),
+            SupplierLookup._prefixed(data['words'], query),
+            SupplierLookup._prefixed(data['accounts'], query),
+            SupplierLookup._containing(data, query),
+        )
+        seen, found = set(), []
+        for tier in tiers:
+            for index in tier:
+                if index not in seen:
+                    seen.add(index)
+                    found.append(data['results'][index])
+                    if len(found) == limit:
+                        return found
+        return found
+    
+    @staticmethod
+    def get(pk):
+        """The result dict for an active supplier, or None"""
+        data = SupplierLookup.index()
+        try:
+            index = data['by_id'].get(int(pk))
+        except (TypeError, ValueError):
+            return None
+        return None if index is None else data['results'][index]
+
+class SupplierTypeahead(forms.Widget):
+    """Supplier picker for ModelChoiceField: a hidden id plus a search box fed by the supplier_lookup endpoint
+    
+    The page must include includes/supplier_typeahead.html for the
+    behaviour. The hidden input keeps the field's name and id, so the
+    submitted value is validated against the field's queryset as before.
+    """
+    
+    def render(self, name, value, attrs=None, renderer=None):
+        final_attrs = self.build_attrs(self.attrs, attrs)
+        field_id = final_attrs.pop('id', f'id_{name}')
+        supplier = SupplierLookup.get(value) if value not in (None, '') else None
+        search_attrs = {
+            **final_attrs,
+            'type': 'text',
+            'id': f'{field_id}_search',
+            'autocomplete': 'off',
+            'placeholder': final_attrs.get('placeholder', 'Type a vendor code, name or account number'),
+            'value': supplier['label'] if supplier else '',
+        }
+        return format_html(
+            '<div class="supplier-typeahead position-relative" data-url="{}">'
+            '<input type="hidden" name="{}" id="{}" value="{}">'
+            '<input{}>'
+            '<div class="list-group supplier-typeahead-menu shadow-sm"></div>'
+            '</div>',
+            reverse('supplier_lookup'), name, field_id, supplier['id'] if supplier else '',
+            mark_safe(flatatt(search_attrs)),
+        )
+    
+    def value_from_datadict(self, data, files, name):
+        return data.get(name)
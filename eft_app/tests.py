@@ -1,3 +1,779 @@
-from django.test import TestCase
+import json
+import os
+import re
+import tempfile
+import zipfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from . import money
+from .models import (
+    Bank, Zone, Scheme, Supplier, DebitAccount,
+    EFTBatch, EFTTransaction, EFTArtifact, ApprovalAuditLog,
+    ArchivedBatch, ArchivedTransaction, ArchivedAuditLog
+)
+from .artifact_cache import EFTArtifactCache
+from .bulk_export import EFTBundleExporter
+from .eft_formats import FORMATS
+from .eft_generator import EFTGenerator
+from .eft_importer import EFTImporter, EFTImportError
+from .eft_validator import EFTFileValidator
+from .legacy_files import LegacyGeneratedFiles
+from .pagination import KeysetPaginator
+from .search import SearchIndex
+from .snapshot import BatchSnapshot, TransactionRow
+
+class EFTTestCase(TestCase):
+    """Shared master data: a clerk, bank, zone, scheme, supplier and debit account"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', password='x')
+        cls.bank = Bank.objects.create(bank_name='Test Bank', swift_code='TESTMWM0', created_by=cls.user)
+        cls.zone = Zone.objects.create(zone_code='TZ', zone_name='Test Zone')
+        cls.scheme = Scheme.objects.create(scheme_code='T1', scheme_name='Test Scheme', zone=cls.zone)
+        cls.supplier = Supplier.objects.create(supplier_code='0000001', supplier_name='Test Supplier', bank=cls.bank,
+                                               account_number='123', account_name='Test', created_by=cls.user)
+        cls.debit_account = DebitAccount.objects.create(account_number='13000000000', account_name='Test')
+    
+    @classmethod
+    def make_line(cls, amount, **fields):
+        """An unsaved transaction for the shared master data"""
+        return EFTTransaction(debit_account=cls.debit_account, supplier=cls.supplier, scheme=cls.scheme,
+                              zone=cls.zone, amount=Decimal(amount), **fields)
+    
+    @classmethod
+    def make_batch(cls, amounts=(), status='DRAFT', **fields):
+        """A batch holding one line per amount, added with bulk_add_transactions"""
+        fields.setdefault('batch_name', 'Test Batch')
+        batch = EFTBatch.objects.create(created_by=cls.user, status=status, debit_account=cls.debit_account, **fields)
+        batch.bulk_add_transactions([cls.make_line(amount) for amount in amounts])
+        return batch
+
+class QueryPlanTests(EFTTestCase):
+    """The hot dashboard/list queries should stay index-backed
+    
+    Each test captures the EXPLAIN output for a query the views run and
+    checks that the planner chose the intended index.
+    """
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.batch = cls.make_batch(['1.00'], batch_name='Plan', batch_reference='PLAN-1')
+        ApprovalAuditLog.objects.create(batch=cls.batch, action='SUBMITTED', user=cls.user)
+    
+    def explain(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Tiny test tables would otherwise always be sequentially scanned
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+        return queryset.explain()
+    
+    def assertUsesIndex(self, queryset, index_name):
+        plan = self.explain(queryset)
+        self.assertIn(index_name, plan, f"Expected {index_name} in plan:\n{plan}")
+    
+    def test_batch_list_uses_owner_status_index(self):
+        queryset = EFTBatch.objects.filter(created_by=self.user, status='DRAFT').order_by('-created_at')
+        self.assertUsesIndex(queryset, 'eftbatch_owner_status_idx')
+    
+    def test_approved_today_uses_status_approved_index(self):
+        start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        queryset = EFTBatch.objects.filter(status='APPROVED', approved_at__gte=start,
+                                           approved_at__lt=start + timedelta(days=1))
+        self.assertUsesIndex(queryset, 'eftbatch_status_approved_idx')
+    
+    def test_pending_queue_uses_partial_index(self):
+        # A realistic queue: few PENDING batches among many finished ones, with statistics
+        EFTBatch.objects.bulk_create(
+            EFTBatch(batch_name=f'Queue {number}', status='PENDING' if number < 2 else 'EXPORTED',
+                     created_by=self.user)
+            for number in range(40)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        
+        queryset = EFTBatch.objects.filter(status='PENDING').order_by('-created_at')
+        self.assertUsesIndex(queryset, 'eftbatch_pending_idx')
+        # The index order serves the ORDER BY; no separate sort step
+        plan = self.explain(queryset)
+        self.assertNotIn('TEMP B-TREE', plan)
+        self.assertNotRegex(plan, r'(?m)^\s*(->\s*)?Sort\b')
+    
+    def test_created_today_uses_created_index(self):
+        start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        queryset = EFTBatch.objects.filter(created_at__gte=start, created_at__lt=start + timedelta(days=1))
+        self.assertUsesIndex(queryset, 'eftbatch_created_idx')
+    
+    def test_batch_audit_log_uses_batch_time_index(self):
+        self.assertUsesIndex(self.batch.audit_logs.order_by('-timestamp'), 'auditlog_batch_time_idx')
+    
+    def test_transaction_lookups_use_foreign_key_indexes(self):
+        self.assertUsesIndex(EFTTransaction.objects.filter(supplier=self.supplier), 'efttransaction_supplier_id')
+        self.assertUsesIndex(EFTTransaction.objects.filter(scheme=self.scheme), 'efttransaction_scheme_id')
+    
+    def test_supplier_search_uses_search_index(self):
+        backend = SearchIndex.backend(Supplier)
+        if backend.name == 'basic':
+            self.skipTest('No search index on this database')
+        queryset = SearchIndex.search(Supplier.objects.all(), 'st SUPP')
+        self.assertEqual(list(queryset), [self.supplier])
+        index_name = backend.table if backend.name == 'fts5' else backend.index_name('supplier_name')
+        self.assertUsesIndex(queryset, index_name)
+
+
+def eft_lines(amounts, total=None, count=None, currency='MWK', zone='TZ', scheme='T1',
+              swift='TESTMWM0', account='123', debit_account='13000000000'):
+    """RBM file lines with one body record per amount (amounts as file text)"""
+    if total is None:
+        total = EFTFileValidator.format_cents(sum(EFTFileValidator.parse_amount(a) or 0 for a in amounts))
+    count = len(amounts) if count is None else count
+    lines = [f"0;Test Import;{currency};{total};{count:04d}"]
+    for seq, amount in enumerate(amounts, 1):
+        lines.append(';'.join([
+            '1', f"{seq:04d}", 'MWK', debit_account, zone, amount, 'Test Supplier', scheme,
+            '', '', '', swift, account, '', '', f"INV{seq}", f"Line {seq}",
+        ]))
+    return lines
+
+class MoneyTests(TestCase):
+    """Amounts are handled as exact integer tambala"""
+    
+    def test_format_rounds_half_up(self):
+        self.assertEqual(money.format_amount(Decimal('0.005')), '0.01')
+        self.assertEqual(money.format_amount(Decimal('0.004')), '0.00')
+        self.assertEqual(money.format_amount(Decimal('2.675')), '2.68')  # 2.67 through float
+        self.assertEqual(money.format_amount(Decimal('-0.005')), '-0.01')
+    
+    def test_to_minor_refuses_fractional_tambala(self):
+        with self.assertRaises(ValueError):
+            money.to_minor(Decimal('0.005'))
+        self.assertEqual(money.to_minor(Decimal('0.01')), 1)
+        self.assertEqual(money.to_minor(5), 500)  # Ints are whole kwacha
+    
+    def test_negative_amounts(self):
+        self.assertEqual(money.to_minor(Decimal('-12.34')), -1234)
+        self.assertEqual(money.from_minor(-1234), Decimal('-12.34'))
+        self.assertEqual(money.format_minor(-5), '-0.05')
+        self.assertEqual(money.parse_minor('-0.50'), -50)
+    
+    def test_parse_accepts_only_plain_amounts(self):
+        self.assertEqual(money.parse_minor('1234.56'), 123456)
+        self.assertEqual(money.parse_minor('7'), 700)
+        self.assertEqual(money.parse_minor('7.5'), 750)
+        for text in ('1,234.56', '1 234.56', ' 12.00', '12.00 ', '1e3', '0.005', 'NaN', 'Infinity', '12.', ''):
+            self.assertIsNone(money.parse_minor(text), text)
+    
+    def test_missing_amounts(self):
+        self.assertIsNone(money.parse_minor(None))
+        with self.assertRaises(ValueError):
+            money.to_minor(None)
+        with self.assertRaises(ValueError):
+            money.to_minor('')
+        self.assertEqual(money.sum_minor([]), 0)
+    
+    def test_sum_over_many_rows_matches_decimal(self):
+        amounts = [Decimal(f"{n % 997}.{n % 100:02d}") for n in range(20000)] + [Decimal('0.10')] * 1000
+        expected = sum(amounts, Decimal('0.00'))
+        self.assertEqual(money.from_minor(money.sum_minor(amounts)), expected)
+        self.assertNotEqual(sum(float(amount) for amount in amounts[-1000:]), 100.0)  # Float drifts
+        self.assertEqual(money.format_minor(money.sum_minor(amounts)), str(expected))
+
+class EFTFileValidatorTests(TestCase):
+    """Format, total and amount checks on RBM files"""
+    
+    def messages(self, lines):
+        report = EFTFileValidator().validate_lines(lines)
+        return report, [error['message'] for error in report['errors']]
+    
+    def test_valid_file(self):
+        report, messages = self.messages(eft_lines(['10.00', '2.50']))
+        self.assertTrue(report['valid'], messages)
+        self.assertEqual(report['record_count'], 2)
+        self.assertEqual(report['total_amount'], '12.50')
+    
+    def test_malformed_lines(self):
+        lines = eft_lines(['10.00', '2.50', '1.00'])
+        lines[1] = lines[1].rsplit(';', 1)[0]           # Missing a field
+        lines[2] = lines[2].replace(';2.50;', ';2.5x;')  # Unparseable amount
+        lines[3] = '2' + lines[3][1:]                    # Wrong record type
+        report, messages = self.messages(lines)
+        self.assertFalse(report['valid'])
+        self.assertIn('Invalid number of fields (16 instead of 17)', messages)
+        self.assertIn('Invalid amount format', messages)
+        self.assertIn('Body record must start with 1', messages)
+    
+    def test_header_total_and_count_mismatch(self):
+        report, messages = self.messages(eft_lines(['10.00', '2.50'], total='12.51', count=3))
+        self.assertFalse(report['valid'])
+        self.assertIn('Total amount mismatch: header says 12.51, sum is 12.50', messages)
+        self.assertIn('Record count mismatch: header says 3, file has 2', messages)
+    
+    def test_zero_and_negative_amounts(self):
+        report, messages = self.messages(eft_lines(['0.00', '-5.00', '7.00']))
+        self.assertFalse(report['valid'])
+        self.assertEqual(report['errors'][0]['line'], 2)
+        self.assertIn('Amount 0.00 must be greater than zero', messages)
+        self.assertIn('Amount -5.00 must be greater than zero', messages)
+    
+    def test_header_currency(self):
+        report, messages = self.messages(eft_lines(['10.00'], currency='USDX'))
+        self.assertFalse(report['valid'])
+        self.assertIn("Header currency must be MWK, not 'USDX'", messages)
+    
+    def test_escaped_delimiters_stay_in_their_field(self):
+        # The TXT writer escapes a literal ';' as '\;'
+        lines = eft_lines(['10.00', '2.50'])
+        lines[1] = lines[1].replace('Line 1', 'Rent\\; March')
+        report, messages = self.messages(lines)
+        self.assertTrue(report['valid'], messages)
+        self.assertEqual(report['total_amount'], '12.50')
+        self.assertEqual(EFTGenerator.validate_eft_structure('\n'.join(lines)), (True, "EFT file structure is valid"))
+
+class EFTImporterTests(EFTTestCase):
+    """Importing RBM files into DRAFT batches"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Zone.objects.create(zone_code='OZ', zone_name='Other Zone')
+    
+    def assertImportFails(self, lines, message):
+        with self.assertRaises(EFTImportError) as raised:
+            EFTImporter.import_lines(lines, self.user)
+        self.assertIn(message, [error['message'] for error in raised.exception.errors])
+        self.assertFalse(EFTBatch.objects.exists())
+        self.assertFalse(EFTTransaction.objects.exists())
+    
+    def test_import_creates_draft_batch(self):
+        batch = EFTImporter.import_lines(eft_lines(['10.00', '2.50']), self.user)
+        self.assertEqual(batch.status, 'DRAFT')
+        self.assertEqual(batch.currency, 'MWK')
+        self.assertEqual(batch.debit_account, self.debit_account)
+        self.assertEqual(batch.record_count, 2)
+        self.assertEqual(str(batch.total_amount), '12.50')
+        amounts = list(batch.transactions.order_by('sequence_number').values_list('amount', flat=True))
+        self.assertEqual([str(amount) for amount in amounts], ['10.00', '2.50'])
+        self.assertTrue(all(t.supplier_id == self.supplier.id for t in batch.transactions.all()))
+    
+    def test_malformed_file_is_rejected(self):
+        lines = eft_lines(['10.00'])
+        lines[1] = lines[1].rsplit(';', 1)[0]
+        self.assertImportFails(lines, 'Invalid number of fields (16 instead of 17)')
+    
+    def test_wrong_header_total_is_rejected(self):
+        self.assertImportFails(eft_lines(['10.00'], total='11.00'),
+                               'Total amount mismatch: header says 11.00, sum is 10.00')
+    
+    def test_unknown_master_data_is_rejected(self):
+        self.assertImportFails(eft_lines(['10.00'], debit_account='999'), 'Unknown or inactive debit account 999')
+        self.assertImportFails(eft_lines(['10.00'], scheme='NOPE'), 'Unknown or inactive scheme NOPE')
+        self.assertImportFails(eft_lines(['10.00'], zone='OZ'), 'Scheme T1 belongs to zone TZ, not OZ')
+        self.assertImportFails(eft_lines(['10.00'], account='456'), 'No active supplier with account 456 at TESTMWM0')
+    
+    def test_zero_and_negative_amounts_are_rejected(self):
+        self.assertImportFails(eft_lines(['0.00']), 'Amount 0.00 must be greater than zero')
+        self.assertImportFails(eft_lines(['5.00', '-5.00']), 'Amount -5.00 must be greater than zero')
+    
+    def test_build_transactions_rejects_non_positive_amounts(self):
+        # Checked per line even when the validator has been bypassed
+        header, records = EFTImporter.parse(eft_lines(['0.00', '-1.00', '3.00']))
+        transactions, errors = EFTImporter.build_transactions(records, EFTImporter.resolve_master_data(records))
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual([error['line'] for error in errors], [2, 3])
+    
+    def test_exported_file_imports_back(self):
+        batch = self.make_batch(status='APPROVED', batch_name='Round trip')
+        batch.bulk_add_transactions([
+            self.make_line('10.00', narration='Rent; March', reference_number='INV;7'),
+            self.make_line('2.50', narration='Back\\slash'),
+        ])
+        content = EFTGenerator.generate_eft_file(batch)
+        self.assertIn('Rent\\; March', content)
+        
+        imported = EFTImporter.import_lines(content.splitlines(keepends=True), self.user)
+        self.assertEqual((imported.batch_name, imported.total_amount, imported.record_count),
+                         ('Round trip', Decimal('12.50'), 2))
+        self.assertEqual(list(imported.transactions.values_list('narration', 'reference_number')),
+                         [('Rent; March', 'INV;7'), ('Back\\slash', '')])
+    
+    def test_wrong_currency_is_rejected(self):
+        self.assertImportFails(eft_lines(['10.00'], currency='USD'), "Header currency must be MWK, not 'USD'")
+
+class UsageCounterTests(EFTTestCase):
+    """Supplier, scheme and account counters follow status changes and queryset deletes"""
+    
+    def assertSupplierCounters(self, payment_count, total_paid):
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.payment_count, payment_count)
+        self.assertEqual(self.supplier.total_paid, Decimal(total_paid))
+    
+    def test_total_paid_follows_approval(self):
+        batch = self.make_batch(['10.00', '2.50'])
+        self.assertSupplierCounters(2, '0')
+        
+        for status, total_paid in (('PENDING', '0'), ('APPROVED', '12.50'), ('EXPORTED', '12.50'), ('REJECTED', '0')):
+            batch.status = status
+            batch.save()
+            self.assertSupplierCounters(2, total_paid)
+    
+    def test_lines_of_approved_batch_count_as_paid(self):
+        batch = self.make_batch(['10.00'], status='APPROVED')
+        self.assertSupplierCounters(1, '10.00')
+        
+        batch.transactions.get().delete()
+        self.assertSupplierCounters(0, '0')
+    
+    def test_status_only_save_moves_total_paid(self):
+        batch = self.make_batch(['7.25'])
+        batch = EFTBatch.objects.only('id', 'status').get(pk=batch.pk)
+        batch.status = 'APPROVED'
+        batch.save(update_fields=['status'])
+        self.assertSupplierCounters(1, '7.25')
+    
+    def test_transaction_queryset_delete(self):
+        batch = self.make_batch(['10.00', '2.50', '1.00'], status='APPROVED')
+        EFTTransaction.objects.filter(batch=batch, amount__lt=5).delete()
+        
+        batch.refresh_from_db()
+        self.assertEqual((batch.total_amount, batch.record_count), (Decimal('10.00'), 1))
+        self.assertSupplierCounters(1, '10.00')
+        self.scheme.refresh_from_db()
+        self.assertEqual(self.scheme.transaction_count, 1)
+    
+    def test_batch_queryset_delete(self):
+        self.make_batch(['10.00'], status='APPROVED')
+        self.make_batch(['4.00'])
+        EFTBatch.objects.all().delete()
+        
+        self.assertSupplierCounters(0, '0')
+        self.debit_account.refresh_from_db()
+        self.assertEqual(self.debit_account.batch_count, 0)
+    
+    def test_counters_never_go_negative(self):
+        batch = self.make_batch(['10.00'], status='APPROVED')
+        Supplier.objects.update(payment_count=0, total_paid=0)  # As a raw loaddata leaves them
+        batch.delete()
+        self.assertSupplierCounters(0, '0')
+    
+    def test_recompute_restores_loaded_counters(self):
+        self.make_batch(['10.00', '2.50'], status='APPROVED')
+        self.make_batch(['4.00'])
+        Supplier.objects.update(payment_count=0, total_paid=0)
+        DebitAccount.objects.update(batch_count=0)
+        
+        call_command('recompute_usage_counters', stdout=StringIO())
+        self.assertSupplierCounters(3, '12.50')
+        self.debit_account.refresh_from_db()
+        self.assertEqual(self.debit_account.batch_count, 2)
+    
+    def test_scheme_queryset_delete(self):
+        Scheme.objects.create(scheme_code='T2', scheme_name='Spare Scheme', zone=self.zone)
+        Scheme.objects.filter(scheme_code='T2').delete()
+        self.zone.refresh_from_db()
+        self.assertEqual(self.zone.scheme_count, 1)
+
+class ResequenceTests(EFTTestCase):
+    """Allocating sequence numbers and renumbering lines after a delete"""
+    
+    def numbers(self, batch):
+        return list(batch.transactions.order_by('sequence_number').values_list('sequence_number', flat=True))
+    
+    def test_legacy_batch_continues_after_its_highest_line(self):
+        batch = self.make_batch(['1.00', '2.00', '3.00'])
+        batch.transactions.filter(sequence_number='0002').delete()
+        EFTBatch.objects.filter(pk=batch.pk).update(last_sequence=0)  # Counter predates the lines
+        batch.refresh_from_db()
+        
+        batch.bulk_add_transactions([self.make_line('4.00')])
+        self.assertEqual(self.numbers(batch), ['0001', '0003', '0004'])
+    
+    def test_back_to_back_allocations_do_not_overlap(self):
+        batch = self.make_batch(['1.00'])
+        stale = EFTBatch.objects.get(pk=batch.pk)
+        self.assertEqual(batch.allocate_sequences(2), 2)
+        self.assertEqual(stale.allocate_sequences(3), 4)
+        self.assertEqual(batch.allocate_sequences(), 7)
+        
+        batch.bulk_add_transactions([self.make_line('2.00')])
+        stale.bulk_add_transactions([self.make_line('3.00'), self.make_line('4.00')])
+        self.assertEqual(self.numbers(batch), ['0001', '0008', '0009', '0010'])
+    
+    def test_allocation_after_delete_and_resequence(self):
+        batch = self.make_batch(['1.00', '2.00', '3.00'])
+        batch.transactions.get(sequence_number='0002').delete()
+        batch.refresh_from_db()
+        self.assertEqual(batch.resequence_transactions(), 1)
+        
+        batch.bulk_add_transactions([self.make_line('4.00')])
+        self.assertEqual(self.numbers(batch), ['0001', '0002', '0003'])
+        batch.refresh_from_db()
+        self.assertEqual((batch.record_count, batch.total_amount), (3, Decimal('8.00')))
+    
+    def test_six_digit_numbers_are_parked_within_the_column(self):
+        batch = self.make_batch()
+        for sequence_number in ('0002', '0004', '999998', '999999'):
+            self.make_line('1.00', batch=batch, sequence_number=sequence_number).save()
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(batch.resequence_transactions(), 4)
+        
+        numbers = list(batch.transactions.values_list('sequence_number', flat=True))
+        self.assertEqual(numbers, ['0001', '0002', '0003', '0004'])
+        self.assertEqual(batch.last_sequence, 4)
+        # Parked on spare numbers just above the final range, which fit the column
+        written = re.findall(r"'(\d+)'", ' '.join(query['sql'] for query in queries))
+        self.assertEqual(written, ['0005', '0006', '0007', '0008', '0001', '0002', '0003', '0004'])
+
+class KeysetPaginatorTests(TestCase):
+    """Cursor pages cover every row exactly once in both directions"""
+    
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # Ties and NULLs on the sort key, so the pk tie-break and NULL handling both matter
+        logins = [now, None, now - timedelta(days=1), now, None, now - timedelta(days=2), None]
+        for number, last_login in enumerate(logins):
+            User.objects.create(username=f'user{number}', last_login=last_login)
+    
+    def walk(self, ordering):
+        paginator = KeysetPaginator(User.objects.order_by(ordering), 2)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        forward = [[user.username for user in page] for page in pages]
+        
+        backward = []
+        page = pages[-1]
+        while page.has_previous():
+            page = paginator.page(page.previous_cursor)
+            backward.insert(0, [user.username for user in page])
+        return forward, backward
+    
+    def test_walks_nullable_key_both_ways(self):
+        for ordering in ('last_login', '-last_login'):
+            # NULLs last; ties broken by pk in the key's direction
+            if ordering.startswith('-'):
+                expected = User.objects.order_by(F('last_login').desc(nulls_last=True), '-pk')
+            else:
+                expected = User.objects.order_by(F('last_login').asc(nulls_last=True), 'pk')
+            expected = [user.username for user in expected]
+            forward, backward = self.walk(ordering)
+            self.assertEqual(sum(forward, []), expected, ordering)
+            self.assertEqual(backward, forward[:-1], ordering)
+    
+    def test_user_list_counts_in_one_query(self):
+        admin = User.objects.create_superuser('admin', password='x', last_login=timezone.now())
+        User.objects.filter(username='user0').update(is_active=False)
+        self.client.force_login(admin)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user_list'))
+        
+        context = response.context
+        self.assertEqual((context['total_users'], context['active_users_count'], context['superusers_count']),
+                         (8, 7, 1))
+        self.assertEqual(len([query for query in queries if 'COUNT(' in query['sql']]), 1)
+
+class BulkEntryTests(EFTTestCase):
+    """Adding a grid of lines in one request is all-or-nothing"""
+    
+    def setUp(self):
+        self.user.groups.add(Group.objects.create(name='Accounts Personnel'))
+        self.client.force_login(self.user)
+        self.batch = self.make_batch(['1.00', '2.00'])
+    
+    def line(self, amount, **fields):
+        return dict({'debit_account': self.debit_account.pk, 'supplier': self.supplier.pk,
+                     'scheme': self.scheme.pk, 'amount': amount, 'narration': 'Bulk'}, **fields)
+    
+    def post(self, lines):
+        url = reverse('add_transactions_bulk', args=[self.batch.pk])
+        return self.client.post(url, json.dumps({'transactions': lines}), content_type='application/json').json()
+    
+    def test_partially_invalid_grid_writes_nothing(self):
+        result = self.post([self.line('5.00'), self.line('abc'), self.line('6.00', supplier=99999)])
+        
+        self.assertFalse(result['success'])
+        self.assertEqual([error['line'] for error in result['errors']], [2, 3])
+        self.assertIn('amount', result['errors'][0]['errors'])
+        self.assertIn('supplier', result['errors'][1]['errors'])
+        self.assertEqual(self.batch.transactions.count(), 2)
+        self.batch.refresh_from_db()
+        self.assertEqual((self.batch.record_count, self.batch.total_amount), (2, Decimal('3.00')))
+    
+    def test_totals_and_counters_follow_bulk_add(self):
+        result = self.post([self.line('5.00'), self.line('6.50'), self.line('0.25')])
+        
+        self.assertTrue(result['success'])
+        self.assertEqual((result['record_count'], result['batch_total']), (5, '14.75'))
+        self.batch.refresh_from_db()
+        self.assertEqual((self.batch.record_count, self.batch.total_amount), (5, Decimal('14.75')))
+        self.supplier.refresh_from_db()
+        self.scheme.refresh_from_db()
+        self.assertEqual((self.supplier.payment_count, self.supplier.total_paid), (5, Decimal('0')))  # DRAFT
+        self.assertEqual(self.scheme.transaction_count, 5)
+    
+    def test_sequence_numbers_continue_from_existing_lines(self):
+        result = self.post([self.line('5.00'), self.line('6.00')])
+        
+        self.assertEqual((result['first_sequence_number'], result['last_sequence_number']), ('0003', '0004'))
+        numbers = self.batch.transactions.order_by('sequence_number').values_list('sequence_number', flat=True)
+        self.assertEqual(list(numbers), ['0001', '0002', '0003', '0004'])
+
+class FrozenBeneficiaryTests(EFTTestCase):
+    """Submitted batches keep the beneficiary details they were reviewed with"""
+    
+    def edit_master_data(self):
+        self.supplier.supplier_name = 'Renamed Supplier'
+        self.supplier.account_number = '999'
+        self.supplier.save()
+        self.bank.swift_code = 'NEWBMWM0'
+        self.bank.save()
+    
+    def test_submitted_file_ignores_later_master_data_edits(self):
+        self.user.groups.add(Group.objects.create(name='Accounts Personnel'))
+        self.client.force_login(self.user)
+        batch = self.make_batch(['10.00', '2.50'])
+        self.client.post(reverse('submit_batch', args=[batch.pk]))
+        EFTBatch.objects.filter(pk=batch.pk).update(status='APPROVED')
+        batch.refresh_from_db()
+        self.assertIsNotNone(batch.beneficiaries_frozen_at)
+        content = EFTGenerator.generate_eft_file(batch)
+        
+        self.edit_master_data()
+        batch.refresh_from_db()
+        self.assertEqual(EFTGenerator.generate_eft_file(batch), content)
+        self.assertEqual(EFTArtifactCache.get_or_generate(batch), content)
+        self.assertIn(';Test Supplier;', content)
+        self.assertIn(';TESTMWM0;123;', content)
+    
+    def test_unfrozen_draft_reads_live_master_data(self):
+        batch = self.make_batch(['10.00'])
+        self.edit_master_data()
+        
+        row = BatchSnapshot.load(batch).rows[0]
+        self.assertEqual((row.supplier_name, row.account_number, row.swift_code),
+                         ('Renamed Supplier', '999', 'NEWBMWM0'))
+
+class ArtifactCacheTests(EFTTestCase):
+    """Cached EFT files are regenerated whenever the file text would change"""
+    
+    def setUp(self):
+        self.batch = self.make_batch(['10.00', '2.50'], status='APPROVED', batch_name='Cached')
+        self.batch.freeze_beneficiaries()
+    
+    def content(self):
+        self.batch.refresh_from_db()
+        return EFTArtifactCache.get_or_generate(self.batch)
+    
+    def test_unchanged_batch_is_served_from_cache(self):
+        content = self.content()
+        with self.assertNumQueries(1):  # Only the batch row
+            self.assertEqual(self.content(), content)
+    
+    def test_line_edit_invalidates_file(self):
+        self.assertNotIn('Changed narration', self.content())
+        line = self.batch.transactions.first()
+        line.narration = 'Changed narration'
+        line.save()
+        self.assertIn('Changed narration', self.content())
+    
+    def test_queryset_update_invalidates_file(self):
+        self.content()
+        self.batch.transactions.update(reference_number='REF-BULK')
+        self.assertIn('REF-BULK', self.content())
+    
+    def test_artifact_formats_follow_the_registry(self):
+        choices = EFTArtifact._meta.get_field('format').choices
+        self.assertEqual([name for name, _ in choices], list(FORMATS))
+        
+        for name, output_format in FORMATS.items():
+            content = EFTArtifactCache.get_or_generate(self.batch, name)
+            self.assertIsInstance(self.batch.artifacts.get(format=name).read(), bytes if output_format.binary else str)
+            self.assertIsInstance(content, bytes if output_format.binary else str)
+    
+    def test_master_data_edit_invalidates_file(self):
+        self.content()
+        self.scheme.scheme_code = 'T9'
+        self.scheme.save()
+        self.assertIn(';T9;', self.content())
+
+class SplitSnapshotTests(TestCase):
+    """Batches over the RBM record limit split into self-consistent parts"""
+    
+    def snapshot(self, amounts, batch_name='Split Batch'):
+        rows = tuple(
+            TransactionRow(str(number).zfill(4), Decimal(amount), '', '', '13000000000', 'TZ', 'T1',
+                           'Test Supplier', '', '123', 'TESTMWM0')
+            for number, amount in enumerate(amounts, 1)
+        )
+        total = sum((row.amount for row in rows), Decimal('0.00'))
+        return BatchSnapshot(batch_id=1, batch_name=batch_name, currency='MWK', status='APPROVED',
+                             batch_total_amount=total, batch_record_count=len(rows),
+                             rows=rows, total_amount=total, record_count=len(rows))
+    
+    def test_small_snapshot_passes_through(self):
+        snapshot = self.snapshot(['1.00', '2.00'])
+        self.assertEqual(EFTGenerator.split_snapshot(snapshot, max_records=2), [snapshot])
+    
+    def test_part_names_are_suffixed_within_50_characters(self):
+        parts = EFTGenerator.split_snapshot(self.snapshot(['1.00'] * 3, batch_name='N' * 60), max_records=2)
+        self.assertEqual([part.batch_name for part in parts], ['N' * 46 + '_P01', 'N' * 46 + '_P02'])
+        
+        parts = EFTGenerator.split_snapshot(self.snapshot(['1.00'] * 3, batch_name='Short'), max_records=2)
+        self.assertEqual([part.batch_name for part in parts], ['Short_P01', 'Short_P02'])
+    
+    def test_each_part_restarts_its_sequence(self):
+        parts = EFTGenerator.split_snapshot(self.snapshot(['1.00'] * 5), max_records=2)
+        self.assertEqual([[row.sequence_number for row in part.rows] for part in parts],
+                         [['0001', '0002'], ['0001', '0002'], ['0001']])
+    
+    def test_each_part_carries_its_own_totals(self):
+        snapshot = self.snapshot(['10.00', '0.01', '2.50', '7.49', '100.00'])
+        parts = EFTGenerator.split_snapshot(snapshot, max_records=2)
+        self.assertEqual([(part.total_amount, part.record_count) for part in parts],
+                         [(Decimal('10.01'), 2), (Decimal('9.99'), 2), (Decimal('100.00'), 1)])
+        self.assertEqual(sum(part.total_amount for part in parts), snapshot.total_amount)
+        
+        header = EFTGenerator.render_eft_file(parts[1]).splitlines()[0]
+        self.assertEqual(header, '0;Split Batch_P02;MWK;9.99;0002')
+
+class BundleExportTests(EFTTestCase):
+    """ZIP bundles hold the same files whether rendered in-process or in the pool"""
+    
+    @override_settings(EFT_MAX_FILE_RECORDS=2, EFT_EXPORT_PARALLEL_MIN_RECORDS=0, EFT_EXPORT_WORKERS=2)
+    def test_split_parts_rendered_in_pool_match_in_process_render(self):
+        batch = self.make_batch(['1.00', '2.00', '3.00', '4.00', '5.00'], status='APPROVED')
+        parts = EFTGenerator.split_snapshot(BatchSnapshot.load(batch))
+        
+        bundle, manifest = EFTBundleExporter.build([batch], user=self.user)
+        with zipfile.ZipFile(bundle) as archive:
+            files = [archive.read(entry['file_name']).decode('utf-8') for entry in manifest['files']]
+        
+        self.assertEqual(len(files), 3)
+        self.assertEqual(files, [EFTGenerator.render_eft_file(part) for part in parts])
+
+class ArchiveTests(EFTTestCase):
+    """archive_batches moves old finished batches out of the hot tables intact"""
+    
+    def setUp(self):
+        long_ago = timezone.now() - timedelta(days=400)
+        self.old = self.make_batch(['10.00', '2.50'], status='EXPORTED', batch_name='Old', approved_at=long_ago)
+        self.recent = self.make_batch(['1.00'], status='APPROVED', batch_name='Recent',
+                                      approved_at=timezone.now() - timedelta(days=10))
+        self.rejected = self.make_batch(['3.00'], status='REJECTED', batch_name='Rejected', approved_at=long_ago)
+        for batch in (self.old, self.recent, self.rejected):
+            batch.freeze_beneficiaries()
+            for action in ('SUBMITTED', 'APPROVED'):
+                ApprovalAuditLog.objects.create(batch=batch, action=action, user=self.user, remarks=action.title())
+    
+    @staticmethod
+    def copied_fields(model, *skip):
+        return [field.attname for field in model._meta.concrete_fields
+                if field.name not in ('id', 'batch') + skip]
+    
+    def rows(self, model, fields, **filters):
+        return [{field: str(value) if field == 'batch_reference' else value for field, value in row.items()}
+                for row in model.objects.filter(**filters).order_by(*fields[:2]).values(*fields)]
+    
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_batches', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_copies_batches_row_for_row_and_deletes_live_rows(self):
+        batch_fields = self.copied_fields(ArchivedBatch, 'original_id', 'archived_at')
+        line_fields = self.copied_fields(ArchivedTransaction)
+        log_fields = self.copied_fields(ArchivedAuditLog)
+        before = (self.rows(EFTBatch, batch_fields, pk=self.old.pk),
+                  self.rows(EFTTransaction, line_fields, batch=self.old),
+                  self.rows(ApprovalAuditLog, log_fields, batch=self.old))
+        
+        self.archive()
+        
+        archived = ArchivedBatch.objects.get(original_id=self.old.pk)
+        self.assertEqual((self.rows(ArchivedBatch, batch_fields, pk=archived.pk),
+                          self.rows(ArchivedTransaction, line_fields, batch=archived),
+                          self.rows(ArchivedAuditLog, log_fields, batch=archived)), before)
+        self.assertFalse(EFTBatch.objects.filter(pk=self.old.pk).exists())
+        self.assertFalse(EFTTransaction.objects.filter(batch_id=self.old.pk).exists())
+        self.assertFalse(ApprovalAuditLog.objects.filter(batch_id=self.old.pk).exists())
+        self.supplier.refresh_from_db()
+        self.assertEqual(self.supplier.total_paid, Decimal('13.50'))  # Archived payments still count
+    
+    def test_only_old_finished_batches_are_archived(self):
+        self.assertIn('Archived 1 batch(es)', self.archive())
+        self.assertEqual(list(ArchivedBatch.objects.values_list('batch_name', flat=True)), ['Old'])
+        self.assertEqual(set(EFTBatch.objects.values_list('batch_name', flat=True)), {'Recent', 'Rejected'})
+        
+        self.assertIn('Archived 1 batch(es)', self.archive('--days', '5'))
+        self.assertEqual(set(EFTBatch.objects.values_list('batch_name', flat=True)), {'Rejected'})
+    
+    def test_dry_run_changes_nothing(self):
+        counts = [model.objects.count() for model in (EFTBatch, EFTTransaction, ApprovalAuditLog, ArchivedBatch)]
+        self.assertIn('Would archive 1 batch(es)', self.archive('--dry-run'))
+        self.assertEqual([model.objects.count() for model in (EFTBatch, EFTTransaction, ApprovalAuditLog,
+                                                              ArchivedBatch)], counts)
+
+class StreamExportTests(EFTTestCase):
+    """Streamed exports are validated before the first chunk is produced"""
+    
+    def test_missing_required_field_fails_before_streaming(self):
+        batch = self.make_batch(['10.00'], status='APPROVED')
+        other_bank = Bank.objects.create(bank_name='Blank Bank', swift_code='', created_by=self.user)
+        other = Supplier.objects.create(supplier_code='0000002', supplier_name='Other', bank=other_bank,
+                                        account_number='456', account_name='Other', created_by=self.user)
+        line = self.make_line('5.00')
+        line.supplier = other
+        batch.bulk_add_transactions([line])
+        batch.refresh_from_db()
+        
+        with self.assertRaisesMessage(ValueError, 'Transaction 0002: Supplier bank is required'):
+            EFTGenerator.stream_eft_lines(batch)
+    
+    def test_frozen_details_are_checked(self):
+        batch = self.make_batch(['10.00', '2.00'], status='APPROVED')
+        batch.freeze_beneficiaries()
+        batch.transactions.filter(sequence_number='0001').update(beneficiary_swift_code='')
+        batch.refresh_from_db()
+        
+        with self.assertRaisesMessage(ValueError, 'Transaction 0001: Supplier bank is required'):
+            EFTGenerator.stream_eft_lines(batch)
+    
+    def test_complete_batch_streams_the_same_file(self):
+        batch = self.make_batch(['10.00', '2.00'], status='APPROVED')
+        self.assertEqual(''.join(EFTGenerator.stream_eft_lines(batch)), EFTGenerator.generate_eft_file(batch))
+
+class LegacyGeneratedFileTests(EFTTestCase):
+    """Bodies of the old EFTBatch.generated_file field end up in EFTArtifact"""
+    
+    def test_load_backup_moves_generated_files(self):
+        body = '0;Old;MWK;0.00;0000\r\n'
+        objects = [{'model': 'eft_app.eftbatch', 'pk': 900, 'fields': {
+            'batch_name': 'Old', 'batch_reference': 'OLD-1', 'status': 'APPROVED', 'created_by': self.user.pk,
+            'created_at': '2026-01-19T07:41:00Z', 'updated_at': '2026-01-29T11:38:40Z', 'generated_file': body,
+        }}]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'backup.json')
+            with open(path, 'w', encoding='utf-8') as handle:
+                json.dump(objects, handle)
+            call_command('load_backup', path, stdout=StringIO())
+        
+        batch = EFTBatch.objects.get(pk=900)
+        self.assertEqual(batch.artifacts.get().read(), body)
+        self.assertEqual(EFTArtifactCache.get_or_generate(batch), body)
+    
+    def test_current_schema_has_no_legacy_column(self):
+        self.assertEqual(LegacyGeneratedFiles.read_column(), {})
@@ -0,0 +1,143 @@
+# eft_app/transaction_grid.py
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
+from . import money
+from .models import SEQUENCE_ORDERING
+
+def _payee(beneficiary_field, supplier_field):
+    """The frozen beneficiary value if there is one, else the live supplier value"""
+    return Coalesce(NullIf(beneficiary_field, Value('')), supplier_field)
+
+class TransactionGrid:
+    """Server-side paging, sorting and filtering of one batch's lines for the JSON grid
+    
+    Each request fetches one window of rows with their supplier, bank,
+    scheme and zone joined in (no per-row queries), plus a COUNT/SUM over
+    the filtered lines. Unfiltered figures come from the batch's stored
+    totals, so scrolling a large batch costs one small query per window.
+    """
+    
+    DEFAULT_LIMIT = 100
+    MAX_LIMIT = 500
+    
+    # Sort keys the grid offers, as ORM orderings; ties fall back to file order
+    SORTS = {
+        'sequence': SEQUENCE_ORDERING,
+        'debit_account': ['debit_account__account_number'],
+        'payee': [_payee('beneficiary_name', 'supplier__supplier_name')],
+        'supplier_code': ['supplier__supplier_code'],
+        'swift_code': [_payee('beneficiary_swift_code', 'supplier__bank__swift_code')],
+        'account_number': [_payee('beneficiary_account_number', 'supplier__account_number')],
+        'scheme': ['scheme__scheme_code'],
+        'zone': ['zone__zone_code'],
+        'amount': ['amount'],
+        'reference': ['reference_number'],
+        'narration': ['narration'],
+    }
+    
+    FIELDS = (
+        'id', 'sequence_number', 'amount', 'narration', 'reference_number', 'employee_number',
+        'beneficiary_name', 'beneficiary_account_number', 'beneficiary_swift_code',
+        'debit_account__account_number', 'supplier__supplier_code', 'supplier__supplier_name',
+        'supplier__account_number', 'supplier__bank__swift_code', 'supplier__bank__bank_name',
+        'scheme__scheme_code', 'zone__zone_code',
+    )
+    
+    def __init__(self, batch):
+        self.batch = batch
+    
+    @staticmethod
+    def _int(value, default):
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+    
+    def filter_condition(self, params):
+        """Q for the grid's filters: free-text search plus exact scheme/zone/account and an amount range"""
+        condition = Q()
+        query = params.get('q', '').strip()
+        if query:
+            condition &= (
+                Q(sequence_number__icontains=query) |
+                Q(beneficiary_name__icontains=query) |
+                Q(supplier__supplier_name__icontains=query) |
+                Q(supplier__supplier_code__icontains=query) |
+                Q(beneficiary_account_number__icontains=query) |
+                Q(supplier__account_number__icontains=query) |
+                Q(reference_number__icontains=query) |
+                Q(narration__icontains=query)
+            )
+        for param, path in (('scheme', 'scheme__scheme_code'), ('zone', 'zone__zone_code'),
+                            ('debit_account', 'debit_account__account_number')):
+            if params.get(param):
+                condition &= Q(**{path: params[param]})
+        for param, lookup in (('amount_min', 'amount__gte'), ('amount_max', 'amount__lte')):
+            minor = money.parse_minor(params.get(param, '').strip() or None)
+            if minor is not None:
+                condition &= Q(**{lookup: money.from_minor(minor)})
+        return condition
+    
+    def ordering(self, sort, order):
+        descending = order == 'desc'
+        expressions = []
+        for item in self.SORTS.get(sort, SEQUENCE_ORDERING) + SEQUENCE_ORDERING + ['id']:
+            expression = F(item) if isinstance(item, str) else item
+            expressions.append(expression.desc() if descending else expression.asc())
+        return expressions
+    
+    @staticmethod
+    def row(values):
+        frozen = bool(values['beneficiary_name'])
+        return {
+            'id': values['id'],
+            'sequence_number': values['sequence_number'],
+            'debit_account': values['debit_account__account_number'],
+            'payee_name': values['beneficiary_name'] or values['supplier__supplier_name'],
+            'supplier_code': values['supplier__supplier_code'],
+            'bank_name': values['supplier__bank__bank_name'],
+            'swift_code': values['beneficiary_swift_code'] or values['supplier__bank__swift_code'],
+            'account_number': values['beneficiary_account_number'] or values['supplier__account_number'],
+            'frozen': frozen,
+            'scheme': values['scheme__scheme_code'],
+            'zone': values['zone__zone_code'],
+            'amount': money.format_amount(values['amount']),
+            'reference_number': values['reference_number'],
+            'employee_number': values['employee_number'],
+            'narration': values['narration'],
+        }
+    
+    def page(self, params):
+        """JSON-ready dict for one window of rows selected by GET-style params
+        
+        params: offset, limit, sort (a SORTS key), order ('asc'/'desc') and
+        the filters read by filter_condition.
+        """
+        offset = max(self._int(params.get('offset'), 0), 0)
+        limit = min(max(self._int(params.get('limit'), self.DEFAULT_LIMIT), 1), self.MAX_LIMIT)
+        sort = params.get('sort') if params.get('sort') in self.SORTS else 'sequence'
+        order = 'desc' if params.get('order') == 'desc' else 'asc'
+        
+        lines = self.batch.transactions.all()
+        condition = self.filter_condition(params)
+        filtered = bool(condition)
+        if filtered:
+            lines = lines.filter(condition)
+            totals = lines.order_by().aggregate(count=Count('id'), amount=Sum('amount'))
+            count, amount = totals['count'], totals['amount'] or 0
+        else:
+            count, amount = self.batch.record_count, self.batch.total_amount
+        
+        rows = lines.order_by(*self.ordering(sort, order)).values(*self.FIELDS)[offset:offset + limit]
+        return {
+            'offset': offset,
+            'limit': limit,
+            'sort': sort,
+            'order': order,
+            'filtered': filtered,
+            'count': count,
+            'amount': money.format_amount(amount),
+            'batch_count': self.batch.record_count,
+            'batch_amount': money.format_amount(self.batch.total_amount),
+            'rows': [self.row(values) for values in rows],
+        }
@@ -97,11 +97,13 @@ urlpatterns = [
     path('accounts/dashboard/', views.accounts_dashboard, name='accounts_dashboard'),
     path('accounts/batches/', views.batch_list, name='batch_list'),
     path('accounts/batches/create/', views.create_batch, name='create_batch'),
+    path('accounts/batches/import/', views.import_batch, name='import_batch'),
     path('accounts/batches/<int:batch_id>/edit/', views.edit_batch, name='edit_batch'),
     path('accounts/batches/<int:batch_id>/view/', views.view_batch, name='view_batch'),
     path('accounts/batches/<int:batch_id>/submit/', views.submit_for_approval, name='submit_batch'),
     path('accounts/batches/<int:batch_id>/delete/', views.delete_batch, name='delete_batch'),
     path('accounts/batches/<int:batch_id>/transaction/add/', views.add_transaction, name='add_transaction'),
+    path('accounts/batches/<int:batch_id>/transaction/bulk-add/', views.add_transactions_bulk, name='add_transactions_bulk'),
     path('accounts/batches/<int:batch_id>/transaction/<int:transaction_id>/delete/', 
          views.delete_transaction, name='delete_transaction'),
     path('accounts/batches/<int:batch_id>/export/<str:format>/', views.export_batch, name='export_batch'),
@@ -109,6 +111,8 @@ urlpatterns = [
     path('accounts/batches/export-all/', views.batch_export_all, name='batch_export_all'),
     path('accounts/batches/export-selected/', views.batch_export_selected, name='batch_export_selected'),
     path('accounts/batches/bulk-delete/', views.batch_bulk_delete, name='batch_bulk_delete'),
+    path('accounts/archive/', views.archive_list, name='archive_list'),
+    path('accounts/archive/<int:batch_id>/', views.archive_detail, name='archive_detail'),
     
     # ================ AUTHORIZER URLS ================
     path('authorizer/dashboard/', views.authorizer_dashboard, name='authorizer_dashboard'),
@@ -116,8 +120,11 @@ urlpatterns = [
     path('authorizer/batches/<int:batch_id>/review/', views.review_batch, name='review_batch'),
     path('authorizer/batches/<int:batch_id>/approve/', views.approve_batch, name='approve_batch'),
     path('authorizer/batches/<int:batch_id>/reject/', views.reject_batch, name='reject_batch'),
+    path('authorizer/batches/export-bundle/', views.export_batches_bundle, name='export_batches_bundle'),
     
     # ================ API URLS ================
+    path('api/batch/<int:batch_id>/transactions/', views.batch_transactions_data, name='batch_transactions_data'),
+    path('api/suppliers/lookup/', views.supplier_lookup, name='supplier_lookup'),
     path('api/supplier/<int:supplier_id>/details/', views.get_supplier_details, name='supplier_details'),
     path('api/scheme/<int:scheme_id>/zone/', views.get_scheme_zone, name='scheme_zone'),
     # NEW ENDPOINT FOR AUTO-COST CENTER
@@ -3,35 +3,44 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, permission_required, user_passes_test
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.contrib import messages
-from django.http import HttpResponse, JsonResponse, HttpResponseRedirect
+from django.http import HttpResponse, JsonResponse, HttpResponseRedirect, FileResponse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.urls import reverse_lazy, reverse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.utils import timezone
-from django.db import transaction as db_transaction, connection
+from django.db import transaction as db_transaction
 from django.db.models import Sum, Count, Q, Avg, Max, Min
 from django.db.utils import OperationalError, DatabaseError
 from django.views.decorators.http import require_POST
 from django.contrib.auth.models import Group, User
 from django.utils.safestring import mark_safe
 from django.conf import settings
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 import json
 import platform
 import csv
 import xlwt
 from datetime import datetime, timedelta
-from decimal import Decimal
 
 from .models import (
     Bank, Zone, Scheme, Supplier, DebitAccount,
-    EFTBatch, EFTTransaction, ApprovalAuditLog
+    EFTBatch, EFTTransaction, ApprovalAuditLog, ArchivedBatch, SEQUENCE_ORDERING
 )
 from .forms import (
     BankForm, ZoneForm, SchemeForm, SupplierForm, DebitAccountForm,
-    EFTBatchForm, EFTTransactionForm, BatchApprovalForm, BatchRejectionForm,
+    EFTBatchForm, EFTImportForm, EFTTransactionForm, BatchApprovalForm, BatchRejectionForm,
     UserRegistrationForm, UserEditForm
 )
 from .eft_generator import EFTGenerator
+from .artifact_cache import EFTArtifactCache
+from .bulk_export import EFTBundleExporter
+from .eft_importer import EFTImporter, EFTImportError
+from .bulk_entry import BulkTransactionEntry
+from .stats import AdminDashboardStats, BatchStats, today_range
+from .pagination import KeysetPaginator, KeysetPaginationMixin
+from .choice_cache import MasterDataChoices
+from .supplier_lookup import SupplierLookup
+from .search import SearchIndex
+from .transaction_grid import TransactionGrid
 
 # ================ COMMON VIEWS ================
 
@@ -56,25 +65,11 @@ def is_system_admin(user):
     """Check if user is system admin"""
     return user.is_superuser or user.groups.filter(name='System Admin').exists()
 
-def check_database_connection():
-    """Check if database is connected properly"""
+def calculate_uptime(started_at):
+    """Calculate system uptime from the first user registration time"""
     try:
-        User.objects.count()
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            cursor.fetchone()
-        return True, None
-    except (OperationalError, DatabaseError) as e:
-        return False, str(e)
-    except Exception as e:
-        return True, str(e)
-
-def calculate_uptime():
-    """Calculate system uptime based on first user registration"""
-    try:
-        first_user = User.objects.order_by('date_joined').first()
-        if first_user:
-            uptime_delta = timezone.now() - first_user.date_joined
+        if started_at:
+            uptime_delta = timezone.now() - started_at
             days = uptime_delta.days
             hours = uptime_delta.seconds // 3600
             minutes = (uptime_delta.seconds % 3600) // 60
@@ -99,19 +94,15 @@ def calculate_uptime():
 def admin_dashboard(request):
     """System Admin Dashboard"""
     try:
-        db_connected, db_error = check_database_connection()
+        db_connected, db_error = AdminDashboardStats.database_status()
         
-        stats = {}
+        # Served from cache; signals.py invalidates it when the counted models change
         try:
-            stats = {
-                'users_count': User.objects.count(),
-                'active_users_count': User.objects.filter(is_active=True).count(),
-                'banks_count': Bank.objects.count(),
-                'suppliers_count': Supplier.objects.count(),
-                'zones_count': Zone.objects.count(),
-                'schemes_count': Scheme.objects.count(),
-                'debit_accounts_count': DebitAccount.objects.count(),
-            }
+            dashboard = AdminDashboardStats.get()
+            stats = dashboard['stats']
+            uptime = calculate_uptime(dashboard['first_user_joined'])
+            today_batches_count = dashboard['today_batches_count']
+            last_batch_at = dashboard['last_batch_at']
         except (OperationalError, DatabaseError):
             stats = {
                 'users_count': 0,
@@ -122,19 +113,9 @@ def admin_dashboard(request):
                 'schemes_count': 0,
                 'debit_accounts_count': 0,
             }
-        
-        uptime = calculate_uptime()
-        today = timezone.now().date()
-        
-        today_batches_count = 0
-        last_batch = None
-        try:
-            today_batches_count = EFTBatch.objects.filter(
-                created_at__date=today
-            ).count()
-            last_batch = EFTBatch.objects.order_by('-created_at').first()
-        except (OperationalError, DatabaseError):
-            pass
+            uptime = calculate_uptime(None)
+            today_batches_count = 0
+            last_batch_at = None
         
         current_date = timezone.now()
         python_version = platform.python_version()
@@ -145,7 +126,7 @@ def admin_dashboard(request):
             'db_error': db_error if not db_connected else None,
             'uptime': uptime,
             'today_batches_count': today_batches_count,
-            'last_batch': last_batch,
+            'last_batch_at': last_batch_at,
             'current_date': current_date,
             'python_version': python_version,
             'django_version': '4.2.7',
@@ -153,7 +134,7 @@ def admin_dashboard(request):
         }
         
         return render(request, 'admin/dashboard.html', context)
-        
+    
     except Exception as e:
         context = {
             'stats': {
@@ -169,7 +150,7 @@ def admin_dashboard(request):
             'db_error': str(e),
             'uptime': "1 day",
             'today_batches_count': 0,
-            'last_batch': None,
+            'last_batch_at': None,
             'current_date': timezone.now(),
             'python_version': 'Unknown',
             'django_version': 'Unknown',
@@ -184,7 +165,7 @@ def api_system_activity(request):
     try:
         activities = []
         
-        db_connected, _ = check_database_connection()
+        db_connected, _ = AdminDashboardStats.database_status()
         if not db_connected:
             return JsonResponse({
                 'success': False,
@@ -192,44 +173,34 @@ def api_system_activity(request):
                 'activities': []
             })
         
-        try:
-            recent_users = User.objects.order_by('-date_joined')[:3]
-            for user in recent_users:
-                activities.append({
-                    'icon': 'fas fa-user-plus',
-                    'icon_color': 'bg-success',
-                    'title': 'New User Registration',
-                    'description': f'User "{user.get_full_name() or user.username}" registered',
-                    'time': format_time_ago(user.date_joined)
-                })
-        except:
-            pass
+        dashboard = AdminDashboardStats.get()
         
-        try:
-            recent_banks = Bank.objects.order_by('-created_at')[:2]
-            for bank in recent_banks:
-                activities.append({
-                    'icon': 'fas fa-university',
-                    'icon_color': 'bg-primary',
-                    'title': 'Bank Added',
-                    'description': f'Bank "{bank.bank_name}" ({bank.code}) configured',
-                    'time': format_time_ago(bank.created_at) if bank.created_at else 'Recently'
-                })
-        except:
-            pass
+        for user in dashboard['recent_users']:
+            activities.append({
+                'icon': 'fas fa-user-plus',
+                'icon_color': 'bg-success',
+                'title': 'New User Registration',
+                'description': f'User "{user["name"]}" registered',
+                'time': format_time_ago(user['joined'])
+            })
         
-        try:
-            recent_batches = EFTBatch.objects.filter(status='APPROVED').order_by('-approved_at')[:3]
-            for batch in recent_batches:
-                activities.append({
-                    'icon': 'fas fa-file-invoice-dollar',
-                    'icon_color': 'bg-warning',
-                    'title': 'EFT Batch Approved',
-                    'description': f'Batch "{batch.batch_name}" approved',
-                    'time': format_time_ago(batch.approved_at) if batch.approved_at else 'Recently'
-                })
-        except:
-            pass
+        for bank in dashboard['recent_banks']:
+            activities.append({
+                'icon': 'fas fa-university',
+                'icon_color': 'bg-primary',
+                'title': 'Bank Added',
+                'description': f'Bank "{bank["bank_name"]}" ({bank["swift_code"]}) configured',
+                'time': format_time_ago(bank['created_at'])
+            })
+        
+        for batch in dashboard['recent_approvals']:
+            activities.append({
+                'icon': 'fas fa-file-invoice-dollar',
+                'icon_color': 'bg-warning',
+                'title': 'EFT Batch Approved',
+                'description': f'Batch "{batch["batch_name"]}" approved',
+                'time': format_time_ago(batch['approved_at'])
+            })
         
         if not activities:
             activities.append({
@@ -248,7 +219,7 @@ def api_system_activity(request):
             'timestamp': timezone.now().isoformat(),
             'db_connected': db_connected
         })
-        
+    
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -261,13 +232,13 @@ def api_system_activity(request):
 def api_system_status(request):
     """API endpoint for system status"""
     try:
-        db_connected, db_error = check_database_connection()
+        db_connected, db_error = AdminDashboardStats.database_status()
         
         active_users = 0
         if db_connected:
             try:
-                active_users = User.objects.filter(is_active=True).count()
-            except:
+                active_users = AdminDashboardStats.get()['stats']['active_users_count']
+            except (OperationalError, DatabaseError):
                 pass
         
         system_info = {
@@ -285,7 +256,7 @@ def api_system_status(request):
             'active_users': active_users,
             'server_time': timezone.now().isoformat(),
         })
-        
+    
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -349,30 +320,27 @@ def user_list(request):
             sort_field = f'-{sort_field}'
         users = users.order_by(sort_field)
     
-    total_users = users.count()
-    active_users_count = users.filter(is_active=True).count()
-    superusers_count = users.filter(is_superuser=True).count()
-    recent_logins = users.filter(last_login__date=timezone.now().date()).count()
+    # Figures for the whole filtered list, in one query
+    today_start, today_end = today_range()
+    totals = users.order_by().aggregate(
+        total_users=Count('id'),
+        active_users_count=Count('id', filter=Q(is_active=True)),
+        superusers_count=Count('id', filter=Q(is_superuser=True)),
+        recent_logins=Count('id', filter=Q(last_login__gte=today_start, last_login__lt=today_end)),
+    )
     
-    paginator = Paginator(users, 20)
-    page_number = request.GET.get('page')
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    page_obj = KeysetPaginator(users, 20).page(request.GET.get('cursor'), request.GET)
     
     context = {
         'users': page_obj,
         'page_obj': page_obj,
-        'is_paginated': paginator.num_pages > 1,
+        'is_paginated': page_obj.has_other_pages(),
         'sort_field': sort_field.lstrip('-'),
         'order': order,
-        'total_users': total_users,
-        'active_users_count': active_users_count,
-        'superusers_count': superusers_count,
-        'recent_logins': recent_logins,
+        'total_users': totals['total_users'],
+        'active_users_count': totals['active_users_count'],
+        'superusers_count': totals['superusers_count'],
+        'recent_logins': totals['recent_logins'],
     }
     
     return render(request, 'admin/user_list.html', context)
@@ -604,7 +572,7 @@ def user_bulk_delete(request):
 
 # ================ BANK CRUD VIEWS ================
 
-class BankListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class BankListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = Bank
     template_name = 'admin/bank_list.html'
     context_object_name = 'banks'
@@ -616,11 +584,7 @@ class BankListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(bank_name__icontains=query) |
-                Q(code__icontains=query) |
-                Q(swift_code__icontains=query)
-            )
+            queryset = SearchIndex.search(queryset, query)
         
         status = self.request.GET.get('status')
         if status == 'active':
@@ -798,7 +762,7 @@ def bank_bulk_delete(request):
 
 # ================ ZONE CRUD VIEWS ================
 
-class ZoneListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class ZoneListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = Zone
     template_name = 'admin/zone_list.html'
     context_object_name = 'zones'
@@ -806,9 +770,7 @@ class ZoneListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     paginate_by = 20
     
     def get_queryset(self):
-        queryset = Zone.objects.all().annotate(
-            scheme_count=Count('schemes', distinct=True)
-        )
+        queryset = Zone.objects.all()
         
         query = self.request.GET.get('q')
         if query:
@@ -837,17 +799,19 @@ class ZoneListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        zones = self.get_queryset()
-        total_schemes_count = zones.aggregate(total=Sum('scheme_count'))['total'] or 0
-        avg_schemes_per_zone = zones.aggregate(avg=Avg('scheme_count'))['avg'] or 0
-        active_zones_count = zones.filter(is_active=True).count()
+        # Figures for the whole filtered list from the stored counters, in one query
+        totals = self.object_list.order_by().aggregate(
+            total_schemes_count=Sum('scheme_count'),
+            avg_schemes_per_zone=Avg('scheme_count'),
+            active_zones_count=Count('id', filter=Q(is_active=True)),
+        )
         
         context.update({
             'sort_field': self.request.GET.get('sort', 'created_at'),
             'order': self.request.GET.get('order', 'desc'),
-            'total_schemes_count': total_schemes_count,
-            'avg_schemes_per_zone': avg_schemes_per_zone,
-            'active_zones_count': active_zones_count,
+            'total_schemes_count': totals['total_schemes_count'] or 0,
+            'avg_schemes_per_zone': totals['avg_schemes_per_zone'] or 0,
+            'active_zones_count': totals['active_zones_count'],
         })
         
         return context
@@ -1002,7 +966,7 @@ def zone_bulk_delete(request):
 
 # ================ SUPPLIER CRUD VIEWS ================
 
-class SupplierListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class SupplierListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = Supplier
     template_name = 'admin/supplier_list.html'
     context_object_name = 'suppliers'
@@ -1014,12 +978,7 @@ class SupplierListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(supplier_code__icontains=query) |
-                Q(supplier_name__icontains=query) |
-                Q(account_number__icontains=query) |
-                Q(account_name__icontains=query)
-            )
+            queryset = SearchIndex.search(queryset, query)
         
         bank_id = self.request.GET.get('bank')
         if bank_id:
@@ -1044,23 +1003,22 @@ class SupplierListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        suppliers = self.get_queryset()
-        total_suppliers = suppliers.count()
-        active_suppliers = suppliers.filter(is_active=True).count()
-        bank_count = suppliers.values('bank').distinct().count()
-        
-        payment_count = EFTTransaction.objects.filter(
-            supplier__in=suppliers
-        ).count()
+        # Figures for the whole filtered list from the stored counters, in one query
+        totals = self.object_list.order_by().aggregate(
+            total_suppliers=Count('id'),
+            active_suppliers=Count('id', filter=Q(is_active=True)),
+            bank_count=Count('bank', distinct=True),
+            payment_count=Sum('payment_count'),
+        )
         
         context.update({
             'sort_field': self.request.GET.get('sort', 'created_at'),
             'order': self.request.GET.get('order', 'desc'),
             'all_banks': Bank.objects.all(),
-            'total_suppliers': total_suppliers,
-            'active_suppliers': active_suppliers,
-            'bank_count': bank_count,
-            'payment_count': payment_count,
+            'total_suppliers': totals['total_suppliers'],
+            'active_suppliers': totals['active_suppliers'],
+            'bank_count': totals['bank_count'],
+            'payment_count': totals['payment_count'] or 0,
         })
         
         return context
@@ -1198,6 +1156,7 @@ def supplier_bulk_activate(request):
     """Bulk activate suppliers"""
     supplier_ids = request.POST.getlist('supplier_ids')
     Supplier.objects.filter(id__in=supplier_ids).update(is_active=True)
+    db_transaction.on_commit(SupplierLookup.bump)  # Queryset updates send no signals
     
     messages.success(request, f'{len(supplier_ids)} supplier(s) activated successfully')
     next_url = request.POST.get('next', 'supplier_list')
@@ -1210,6 +1169,7 @@ def supplier_bulk_deactivate(request):
     """Bulk deactivate suppliers"""
     supplier_ids = request.POST.getlist('supplier_ids')
     Supplier.objects.filter(id__in=supplier_ids).update(is_active=False)
+    db_transaction.on_commit(SupplierLookup.bump)  # Queryset updates send no signals
     
     messages.success(request, f'{len(supplier_ids)} supplier(s) deactivated successfully')
     next_url = request.POST.get('next', 'supplier_list')
@@ -1232,7 +1192,7 @@ def supplier_bulk_delete(request):
 
 # ================ SCHEME CRUD VIEWS ================
 
-class SchemeListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class SchemeListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = Scheme
     template_name = 'admin/scheme_list.html'
     context_object_name = 'schemes'
@@ -1244,11 +1204,7 @@ class SchemeListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         
         query = self.request.GET.get('q')
         if query:
-            queryset = queryset.filter(
-                Q(scheme_code__icontains=query) |
-                Q(scheme_name__icontains=query) |
-                Q(description__icontains=query)
-            )
+            queryset = SearchIndex.search(queryset, query)
         
         zone_id = self.request.GET.get('zone')
         if zone_id:
@@ -1268,6 +1224,8 @@ class SchemeListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
         order = self.request.GET.get('order', 'desc')
         
         if sort_field in ['scheme_code', 'scheme_name', 'zone', 'is_active', 'created_at']:
+            if sort_field == 'zone':
+                sort_field = 'zone__zone_code'  # What order_by('zone') sorts by, spelled out for the cursor
             if order == 'desc':
                 sort_field = f'-{sort_field}'
             queryset = queryset.order_by(sort_field)
@@ -1277,23 +1235,22 @@ class SchemeListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        schemes = self.get_queryset()
-        total_schemes = schemes.count()
-        active_schemes_count = schemes.filter(is_active=True).count()
-        zones_count = schemes.values('zone').distinct().count()
-        
-        transactions_count = EFTTransaction.objects.filter(
-            scheme__in=schemes
-        ).count()
+        # Figures for the whole filtered list from the stored counters, in one query
+        totals = self.object_list.order_by().aggregate(
+            total_schemes=Count('id'),
+            active_schemes_count=Count('id', filter=Q(is_active=True)),
+            zones_count=Count('zone', distinct=True),
+            transactions_count=Sum('transaction_count'),
+        )
         
         context.update({
             'sort_field': self.request.GET.get('sort', 'created_at'),
             'order': self.request.GET.get('order', 'desc'),
             'all_zones': Zone.objects.all(),
-            'total_schemes': total_schemes,
-            'active_schemes_count': active_schemes_count,
-            'zones_count': zones_count,
-            'transactions_count': transactions_count,
+            'total_schemes': totals['total_schemes'],
+            'active_schemes_count': totals['active_schemes_count'],
+            'zones_count': totals['zones_count'],
+            'transactions_count': totals['transactions_count'] or 0,
         })
         
         if hasattr(self, 'current_zone') and self.current_zone:
@@ -1448,6 +1405,7 @@ def scheme_bulk_activate(request):
     """Bulk activate schemes"""
     scheme_ids = request.POST.getlist('scheme_ids')
     Scheme.objects.filter(id__in=scheme_ids).update(is_active=True)
+    db_transaction.on_commit(MasterDataChoices.bump)  # Queryset updates send no signals
     
     messages.success(request, f'{len(scheme_ids)} scheme(s) activated successfully')
     next_url = request.POST.get('next', 'scheme_list')
@@ -1460,6 +1418,7 @@ def scheme_bulk_deactivate(request):
     """Bulk deactivate schemes"""
     scheme_ids = request.POST.getlist('scheme_ids')
     Scheme.objects.filter(id__in=scheme_ids).update(is_active=False)
+    db_transaction.on_commit(MasterDataChoices.bump)  # Queryset updates send no signals
     
     messages.success(request, f'{len(scheme_ids)} scheme(s) deactivated successfully')
     next_url = request.POST.get('next', 'scheme_list')
@@ -1473,8 +1432,9 @@ def scheme_bulk_delete(request):
     scheme_ids = request.POST.getlist('scheme_ids')
     schemes = Scheme.objects.filter(id__in=scheme_ids)
     
-    count = schemes.count()
-    schemes.delete()
+    with db_transaction.atomic():
+        count = schemes.count()
+        schemes.delete()
     messages.success(request, f'{count} scheme(s) deleted successfully')
     
     next_url = request.POST.get('next', 'scheme_list')
@@ -1482,7 +1442,7 @@ def scheme_bulk_delete(request):
 
 # ================ DEBIT ACCOUNT CRUD VIEWS ================
 
-class DebitAccountListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
+class DebitAccountListView(LoginRequiredMixin, PermissionRequiredMixin, KeysetPaginationMixin, ListView):
     model = DebitAccount
     template_name = 'admin/debit_account_list.html'
     context_object_name = 'debit_accounts'
@@ -1519,20 +1479,19 @@ class DebitAccountListView(LoginRequiredMixin, PermissionRequiredMixin, ListView
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        accounts = self.get_queryset()
-        total_accounts = accounts.count()
-        active_accounts = accounts.filter(is_active=True).count()
-        
-        transactions_count = EFTBatch.objects.filter(
-            debit_account__in=accounts
-        ).count()
+        # Figures for the whole filtered list from the stored counters, in one query
+        totals = self.object_list.order_by().aggregate(
+            total_accounts=Count('id'),
+            active_accounts=Count('id', filter=Q(is_active=True)),
+            transactions_count=Sum('batch_count'),
+        )
         
         context.update({
             'sort_field': self.request.GET.get('sort', 'created_at'),
             'order': self.request.GET.get('order', 'desc'),
-            'total_accounts': total_accounts,
-            'active_accounts': active_accounts,
-            'transactions_count': transactions_count,
+            'total_accounts': totals['total_accounts'],
+            'active_accounts': totals['active_accounts'],
+            'transactions_count': totals['transactions_count'] or 0,
         })
         
         return context
@@ -1663,6 +1622,7 @@ def debit_account_bulk_activate(request):
     """Bulk activate debit accounts"""
     account_ids = request.POST.getlist('account_ids')
     DebitAccount.objects.filter(id__in=account_ids).update(is_active=True)
+    db_transaction.on_commit(MasterDataChoices.bump)  # Queryset updates send no signals
     
     messages.success(request, f'{len(account_ids)} debit account(s) activated successfully')
     next_url = request.POST.get('next', 'debit_account_list')
@@ -1675,6 +1635,7 @@ def debit_account_bulk_deactivate(request):
     """Bulk deactivate debit accounts"""
     account_ids = request.POST.getlist('account_ids')
     DebitAccount.objects.filter(id__in=account_ids).update(is_active=False)
+    db_transaction.on_commit(MasterDataChoices.bump)  # Queryset updates send no signals
     
     messages.success(request, f'{len(account_ids)} debit account(s) deactivated successfully')
     next_url = request.POST.get('next', 'debit_account_list')
@@ -1708,14 +1669,15 @@ def accounts_dashboard(request):
     user = request.user
     
     batches = EFTBatch.objects.filter(created_by=user)
+    summary = BatchStats.summary(batches)
     
     stats = {
-        'total_batches': batches.count(),
-        'draft_batches': batches.filter(status='DRAFT').count(),
-        'pending_batches': batches.filter(status='PENDING').count(),
-        'approved_batches': batches.filter(status='APPROVED').count(),
-        'rejected_batches': batches.filter(status='REJECTED').count(),
-        'total_amount': batches.filter(status='APPROVED').aggregate(Sum('total_amount'))['total_amount__sum'] or 0,
+        'total_batches': summary['total_count'],
+        'draft_batches': summary['draft_count'],
+        'pending_batches': summary['pending_count'],
+        'approved_batches': summary['approved_count'],
+        'rejected_batches': summary['rejected_count'],
+        'total_amount': summary['approved_amount'],
     }
     
     recent_batches = batches.order_by('-created_at')[:5]
@@ -1729,55 +1691,39 @@ def accounts_dashboard(request):
 @user_passes_test(is_accounts_personnel)
 def batch_list(request):
     """List all batches for accounts personnel with search and filter"""
-    batches = EFTBatch.objects.filter(created_by=request.user).order_by('-created_at')
+    user_batches = EFTBatch.objects.filter(created_by=request.user)
+    match = Q()
     
     status_filter = request.GET.get('status', '')
     if status_filter:
-        batches = batches.filter(status=status_filter)
+        match &= Q(status=status_filter)
     
     search_query = request.GET.get('search')
     if search_query:
-        batches = batches.filter(
-            Q(batch_reference__icontains=search_query) |
-            Q(batch_name__icontains=search_query)
-        )
-    
-    total_batches = batches.count()
-    total_amount = batches.aggregate(Sum('total_amount'))['total_amount__sum'] or Decimal('0')
-    total_records = batches.aggregate(Sum('record_count'))['record_count__sum'] or 0
-    avg_batch_size = batches.aggregate(Avg('record_count'))['record_count__avg'] or 0
+        match &= Q(batch_reference__icontains=search_query) | Q(batch_name__icontains=search_query)
     
-    draft_count = EFTBatch.objects.filter(created_by=request.user, status='DRAFT').count()
-    pending_count = EFTBatch.objects.filter(created_by=request.user, status='PENDING').count()
-    approved_count = EFTBatch.objects.filter(created_by=request.user, status='APPROVED').count()
-    rejected_count = EFTBatch.objects.filter(created_by=request.user, status='REJECTED').count()
+    # Tab counts cover all of the user's batches; totals cover the filtered rows
+    summary = BatchStats.summary(user_batches, match)
+    total_batches = summary['matched_count']
     
-    can_delete_any = batches.filter(status='DRAFT').exists()
-    
-    paginator = Paginator(batches, 20)
-    page_number = request.GET.get('page')
-    try:
-        page_obj = paginator.page(page_number)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+    batches = user_batches.filter(match).order_by('-created_at')
+    page_obj = KeysetPaginator(batches, 20).page(request.GET.get('cursor'), request.GET)
     
     context = {
         'batches': page_obj,
         'page_obj': page_obj,
-        'is_paginated': paginator.num_pages > 1,
+        'is_paginated': page_obj.has_other_pages(),
         'status_filter': status_filter,
         'total_count': total_batches,
         'total_batches': total_batches,
-        'total_amount': total_amount,
-        'total_records': total_records,
-        'avg_batch_size': avg_batch_size,
-        'draft_count': draft_count,
-        'pending_count': pending_count,
-        'approved_count': approved_count,
-        'rejected_count': rejected_count,
-        'can_delete_any': can_delete_any,
+        'total_amount': summary['matched_amount'],
+        'total_records': summary['matched_records'],
+        'avg_batch_size': summary['matched_avg_records'],
+        'draft_count': summary['draft_count'],
+        'pending_count': summary['pending_count'],
+        'approved_count': summary['approved_count'],
+        'rejected_count': summary['rejected_count'],
+        'can_delete_any': summary['matched_draft_count'] > 0,
     }
     
     return render(request, 'accounts/batch_list.html', context)
@@ -1802,6 +1748,36 @@ def create_batch(request):
     
     return render(request, 'accounts/create_batch.html', {'form': form})
 
+@login_required
+@user_passes_test(is_accounts_personnel)
+def import_batch(request):
+    """Create a DRAFT batch from an uploaded RBM EFT file"""
+    import_errors = []
+    
+    if request.method == 'POST':
+        form = EFTImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                content = form.cleaned_data['eft_file'].read().decode('utf-8-sig')
+                batch = EFTImporter.import_lines(
+                    content.splitlines(), request.user, form.cleaned_data['batch_name'] or None
+                )
+            except UnicodeDecodeError:
+                messages.error(request, 'EFT file must be UTF-8 text')
+            except EFTImportError as e:
+                import_errors = e.errors
+                messages.error(request, f'Import failed with {len(e.errors)} error(s)')
+            else:
+                messages.success(request, f'Imported {batch.record_count} transactions into batch {batch.batch_reference}')
+                return redirect('edit_batch', batch_id=batch.id)
+    else:
+        form = EFTImportForm()
+    
+    return render(request, 'accounts/import_batch.html', {
+        'form': form,
+        'import_errors': import_errors,
+    })
+
 @login_required
 @user_passes_test(is_accounts_personnel)
 def edit_batch(request, batch_id):
@@ -1812,8 +1788,6 @@ def edit_batch(request, batch_id):
         messages.error(request, 'Cannot edit batch that is not in DRAFT status')
         return redirect('accounts_dashboard')
     
-    transactions = batch.transactions.all().order_by('sequence_number')
-    
     if request.method == 'POST':
         form = EFTBatchForm(request.POST, instance=batch)
         if form.is_valid():
@@ -1825,12 +1799,12 @@ def edit_batch(request, batch_id):
     
     transaction_form = EFTTransactionForm()
     
+    # The lines themselves are loaded by the grid from batch_transactions_data
     return render(request, 'accounts/edit_batch.html', {
         'batch': batch,
-        'transactions': transactions,
         'form': form,
         'transaction_form': transaction_form,
-        'total_amount': sum(t.amount for t in transactions)
+        'total_amount': batch.total_amount
     })
 
 @login_required
@@ -1852,19 +1826,13 @@ def add_transaction(request, batch_id):
                 transaction = form.save(commit=False)
                 transaction.batch = batch
                 
-                last_seq = batch.transactions.order_by('sequence_number').last()
-                if last_seq:
-                    next_seq = int(last_seq.sequence_number) + 1
-                else:
-                    next_seq = 1
-                transaction.sequence_number = str(next_seq).zfill(4)
+                transaction.sequence_number = str(batch.allocate_sequences(1)).zfill(4)
                 
                 transaction.zone = transaction.scheme.zone
                 
+                # save() applies the amount to the batch totals as an F() delta
                 transaction.save()
                 
-                batch.update_totals()
-                
                 return JsonResponse({
                     'success': True,
                     'message': 'Transaction added successfully',
@@ -1883,6 +1851,45 @@ def add_transaction(request, batch_id):
     
     return JsonResponse({'success': False, 'message': 'Invalid request method'})
 
+@login_required
+@user_passes_test(is_accounts_personnel)
+@require_POST
+def add_transactions_bulk(request, batch_id):
+    """Add many transactions to a batch in one request"""
+    batch = get_object_or_404(EFTBatch, id=batch_id, created_by=request.user)
+    
+    if batch.status != 'DRAFT':
+        return JsonResponse({
+            'success': False,
+            'message': 'Cannot add transactions to batch that is not in DRAFT status'
+        })
+    
+    try:
+        lines = BulkTransactionEntry.parse_request(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)})
+    
+    transactions, errors = BulkTransactionEntry.build(lines)
+    if errors:
+        return JsonResponse({
+            'success': False,
+            'message': f'{len(errors)} of {len(lines)} transaction(s) are invalid; nothing was added',
+            'errors': errors
+        })
+    
+    with db_transaction.atomic():
+        batch.bulk_add_transactions(transactions)
+    
+    return JsonResponse({
+        'success': True,
+        'message': f'{len(transactions)} transaction(s) added successfully',
+        'created_count': len(transactions),
+        'first_sequence_number': transactions[0].sequence_number,
+        'last_sequence_number': transactions[-1].sequence_number,
+        'batch_total': str(batch.total_amount),
+        'record_count': batch.record_count
+    })
+
 @login_required
 @user_passes_test(is_accounts_personnel)
 def delete_transaction(request, batch_id, transaction_id):
@@ -1898,13 +1905,14 @@ def delete_transaction(request, batch_id, transaction_id):
     transaction = get_object_or_404(EFTTransaction, id=transaction_id, batch=batch)
     
     with db_transaction.atomic():
+        # Hold the batch row so no sequence numbers are handed out mid-renumber
+        batch = EFTBatch.objects.select_for_update().get(pk=batch.pk)
+        transaction.batch = batch
+        
+        # delete() subtracts the line from the batch totals
         transaction.delete()
-        batch.update_totals()
         
-        transactions = batch.transactions.all().order_by('id')
-        for idx, trans in enumerate(transactions, 1):
-            trans.sequence_number = str(idx).zfill(4)
-            trans.save()
+        batch.resequence_transactions()
     
     return JsonResponse({
         'success': True,
@@ -1931,6 +1939,9 @@ def submit_for_approval(request, batch_id):
         batch.status = 'PENDING'
         batch.save()
         
+        # From here on the file is built from these copies, not supplier master data
+        batch.freeze_beneficiaries()
+        
         ApprovalAuditLog.objects.create(
             batch=batch,
             action='SUBMITTED',
@@ -1971,10 +1982,83 @@ def view_batch(request, batch_id):
         messages.error(request, 'You do not have permission to view this batch')
         return redirect('dashboard')
     
-    transactions = batch.transactions.all().order_by('sequence_number')
-    audit_logs = batch.audit_logs.all().order_by('-timestamp')
+    audit_logs = batch.audit_logs.select_related('user').order_by('-timestamp')
     
     return render(request, 'accounts/view_batch.html', {
+        'batch': batch,
+        'audit_logs': audit_logs
+    })
+
+@login_required
+def batch_transactions_data(request, batch_id):
+    """One window of a batch's lines as JSON, for the transaction grid"""
+    batch = get_object_or_404(EFTBatch, id=batch_id)
+    
+    if not (batch.created_by_id == request.user.id or
+            request.user.has_perm('eft_app.can_approve_eft') or
+            request.user.is_superuser or
+            is_authorizer(request.user)):
+        return JsonResponse({'error': 'You do not have permission to view this batch'}, status=403)
+    
+    return JsonResponse(TransactionGrid(batch).page(request.GET))
+
+def archived_batches_for(user):
+    """Archived batches a user may see: approvers see all, others only their own"""
+    batches = ArchivedBatch.objects.select_related('created_by')
+    if not (user.has_perm('eft_app.can_approve_eft') or user.is_superuser):
+        batches = batches.filter(created_by=user)
+    return batches
+
+@login_required
+def archive_list(request):
+    """Search archived batches (read-only)"""
+    batches = archived_batches_for(request.user).order_by('-created_at')
+    
+    search_query = request.GET.get('search', '').strip()
+    if search_query:
+        # Payee matches come from the frozen beneficiary columns on archived lines
+        matching_lines = ArchivedBatch.objects.filter(
+            Q(transactions__beneficiary_name__icontains=search_query) |
+            Q(transactions__beneficiary_account_number=search_query)
+        ).values('id')
+        batches = batches.filter(
+            Q(batch_reference__icontains=search_query) |
+            Q(batch_name__icontains=search_query) |
+            Q(id__in=matching_lines)
+        )
+    
+    date_from = request.GET.get('date_from', '')
+    date_to = request.GET.get('date_to', '')
+    try:
+        if date_from:
+            batches = batches.filter(created_at__gte=timezone.make_aware(datetime.strptime(date_from, '%Y-%m-%d')))
+        if date_to:
+            end = timezone.make_aware(datetime.strptime(date_to, '%Y-%m-%d')) + timedelta(days=1)
+            batches = batches.filter(created_at__lt=end)
+    except ValueError:
+        messages.error(request, 'Dates must be in YYYY-MM-DD format')
+    
+    page_obj = KeysetPaginator(batches, 20).page(request.GET.get('cursor'), request.GET)
+    
+    return render(request, 'accounts/archive_list.html', {
+        'batches': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'search_query': search_query,
+        'date_from': date_from,
+        'date_to': date_to,
+    })
+
+@login_required
+def archive_detail(request, batch_id):
+    """View an archived batch (read-only)"""
+    batch = get_object_or_404(archived_batches_for(request.user), id=batch_id)
+    transactions = batch.transactions.select_related(
+        'debit_account', 'scheme', 'zone'
+    ).order_by(*SEQUENCE_ORDERING)
+    audit_logs = batch.audit_logs.select_related('user').order_by('-timestamp')
+    
+    return render(request, 'accounts/archive_detail.html', {
         'batch': batch,
         'transactions': transactions,
         'audit_logs': audit_logs
@@ -1991,28 +2075,80 @@ def export_batch(request, batch_id, format='txt'):
     
     try:
         generator = EFTGenerator()
-        content = generator.generate_eft_file(batch)
         filename = f"CRWB_EFT_{batch.batch_reference}_{timezone.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        if format == 'csv':
-            response = generator.export_to_csv(content, filename)
+        remarks = f'Exported as {format.upper()}'
+        
+        # Large batches (or ?stream=1) are streamed straight to the client
+        stream = (request.GET.get('stream') == '1' or
+                  batch.record_count >= getattr(settings, 'EFT_STREAM_THRESHOLD', 1000))
+        
+        if batch.record_count > generator.max_file_records():
+            # Too many lines for one RBM file: deliver the split parts as a ZIP
+            bundle, manifest = EFTBundleExporter.build([batch], user=request.user, format=format)
+            response = FileResponse(bundle, as_attachment=True, filename=f"{filename}.zip",
+                                    content_type='application/zip')
+            remarks = f"Exported as {format.upper()} in {len(manifest['files'])} split files"
+        elif stream:
+            lines = generator.stream_eft_lines(batch, format)
+            response = generator.export_to_stream(lines, filename, format)
         else:
-            response = generator.export_to_txt(content, filename)
+            content = EFTArtifactCache.get_or_generate(batch, format)
+            response = generator.export_to_file(content, filename, format)
         
         ApprovalAuditLog.objects.create(
             batch=batch,
             action='EXPORTED',
             user=request.user,
-            remarks=f'Exported as {format.upper()}',
+            remarks=remarks,
             ip_address=request.META.get('REMOTE_ADDR')
         )
         
         return response
-        
+    
     except Exception as e:
         messages.error(request, f'Error generating file: {str(e)}')
         return redirect('view_batch', batch_id=batch.id)
 
+@login_required
+@require_POST
+def export_batches_bundle(request):
+    """Export several approved batches as one ZIP of RBM files"""
+    next_url = request.POST.get('next', '')
+    if not url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()},
+                                           require_https=request.is_secure()):
+        next_url = 'authorizer_batch_list'
+    
+    if not request.user.has_perm('eft_app.can_export_eft'):
+        messages.error(request, 'You do not have permission to export EFT files')
+        return redirect(next_url)
+    
+    batch_ids = request.POST.getlist('batch_ids')
+    batches = list(EFTBatch.objects.filter(id__in=batch_ids, status='APPROVED').order_by('batch_reference'))
+    
+    if not batches:
+        messages.error(request, 'No approved batches selected for export')
+        return redirect(next_url)
+    
+    try:
+        bundle, manifest = EFTBundleExporter.build(batches, user=request.user)
+    except ValueError as e:
+        messages.error(request, f'Error generating files: {str(e)}')
+        return redirect(next_url)
+    
+    ApprovalAuditLog.objects.bulk_create([
+        ApprovalAuditLog(
+            batch=batch,
+            action='EXPORTED',
+            user=request.user,
+            remarks=f'Exported in ZIP bundle of {len(batches)} batch(es)',
+            ip_address=request.META.get('REMOTE_ADDR')
+        )
+        for batch in batches
+    ])
+    
+    filename = f"CRWB_EFT_BUNDLE_{timezone.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return FileResponse(bundle, as_attachment=True, filename=filename, content_type='application/zip')
+
 @login_required
 @user_passes_test(is_accounts_personnel)
 def export_batch_details(request, batch_id):
@@ -2143,8 +2279,9 @@ def batch_bulk_delete(request):
     batch_ids = request.POST.getlist('batch_ids')
     batches = EFTBatch.objects.filter(id__in=batch_ids, created_by=request.user, status='DRAFT')
     
-    count = batches.count()
-    batches.delete()
+    with db_transaction.atomic():
+        count = batches.count()
+        batches.delete()
     
     messages.success(request, f'{count} draft batch(es) deleted successfully')
     next_url = request.POST.get('next', 'batch_list')
@@ -2166,11 +2303,14 @@ def authorizer_dashboard(request):
         status__in=['APPROVED', 'REJECTED']
     ).order_by('-approved_at')[:10]
     
+    today_start, today_end = today_range()
+    
     stats = {
         'pending_count': pending_batches.count(),
         'approved_today': EFTBatch.objects.filter(
             status='APPROVED',
-            approved_at__date=timezone.now().date()
+            approved_at__gte=today_start,
+            approved_at__lt=today_end
         ).count(),
         'total_approved': EFTBatch.objects.filter(status='APPROVED').count(),
         'total_rejected': EFTBatch.objects.filter(status='REJECTED').count(),
@@ -2192,16 +2332,14 @@ def review_batch(request, batch_id):
         messages.error(request, 'You cannot approve or reject your own batch')
         return redirect('authorizer_dashboard')
     
-    transactions = batch.transactions.all().order_by('sequence_number')
     approval_form = BatchApprovalForm()
     rejection_form = BatchRejectionForm()
     
     return render(request, 'authorizer/review_batch.html', {
         'batch': batch,
-        'transactions': transactions,
         'approval_form': approval_form,
         'rejection_form': rejection_form,
-        'total_amount': sum(t.amount for t in transactions)
+        'total_amount': batch.total_amount
     })
 
 @login_required
@@ -2231,6 +2369,9 @@ def approve_batch(request, batch_id):
                     ip_address=request.META.get('REMOTE_ADDR')
                 )
                 
+                # Pre-generate the export files once the approval is committed
+                db_transaction.on_commit(lambda: EFTArtifactCache.warm(batch.id))
+                
                 messages.success(request, 'Batch approved successfully')
                 return redirect('authorizer_dashboard')
     
@@ -2273,16 +2414,28 @@ def reject_batch(request, batch_id):
 @user_passes_test(is_authorizer)
 def authorizer_batch_list(request):
     """List all batches for authorizer"""
-    batches = EFTBatch.objects.exclude(
+    visible_batches = EFTBatch.objects.exclude(
         Q(status='DRAFT', created_by=request.user)
-    ).order_by('-created_at')
+    )
+    batches = visible_batches.order_by('-created_at')
     
     status_filter = request.GET.get('status', '')
     if status_filter:
         batches = batches.filter(status=status_filter)
     
+    page_obj = KeysetPaginator(batches, 20).page(request.GET.get('cursor'), request.GET)
+    
+    # Tab badges come from one aggregate rather than a separate COUNT per page
+    summary = BatchStats.summary(visible_batches)
+    
     return render(request, 'authorizer/batch_list.html', {
-        'batches': batches,
+        'batches': page_obj,
+        'page_obj': page_obj,
+        'is_paginated': page_obj.has_other_pages(),
+        'total_count': summary['total_count'],
+        'pending_count': summary['pending_count'],
+        'approved_count': summary['approved_count'],
+        'rejected_count': summary['rejected_count'],
         'status_filter': status_filter
     })
 
@@ -2307,6 +2460,16 @@ def get_supplier_details(request, supplier_id):
     except Supplier.DoesNotExist:
         return JsonResponse({'error': 'Supplier not found'}, status=404)
 
+@login_required
+def supplier_lookup(request):
+    """Typeahead matches for the supplier picker, each with the details get_supplier_details returns"""
+    try:
+        limit = int(request.GET.get('limit', SupplierLookup.DEFAULT_LIMIT))
+    except ValueError:
+        limit = SupplierLookup.DEFAULT_LIMIT
+    query = request.GET.get('q', '')
+    return JsonResponse({'query': query, 'results': SupplierLookup.search(query, limit)})
+
 @login_required
 def get_scheme_zone(request, scheme_id):
     """Get zone for a scheme - BACKWARD COMPATIBILITY"""
@@ -2351,7 +2514,7 @@ def get_scheme_details(request, scheme_id):
             'scheme_name': scheme.scheme_name,
         }
         return JsonResponse(data)
-        
+    
     except Scheme.DoesNotExist:
         return JsonResponse({
             'success': False,
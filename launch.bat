@@ -64,7 +64,8 @@ python manage.py migrate --noinput
 
 echo 📂 Step 4: Loading your data...
 if exist eft_app\fixtures\all_data.json (
-    python manage.py loaddata eft_app\fixtures\all_data.json
+    python manage.py load_backup eft_app\fixtures\all_data.json
+    python manage.py recompute_usage_counters
     echo ✅ Your original data loaded (6 users, 6 banks, etc.)
 ) else (
     echo ⚠ Creating admin user...
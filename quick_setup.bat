@@ -17,7 +17,8 @@ pip install Django==4.2.27
 if exist db.sqlite3 del db.sqlite3
 python manage.py makemigrations
 python manage.py migrate
-if exist eft_app\fixtures\all_data.json python manage.py loaddata eft_app\fixtures\all_data.json
+if exist eft_app\fixtures\all_data.json python manage.py load_backup eft_app\fixtures\all_data.json
+python manage.py recompute_usage_counters
 echo.
 echo ✅ Quick setup complete!
 echo Run: start.bat
@@ -41,9 +41,13 @@ python manage.py migrate --noinput
 echo ✅ Database reset
 
 echo 📂 Loading restored data...
-python manage.py loaddata eft_app\fixtures\all_data.json
+python manage.py load_backup eft_app\fixtures\all_data.json
 echo ✅ Data loaded
 
+echo 🔢 Recounting usage counters...
+python manage.py recompute_usage_counters
+echo ✅ Counters updated
+
 echo.
 echo ================================================
 echo ✅ RESTORE COMPLETE
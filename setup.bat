@@ -40,7 +40,8 @@ python manage.py migrate
 
 echo 📂 Loading your data...
 if exist eft_app\fixtures\all_data.json (
-    python manage.py loaddata eft_app\fixtures\all_data.json
+    python manage.py load_backup eft_app\fixtures\all_data.json
+    python manage.py recompute_usage_counters
     echo ✅ Your data loaded!
 ) else (
     echo Creating admin user...